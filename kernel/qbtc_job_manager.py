@@ -0,0 +1,398 @@
+# qbtc_job_manager.py
+# Trabajos en segundo plano del Kernel QBTC - cálculos largos de primos
+# ejecutados en un pool acotado, con progreso, resultados parciales,
+# cancelación, límite de cola y expiración de resultados por TTL y por
+# memoria retenida (los listados terminados se guardan comprimidos)
+
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# El motor de resonancias vive en la raíz del repositorio
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from prime_array import CompressedPrimeArray  # noqa: E402
+from prime_resonance_utils import PrimeResonanceEngine  # noqa: E402
+
+# Configuración
+MAX_WORKERS = 2              # Hilos de cálculo; los hilos HTTP quedan libres
+MAX_QUEUED_JOBS = 16         # Trabajos en espera antes de responder 429
+RESULT_TTL_SECONDS = 600     # Vida de un trabajo terminado antes de descartarse
+MAX_RETAINED_JOBS = 256      # Trabajos terminados conservados como máximo
+MAX_RETAINED_BYTES = 64 << 20  # Memoria de resultados terminados antes de expulsar los más antiguos
+PARTIAL_RESULT_SIZE = 100    # Últimos elementos expuestos mientras el trabajo corre
+PAGE_SIZE = 1000             # Elementos del resultado por página en GET /jobs/{id}
+MAX_LIMIT = 10 ** 9
+# Los trabajos que producen listados acumulan ~8 bytes por elemento mientras
+# corren: para rangos mayores, /stream entrega los primos sin retenerlos
+MAX_LIST_LIMIT = 10 ** 8
+MAX_SACRED_COUNT = 100000
+# Marca de parámetro obligatorio en las especificaciones (sin valor por defecto)
+REQUIRED = object()
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Señal interna: el trabajo fue cancelado entre dos elementos"""
+
+
+class JobQueueFull(Exception):
+    """La cola de trabajos pendientes alcanzó su límite"""
+
+
+class JobKind(NamedTuple):
+    """Tipo de trabajo admitido: ejecución, parámetros y formato de elementos"""
+    run: Callable
+    params: Dict[str, tuple]
+    render: Callable = int
+    sorted_items: bool = False  # Elementos crecientes: se comprimen al completarse
+
+
+class Job:
+    """Estado de un trabajo: progreso, elementos producidos y resultado"""
+
+    def __init__(self, kind: str, params: Dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.progress = 0.0
+        self.produced = 0
+        self.items = array('Q')
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def track(self, iterable, progress: Callable):
+        """
+        Recorre un generador del motor actualizando progreso y atendiendo cancelación
+
+        La cancelación se comprueba entre elementos; al detenerse se cierra el
+        generador para liberar la criba o el escaneo en curso.
+        """
+        try:
+            for item in iterable:
+                if self.cancel_event.is_set():
+                    raise JobCancelled()
+                self.produced += 1
+                self.progress = min(progress(item, self.produced), 1.0)
+                yield item
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria aproximada de los elementos retenidos"""
+        if isinstance(self.items, CompressedPrimeArray):
+            return self.items.nbytes
+        return len(self.items) * self.items.itemsize
+
+    def release(self, status: str):
+        """
+        Compacta los elementos de un trabajo terminado
+
+        Un listado completado y creciente pasa a CompressedPrimeArray; de uno
+        cancelado o fallido solo se conservan los últimos parciales expuestos.
+        """
+        if status != COMPLETED:
+            self.items = self.items[-PARTIAL_RESULT_SIZE:]
+        elif JOB_KINDS[self.kind].sorted_items and len(self.items):
+            self.items = CompressedPrimeArray.from_primes(self.items)
+
+    def snapshot(self, offset: int = 0, limit: int = PAGE_SIZE) -> Dict:
+        """
+        Vista JSON del trabajo
+
+        Mientras corre expone los últimos PARTIAL_RESULT_SIZE elementos; al
+        completarse, la página [offset, offset + limit) del resultado.
+        """
+        render = JOB_KINDS[self.kind].render
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'progress': round(self.progress, 6),
+            'produced': self.produced,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.error is not None:
+            data['error'] = self.error
+        if self.status == COMPLETED and self.result is not None:
+            data['result'] = self.result
+        elif self.status == COMPLETED:
+            data['result_count'] = len(self.items)
+            data['offset'] = offset
+            data['limit'] = limit
+            data['result'] = [render(item) for item in self.items[offset:offset + limit]]
+        else:
+            data['partial'] = [render(item) for item in self.items[-PARTIAL_RESULT_SIZE:]]
+        return data
+
+
+def _run_primes(engine: PrimeResonanceEngine, job: Job):
+    """Primos hasta limit"""
+    limit = job.params['limit']
+    for prime in job.track(engine.iter_primes(limit), lambda p, _: p / limit):
+        job.items.append(prime)
+
+
+def _run_twin_primes(engine: PrimeResonanceEngine, job: Job):
+    """Pares de primos gemelos hasta limit (se guarda el primero de cada par)"""
+    limit = job.params['limit']
+    for first, _ in job.track(engine.iter_twin_primes(limit), lambda pair, _: pair[1] / limit):
+        job.items.append(first)
+
+
+def _run_sacred_sequence(engine: PrimeResonanceEngine, job: Job):
+    """Secuencia sagrada; la modulación QBTC se aplica al terminar el escaneo"""
+    count = job.params['count']
+    for prime in job.track(engine.iter_sacred_primes(count), lambda _, n: n / count):
+        job.items.append(prime)
+    sequence = job.items.tolist()
+    if len(sequence) > len(engine.sacred_primes):
+        order = engine.qbtc_modulation_order(sequence, job.params['top_k'])
+        job.items = array('Q', (sequence[i] for i in order))
+
+
+def _run_analysis_report(engine: PrimeResonanceEngine, job: Job) -> Dict:
+    """Reporte QBTC de los primos hasta limit, en bloques de memoria acotada"""
+    limit = job.params['limit']
+    primes = job.track(engine.iter_primes(limit), lambda p, _: p / limit)
+    return engine.get_qbtc_analysis_report_chunked(primes)
+
+
+# Parámetros por tipo: nombre -> (valor por defecto, mínimo, máximo)
+JOB_KINDS: Dict[str, JobKind] = {
+    'primes': JobKind(_run_primes, {'limit': (REQUIRED, 2, MAX_LIST_LIMIT)},
+                      sorted_items=True),
+    'twin_primes': JobKind(_run_twin_primes, {'limit': (REQUIRED, 2, MAX_LIST_LIMIT)},
+                           lambda first: [first, first + 2], sorted_items=True),
+    'sacred_sequence': JobKind(_run_sacred_sequence,
+                               {'count': (50, 1, MAX_SACRED_COUNT),
+                                'top_k': (None, 0, MAX_SACRED_COUNT)}),
+    'analysis_report': JobKind(_run_analysis_report, {'limit': (REQUIRED, 2, MAX_LIMIT)}),
+}
+
+
+def validate_params(spec: Dict[str, tuple], params: Optional[Dict], context: str) -> Dict:
+    """
+    Valida parámetros enteros contra una especificación nombre -> (defecto, mín, máx)
+
+    Returns:
+        Dict: Parámetros completos con sus valores por defecto
+
+    Raises:
+        ValueError: Parámetro ausente, extra o fuera de rango
+    """
+    params = params or {}
+    if not isinstance(params, dict):
+        raise ValueError("'params' debe ser un objeto JSON")
+    unknown = set(params) - set(spec)
+    if unknown:
+        raise ValueError(f"Parámetros no admitidos para {context}: {', '.join(sorted(unknown))}")
+
+    validated = {}
+    for name, (default, low, high) in spec.items():
+        value = params.get(name, default)
+        if value is REQUIRED:
+            raise ValueError(f"Falta el parámetro '{name}'")
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)
+                                  or not low <= value <= high):
+            raise ValueError(f"'{name}' debe ser un entero en [{low}, {high}]")
+        validated[name] = value
+    return validated
+
+
+def validate_job_params(kind: str, params: Optional[Dict]) -> Dict:
+    """
+    Valida tipo y parámetros de un trabajo
+
+    Returns:
+        Dict: Parámetros completos con sus valores por defecto
+
+    Raises:
+        ValueError: Tipo desconocido o parámetro ausente, extra o fuera de rango
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Tipo de trabajo desconocido: {kind!r} "
+                         f"(admitidos: {', '.join(sorted(JOB_KINDS))})")
+    return validate_params(JOB_KINDS[kind].params, params, kind)
+
+
+class JobManager:
+    """Registro de trabajos y pool acotado que los ejecuta"""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_queued=MAX_QUEUED_JOBS,
+                 result_ttl=RESULT_TTL_SECONDS, max_retained=MAX_RETAINED_JOBS,
+                 engine=None, max_retained_bytes=MAX_RETAINED_BYTES):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.max_retained = max_retained
+        self.max_retained_bytes = max_retained_bytes
+        self.jobs: Dict[str, Job] = {}
+        self._engine = engine
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> PrimeResonanceEngine:
+        """Motor compartido por los trabajos (se construye en el primer uso)"""
+        if self._engine is None:
+            self._engine = PrimeResonanceEngine()
+        return self._engine
+
+    def submit(self, kind: str, params: Optional[Dict] = None) -> Job:
+        """
+        Encola un trabajo y devuelve su registro sin esperar al cálculo
+
+        Raises:
+            ValueError: Tipo o parámetros inválidos
+            JobQueueFull: Hay max_queued trabajos esperando
+        """
+        params = validate_job_params(kind, params)
+        with self._lock:
+            self._evict_expired()
+            queued = sum(1 for job in self.jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"Cola de trabajos llena ({queued} en espera)")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='qbtc-job')
+            job = Job(kind, params)
+            self.jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+
+        logger.info(f"Trabajo {job.id} encolado: {kind} {params}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Obtener un trabajo por id (None si no existe o expiró)"""
+        with self._lock:
+            self._evict_expired()
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """Trabajos vigentes en orden de creación"""
+        with self._lock:
+            self._evict_expired()
+            return sorted(self.jobs.values(), key=lambda job: job.created_at)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancela un trabajo en espera o en curso; uno terminado se descarta
+
+        Returns:
+            Job: El trabajo afectado (None si no existe)
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in FINISHED_STATES:
+                del self.jobs[job_id]
+                return job
+            job.cancel_event.set()
+            if job.future.cancel():
+                self._finish(job, CANCELLED)
+
+        logger.info(f"Cancelación solicitada para trabajo {job_id}")
+        return job
+
+    def retained_bytes(self) -> int:
+        """Memoria de los elementos de todos los trabajos vigentes"""
+        with self._lock:
+            return sum(job.nbytes for job in self.jobs.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Número de trabajos vigentes por estado"""
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+    def shutdown(self, wait=False):
+        """Cancela los trabajos pendientes y detiene el pool"""
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status not in FINISHED_STATES:
+                    job.cancel_event.set()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job):
+        """Ejecuta un trabajo en un hilo del pool"""
+        with self._lock:
+            if job.cancel_event.is_set():
+                self._finish(job, CANCELLED)
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        try:
+            result = JOB_KINDS[job.kind].run(self.engine, job)
+        except JobCancelled:
+            status = CANCELLED
+            logger.info(f"Trabajo {job.id} cancelado tras {job.produced} elementos")
+        except Exception as e:
+            status = FAILED
+            job.error = str(e)
+            logger.error(f"Error en trabajo {job.id}: {e}")
+        else:
+            status = COMPLETED
+            job.result = result
+            job.progress = 1.0
+            logger.info(f"Trabajo {job.id} completado: {job.produced} elementos")
+
+        # Compactar fuera del lock: el trabajo aún no es visible como terminado
+        job.release(status)
+        with self._lock:
+            self._finish(job, status)
+            self._evict_expired()
+
+    def _finish(self, job: Job, status: str):
+        job.status = status
+        job.finished_at = time.time()
+
+    def _evict_expired(self):
+        """
+        Descarta trabajos terminados más antiguos que el TTL, que el cupo de
+        trabajos o que el presupuesto de memoria (los más antiguos primero)
+        """
+        now = time.time()
+        finished = sorted((job for job in self.jobs.values() if job.status in FINISHED_STATES),
+                          key=lambda job: job.finished_at)
+        excess = len(finished) - self.max_retained
+        retained = sum(job.nbytes for job in finished)
+        for index, job in enumerate(finished):
+            if (index < excess or retained > self.max_retained_bytes
+                    or now - job.finished_at > self.result_ttl):
+                retained -= job.nbytes
+                del self.jobs[job.id]
@@ -0,0 +1,569 @@
+# qbtc_kernel_client.py
+# Cliente Python del Servidor del Kernel QBTC - pool de conexiones
+# keep-alive, micro-batching de procesar_estado/manifest_intention hacia
+# /batch, reintentos con backoff exponencial y variante asyncio
+
+import asyncio
+import http.client
+import json
+import logging
+import os
+import queue
+import random
+import select
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+# prime_wire (decodificador binario) vive en la raíz del repositorio
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Configuración
+DEFAULT_BASE_URL = 'http://localhost:3000'
+DEFAULT_TIMEOUT = 10
+POOL_SIZE = 4                  # Conexiones keep-alive conservadas por cliente
+MAX_RETRIES = 3                # Reintentos tras el primer intento
+BACKOFF_BASE = 0.05            # Segundos del primer reintento (se duplica en cada uno)
+BACKOFF_MAX = 2.0
+RETRY_STATUSES = (429, 502, 503, 504)
+# Métodos que pueden repetirse sin efectos duplicados si la respuesta se pierde
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'DELETE')
+# Rechazos del servidor antes de procesar (cola llena, saturación): seguros para POST
+REJECTED_STATUSES = (429, 503)
+BATCH_WINDOW = 0.005           # Segundos que se acumulan llamadas antes de enviar el lote
+MAX_BATCH_SIZE = 64            # Llamadas por lote (el servidor admite hasta 256)
+JOB_POLL_INTERVAL = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class KernelClientError(Exception):
+    """Respuesta de error del servidor del kernel"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Espera antes de un reintento: Retry-After si el servidor lo indica, si no
+    backoff exponencial con jitter completo
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def should_retry(method: str, error: BaseException, reused: bool) -> bool:
+    """
+    Indica si un error de conexión admite reintento
+
+    Los métodos idempotentes se reintentan siempre. Los demás solo cuando la
+    petición no llegó a procesarse: conexión rechazada, o conexión keep-alive
+    reutilizada que el servidor ya había cerrado (RemoteDisconnected sin
+    respuesta). Un timeout de lectura tras enviar el cuerpo no se reintenta:
+    el servidor puede estar ejecutándolo.
+    """
+    if method in IDEMPOTENT_METHODS:
+        return True
+    if isinstance(error, ConnectionRefusedError):
+        return True
+    return reused and isinstance(error, http.client.RemoteDisconnected)
+
+
+def should_retry_status(method: str, status: int) -> bool:
+    """Estados reintentables: cualquiera de RETRY_STATUSES si es idempotente"""
+    if method in IDEMPOTENT_METHODS:
+        return status in RETRY_STATUSES
+    return status in REJECTED_STATUSES
+
+
+def _error_message(body: bytes) -> str:
+    """Mensaje de error de una respuesta JSON o HTML de send_error"""
+    try:
+        return json.loads(body).get('error', body.decode('utf-8', 'replace'))
+    except (ValueError, AttributeError):
+        return body.decode('utf-8', 'replace')
+
+
+def _is_dropped(connection: http.client.HTTPConnection) -> bool:
+    """Conexión keep-alive inactiva que el servidor ya cerró (legible sin petición pendiente)"""
+    if connection.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _json_body(payload) -> Tuple[Optional[bytes], Dict[str, str]]:
+    if payload is None:
+        return None, {}
+    return json.dumps(payload).encode('utf-8'), {'Content-Type': 'application/json'}
+
+
+class _BatchCall:
+    """Llamada pendiente de un lote: operación, payload y resultado futuro"""
+
+    __slots__ = ('op', 'payload', 'future')
+
+    def __init__(self, op: str, payload, future):
+        self.op = op
+        self.payload = payload
+        self.future = future
+
+
+def _batch_request(calls: List[_BatchCall]) -> Dict:
+    return {'requests': [{'op': call.op, 'payload': call.payload} for call in calls]}
+
+
+def _resolve_batch(calls: List[_BatchCall], response: Dict, set_result, set_exception):
+    """Reparte los resultados de /batch entre las llamadas del lote"""
+    results = response.get('results', [])
+    for index, call in enumerate(calls):
+        if index >= len(results):
+            set_exception(call.future, KernelClientError(502, 'Respuesta de lote incompleta'))
+        elif results[index]['status'] == 200:
+            set_result(call.future, results[index]['result'])
+        else:
+            set_exception(call.future, KernelClientError(results[index]['status'],
+                                                         results[index]['error']))
+
+
+class QBTCKernelClient:
+    """
+    Cliente síncrono y seguro entre hilos del servidor del kernel
+
+    Las llamadas concurrentes a procesar_estado/manifest_intention que llegan
+    dentro de batch_window se agrupan en una única petición a /batch.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE,
+                 max_retries=MAX_RETRIES, batch_window=BATCH_WINDOW,
+                 max_batch_size=MAX_BATCH_SIZE):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._pending: List[_BatchCall] = []
+        self._batch_lock = threading.Lock()
+        self._batch_ready = threading.Condition(self._batch_lock)
+        self._flusher = None
+        self.stats = {'requests': 0, 'retries': 0, 'connections': 0, 'batches': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str):
+        """Incrementar un contador de stats (llamado desde varios hilos)"""
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    # -- Pool de conexiones ------------------------------------------------
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Conexión del pool (descartando las ya cerradas por el servidor) y si es reutilizada"""
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if not _is_dropped(connection):
+                return connection, True
+            connection.close()
+        self._count('connections')
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, connection: http.client.HTTPConnection, reusable: bool):
+        if reusable:
+            try:
+                self._pool.put_nowait(connection)
+                return
+            except queue.Full:
+                pass
+        connection.close()
+
+    def close(self):
+        """Cerrar las conexiones del pool"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -- Peticiones ----------------------------------------------------------
+
+    def request(self, method: str, path: str, body: bytes = None,
+                headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Petición con conexión del pool y reintentos
+
+        GET/HEAD/DELETE se reintentan ante errores de conexión y ante
+        429/502/503/504. El resto de métodos (POST /jobs, /batch...) solo
+        cuando la petición no llegó a procesarse (ver should_retry) o el
+        servidor la rechazó con 429/503.
+
+        Returns:
+            Tuple[int, Dict, bytes]: Estado, cabeceras y cuerpo
+        """
+        attempt = 0
+        while True:
+            connection, reused = self._acquire()
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if attempt >= self.max_retries or not should_retry(method, e, reused):
+                    raise
+                logger.debug(f"Reintentando {method} {path} tras error de conexión: {e}")
+                retry_after = None
+            else:
+                self._release(connection, not response.will_close)
+                self._count('requests')
+                if (not should_retry_status(method, response.status)
+                        or attempt >= self.max_retries):
+                    return response.status, dict(response.getheaders()), data
+                retry_after = response.getheader('Retry-After')
+
+            self._count('retries')
+            time.sleep(backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def request_json(self, method: str, path: str, payload=None, expected=(200,)):
+        """Petición JSON: devuelve el cuerpo decodificado o lanza KernelClientError"""
+        body, headers = _json_body(payload)
+        status, _, data = self.request(method, path, body, headers)
+        if status not in expected:
+            raise KernelClientError(status, _error_message(data))
+        return json.loads(data)
+
+    # -- Endpoints -----------------------------------------------------------
+
+    def health(self) -> Dict:
+        return self.request_json('GET', '/health')
+
+    def constants(self) -> Dict:
+        return self.request_json('GET', '/constants')
+
+    def metrics(self) -> Dict:
+        return self.request_json('GET', '/metrics')
+
+    def is_prime(self, n: int) -> bool:
+        return self.request_json('GET', f'/is_prime?n={int(n)}')['is_prime']
+
+    def primes(self, limit: int, start: int = 0, encoding: str = 'varint'):
+        """
+        Primos en [start, limit] en formato binario
+
+        Returns:
+            np.ndarray sin parseo (u32/u64 como vista del cuerpo), o array
+            tipado si NumPy no está disponible
+        """
+        from prime_wire import content_type, decode_primes
+
+        query = urlencode({'start': start, 'limit': limit})
+        status, _, data = self.request('GET', f'/primes?{query}',
+                                       headers={'Accept': content_type(encoding)})
+        if status != 200:
+            raise KernelClientError(status, _error_message(data))
+        return decode_primes(data)
+
+    def stream(self, kind: str, **params) -> Iterator:
+        """
+        Consume /stream/{kind} como NDJSON, elemento a elemento
+
+        Usa una conexión propia (el servidor la cierra al terminar); abandonar
+        el iterador cierra la conexión y detiene el cálculo en el servidor.
+        """
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request('GET', f'/stream/{kind}?{urlencode(params)}',
+                               headers={'Accept': 'application/x-ndjson'})
+            response = connection.getresponse()
+            if response.status != 200:
+                raise KernelClientError(response.status, _error_message(response.read()))
+            for line in response:
+                yield json.loads(line)
+        finally:
+            connection.close()
+
+    def submit_job(self, kind: str, **params) -> str:
+        return self.request_json('POST', '/jobs', {'kind': kind, 'params': params},
+                                 expected=(202,))['id']
+
+    def get_job(self, job_id: str, offset: int = 0, limit: int = 1000) -> Dict:
+        return self.request_json('GET', f'/jobs/{job_id}?offset={offset}&limit={limit}')
+
+    def cancel_job(self, job_id: str) -> Dict:
+        return self.request_json('DELETE', f'/jobs/{job_id}', expected=(202,))
+
+    def wait_job(self, job_id: str, timeout: float = None) -> Dict:
+        """Sondear un trabajo hasta su estado final"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job['status'] in ('completed', 'failed', 'cancelled'):
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"El trabajo {job_id} no terminó en {timeout}s")
+            time.sleep(JOB_POLL_INTERVAL)
+
+    # -- Micro-batching ------------------------------------------------------
+
+    def procesar_estado(self, quantum_state: Dict) -> Dict:
+        """Procesar un estado cuántico (agrupado con llamadas concurrentes)"""
+        return self.call_batched('process', quantum_state).result()
+
+    def manifest_intention(self, pure_query: Dict) -> Dict:
+        """Manifestar una intención (agrupada con llamadas concurrentes)"""
+        return self.call_batched('manifest', pure_query).result()
+
+    def call_batched(self, op: str, payload) -> Future:
+        """
+        Encolar una llamada para el próximo lote
+
+        Returns:
+            Future: Resultado de la llamada (KernelClientError si falla)
+        """
+        call = _BatchCall(op, payload, Future())
+        with self._batch_lock:
+            self._pending.append(call)
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True,
+                                                 name='qbtc-client-batch')
+                self._flusher.start()
+            elif len(self._pending) >= self.max_batch_size:
+                self._batch_ready.notify()
+        return call.future
+
+    def _flush_loop(self):
+        """Enviar lotes mientras haya llamadas pendientes"""
+        while True:
+            with self._batch_lock:
+                if not self._pending:
+                    self._flusher = None
+                    return
+                # Esperar la ventana salvo que el lote ya esté lleno
+                self._batch_ready.wait_for(lambda: len(self._pending) >= self.max_batch_size,
+                                           timeout=self.batch_window)
+                calls = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+            self._send_batch(calls)
+
+    def _send_batch(self, calls: List[_BatchCall]):
+        try:
+            response = self.request_json('POST', '/batch', _batch_request(calls))
+            self._count('batches')
+            _resolve_batch(calls, response, Future.set_result, Future.set_exception)
+        except Exception as e:
+            for call in calls:
+                if not call.future.done():
+                    call.future.set_exception(e)
+
+
+class AsyncQBTCKernelClient:
+    """
+    Variante asyncio del cliente: HTTP/1.1 keep-alive sobre asyncio streams,
+    micro-batching por ventana de tiempo y reintentos con backoff
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE,
+                 max_retries=MAX_RETRIES, batch_window=BATCH_WINDOW,
+                 max_batch_size=MAX_BATCH_SIZE):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._pool: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._pending: List[_BatchCall] = []
+        self._flush_handle = None
+        self._tasks = set()
+        self.stats = {'requests': 0, 'retries': 0, 'connections': 0, 'batches': 0}
+
+    async def close(self):
+        """Cerrar las conexiones del pool"""
+        for _, writer in self._pool:
+            writer.close()
+        self._pool.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _acquire(self):
+        """Conexión del pool (descartando las ya cerradas por el servidor) y si es reutilizada"""
+        while self._pool:
+            connection = self._pool.pop()
+            if not connection[0].at_eof():
+                return connection, True
+            connection[1].close()
+        self.stats['connections'] += 1
+        connection = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                            self.timeout)
+        return connection, False
+
+    def _release(self, connection, reusable: bool):
+        if reusable and len(self._pool) < self.pool_size:
+            self._pool.append(connection)
+        else:
+            connection[1].close()
+
+    async def _exchange(self, connection, method: str, path: str, body: Optional[bytes],
+                        headers: Dict[str, str]):
+        """Enviar una petición HTTP/1.1 y leer la respuesta (Content-Length o chunked)"""
+        reader, writer = connection
+        body = body or b''
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected("Conexión cerrada por el servidor sin respuesta")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            data = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await reader.read()
+        reusable = (response_headers.get('connection', '').lower() != 'close'
+                    and ('content-length' in response_headers
+                         or 'transfer-encoding' in response_headers))
+        return status, response_headers, data, reusable
+
+    async def request(self, method: str, path: str, body: bytes = None,
+                      headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Petición con conexión del pool y reintentos (como QBTCKernelClient.request)"""
+        attempt = 0
+        while True:
+            connection, reused = None, False
+            try:
+                connection, reused = await self._acquire()
+                status, response_headers, data, reusable = await asyncio.wait_for(
+                    self._exchange(connection, method, path, body, headers or {}), self.timeout)
+            except (OSError, http.client.HTTPException, asyncio.IncompleteReadError,
+                    asyncio.TimeoutError, ValueError) as e:
+                if connection is not None:
+                    connection[1].close()
+                if attempt >= self.max_retries or not should_retry(method, e, reused):
+                    raise
+                logger.debug(f"Reintentando {method} {path} tras error de conexión: {e}")
+                retry_after = None
+            else:
+                self._release(connection, reusable)
+                self.stats['requests'] += 1
+                if not should_retry_status(method, status) or attempt >= self.max_retries:
+                    return status, response_headers, data
+                retry_after = response_headers.get('retry-after')
+
+            self.stats['retries'] += 1
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    async def request_json(self, method: str, path: str, payload=None, expected=(200,)):
+        """Petición JSON: devuelve el cuerpo decodificado o lanza KernelClientError"""
+        body, headers = _json_body(payload)
+        status, _, data = await self.request(method, path, body, headers)
+        if status not in expected:
+            raise KernelClientError(status, _error_message(data))
+        return json.loads(data)
+
+    async def health(self) -> Dict:
+        return await self.request_json('GET', '/health')
+
+    async def is_prime(self, n: int) -> bool:
+        return (await self.request_json('GET', f'/is_prime?n={int(n)}'))['is_prime']
+
+    async def procesar_estado(self, quantum_state: Dict) -> Dict:
+        """Procesar un estado cuántico (agrupado con llamadas concurrentes)"""
+        return await self.call_batched('process', quantum_state)
+
+    async def manifest_intention(self, pure_query: Dict) -> Dict:
+        """Manifestar una intención (agrupada con llamadas concurrentes)"""
+        return await self.call_batched('manifest', pure_query)
+
+    def call_batched(self, op: str, payload) -> asyncio.Future:
+        """Encolar una llamada para el próximo lote del bucle de eventos"""
+        loop = asyncio.get_running_loop()
+        call = _BatchCall(op, payload, loop.create_future())
+        self._pending.append(call)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return call.future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        calls = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window,
+                                                                       self._flush)
+        task = asyncio.get_running_loop().create_task(self._send_batch(calls))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, calls: List[_BatchCall]):
+        def set_result(future, value):
+            if not future.done():
+                future.set_result(value)
+
+        def set_exception(future, error):
+            if not future.done():
+                future.set_exception(error)
+
+        try:
+            response = await self.request_json('POST', '/batch', _batch_request(calls))
+            self.stats['batches'] += 1
+            _resolve_batch(calls, response, set_result, set_exception)
+        except Exception as e:
+            for call in calls:
+                set_exception(call.future, e)
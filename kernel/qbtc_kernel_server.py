@@ -3,36 +3,211 @@
 # con endpoints de salud y API REST
 
 import json
+import os
+import signal
+import socket
+import sys
 import threading
 import time
 import logging
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+
+# Los módulos prime_* y de configuración viven en la raíz del repositorio
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
 from qbtc_pure_kernel import QBTCPureKernel
+from qbtc_job_manager import JobManager, JobQueueFull, PAGE_SIZE
+from prime_resonance_utils import PrimeResonanceEngine
+from prime_sieve import sieve_bytearray
+from quantum_resonance_config import QBTCConstants
+from prime_wire import MAX_RANGE_SPAN, content_type, encode_range, negotiate_encoding
+from qbtc_metrics import SharedCounters
+from qbtc_stream import (NDJSON_CONTENT_TYPE, SSE_CONTENT_TYPE, STREAM_KINDS, STREAM_PATH,
+                         ChunkedStreamWriter, ClientDisconnected, encode_ndjson, encode_sse,
+                         parse_stream_request, wants_event_stream)
 
 # Configuración
 SERVER_HOST = 'localhost'
 SERVER_PORT = 3000
+JOBS_PATH = '/jobs'
+RETRY_AFTER_SECONDS = 5  # Sugerencia al cliente cuando la cola de trabajos está llena
+WARM_PRIME_LIMIT = 10 ** 7  # Criba precalculada al arrancar para /is_prime
+WARM_PHASE_LIMIT = 10 ** 6  # Primos con fase y sin(fase) tabuladas al arrancar (~1.9 MB)
+MAX_BATCH_SIZE = 256  # Llamadas máximas por petición a /batch
+MAX_BODY_BYTES = 1 << 20  # Cuerpo máximo de una petición POST (413 por encima)
+BODY_READ_CHUNK = 64 * 1024
+REQUEST_TIMEOUT_SECONDS = 30  # Lectura/escritura de socket y conexiones keep-alive inactivas
+MAX_CONNECTIONS = 64  # Conexiones atendidas a la vez; las siguientes reciben 503
+LISTEN_BACKLOG = 128
+DRAIN_TIMEOUT_SECONDS = 10  # Espera a las peticiones en curso al detener el servidor
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# Archivo de log opcional (variable de entorno); sin él, solo consola (stderr)
+LOG_PATH_ENV = 'QBTC_KERNEL_LOG'
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler('C:\\Users\\DELL\\Desktop\\QBTC-UNIFIED\\logs\\qbtc_kernel.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
+# Sin handlers al importar: configure_logging() se invoca desde main()
 logger = logging.getLogger(__name__)
 
+
+def configure_logging(log_path=None):
+    """Configurar logging a consola y, si se indica ruta o QBTC_KERNEL_LOG, a archivo"""
+    log_path = log_path or os.environ.get(LOG_PATH_ENV)
+    handlers = [logging.StreamHandler()]
+    file_error = None
+    if log_path:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            handlers.insert(0, logging.FileHandler(log_path, encoding='utf-8'))
+        except OSError as e:
+            file_error = e
+    
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, handlers=handlers)
+    if file_error is not None:
+        logger.warning(f"No se pudo abrir el log {log_path}: {file_error}; solo consola")
+    return log_path
+
+class RequestBodyError(Exception):
+    """Cuerpo de petición ausente, demasiado grande o incompleto"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer con límite de conexiones y parada ordenada
+    
+    Cada conexión aceptada ocupa un hilo hasta que se cierra; por encima de
+    max_connections se responde 503 con Retry-After desde el hilo de accept,
+    sin crear hilo ni leer la petición. drain() deja de aceptar, cierra las
+    conexiones keep-alive inactivas y espera a que terminen las peticiones en
+    curso.
+    """
+    
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+    
+    def __init__(self, server_address, handler_class, bind_and_activate=True,
+                 max_connections=MAX_CONNECTIONS):
+        super().__init__(server_address, handler_class, bind_and_activate)
+        self.max_connections = max_connections
+        self.draining = False
+        self.serving = False      # serve_forever() en marcha: shutdown() solo entonces
+        self.rejected = 0
+        self.connections = set()  # Sockets con hilo asignado
+        self.busy = set()         # Sockets con una petición en curso
+        self._idle = threading.Condition()
+    
+    def serve_forever(self, poll_interval=0.5):
+        """Atender peticiones hasta shutdown(), marcando el bucle como activo"""
+        self.serving = True
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.serving = False
+    
+    def process_request(self, request, client_address):
+        """Asignar hilo a la conexión o rechazarla si el servidor está saturado"""
+        with self._idle:
+            accepted = not self.draining and len(self.connections) < self.max_connections
+            if accepted:
+                self.connections.add(request)
+        if not accepted:
+            self.reject_request(request)
+            return
+        super().process_request(request, client_address)
+    
+    def reject_request(self, request):
+        """Responder 503 sin leer la petición y cerrar la conexión"""
+        self.rejected += 1
+        body = json.dumps({'error': 'Servidor saturado'}).encode('utf-8')
+        response = (f"HTTP/1.1 503 Service Unavailable\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Retry-After: {RETRY_AFTER_SECONDS}\r\n"
+                    f"Connection: close\r\n\r\n").encode('ascii') + body
+        try:
+            request.settimeout(1)
+            request.sendall(response)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+    
+    def shutdown_request(self, request):
+        """Cerrar la conexión y liberar su plaza"""
+        super().shutdown_request(request)
+        with self._idle:
+            self.connections.discard(request)
+            self.busy.discard(request)
+            self._idle.notify_all()
+    
+    def set_busy(self, request, busy):
+        """Marcar si la conexión tiene una petición en curso (lo llama el handler)"""
+        with self._idle:
+            if busy:
+                self.busy.add(request)
+            else:
+                self.busy.discard(request)
+    
+    def drain(self, timeout=DRAIN_TIMEOUT_SECONDS):
+        """
+        Parada ordenada: deja de aceptar y espera a las peticiones en curso
+        
+        Las conexiones keep-alive inactivas se cierran enseguida; las activas
+        terminan su petición y responden con Connection: close. Debe llamarse
+        desde un hilo distinto del que ejecuta serve_forever(); si el bucle no
+        llegó a arrancar (o ya terminó) no se espera a shutdown().
+        
+        Returns:
+            int: Conexiones que seguían abiertas al agotarse el plazo
+        """
+        with self._idle:
+            self.draining = True
+        if self.serving:
+            self.shutdown()
+        self.socket.close()
+        
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self.connections:
+                for request in self.connections - self.busy:
+                    try:
+                        # Despierta al hilo bloqueado esperando la siguiente petición
+                        request.shutdown(socket.SHUT_RD)
+                    except OSError:
+                        pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._idle.wait(min(remaining, 0.1))
+            return len(self.connections)
+
+
 class QBTCKernelHandler(BaseHTTPRequestHandler):
     """Handler para el servidor HTTP del Kernel QBTC"""
     
-    def __init__(self, *args, kernel_instance=None, **kwargs):
+    # HTTP/1.1 con Content-Length: los clientes reutilizan la conexión (keep-alive)
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo van en escrituras separadas: sin Nagle no esperan al ACK retardado
+    disable_nagle_algorithm = True
+    # Timeout de cada lectura/escritura del socket: un cliente lento o inactivo libera su hilo
+    timeout = REQUEST_TIMEOUT_SECONDS
+    # Cuerpo sin leer o incompleto: la conexión se cierra tras responder
+    closing = False
+    
+    def __init__(self, *args, kernel_instance=None, job_manager=None, engine=None,
+                 prime_table=None, counters=None, request_timeout=None, **kwargs):
+        if request_timeout is not None:
+            self.timeout = request_timeout
         self.kernel = kernel_instance
+        self.jobs = job_manager
+        self.engine = engine
+        self.prime_table = prime_table
+        self.counters = counters
         self.start_time = datetime.now()
         super().__init__(*args, **kwargs)
     
@@ -40,8 +215,91 @@ class QBTCKernelHandler(BaseHTTPRequestHandler):
         """Redirigir logs del servidor HTTP al logger principal"""
         logger.info(f"HTTP: {format % args}")
     
+    def parse_request(self):
+        """La conexión pasa a estar ocupada en cuanto llega una línea de petición"""
+        self.server.set_busy(self.connection, True)
+        return super().parse_request()
+    
+    def handle_one_request(self):
+        """Atender una petición; durante el drenado, cerrar la conexión al terminar"""
+        try:
+            super().handle_one_request()
+        finally:
+            self.server.set_busy(self.connection, False)
+            if self.server.draining:
+                self.close_connection = True
+    
+    def end_headers(self):
+        """Anunciar el cierre de la conexión si no puede reutilizarse o se está drenando"""
+        if (self.closing or self.server.draining) and not self.close_connection:
+            self.send_header('Connection', 'close')
+        super().end_headers()
+    
+    def read_body(self):
+        """
+        Leer el cuerpo de la petición respetando Content-Length y MAX_BODY_BYTES
+        
+        El cuerpo se lee por bloques con un plazo total, de modo que un cliente
+        que envía byte a byte no retiene el hilo más de timeout segundos.
+        
+        Raises:
+            RequestBodyError: 411 sin Content-Length, 400 si es inválido o el
+                cuerpo llega incompleto, 413 si supera MAX_BODY_BYTES, 408 si
+                vence el plazo
+        """
+        try:
+            return self._read_body()
+        except RequestBodyError:
+            # El cuerpo no se leyó entero: la conexión no puede reutilizarse
+            self.closing = True
+            raise
+    
+    def _read_body(self):
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            raise RequestBodyError(411, 'Se requiere Content-Length (cuerpo chunked no soportado)')
+        header = self.headers.get('Content-Length')
+        if header is None:
+            raise RequestBodyError(411, 'Se requiere Content-Length')
+        try:
+            length = int(header)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            raise RequestBodyError(400, 'Content-Length inválido')
+        if length > MAX_BODY_BYTES:
+            raise RequestBodyError(413, f'El cuerpo supera {MAX_BODY_BYTES} bytes')
+        
+        deadline = time.monotonic() + self.timeout
+        chunks = []
+        received = 0
+        try:
+            while received < length:
+                if time.monotonic() > deadline:
+                    raise socket.timeout
+                chunk = self.rfile.read1(min(BODY_READ_CHUNK, length - received))
+                if not chunk:
+                    raise RequestBodyError(400, 'Cuerpo incompleto')
+                chunks.append(chunk)
+                received += len(chunk)
+        except socket.timeout:
+            raise RequestBodyError(408, 'Tiempo de lectura del cuerpo agotado')
+        return b''.join(chunks)
+    
+    def read_json_body(self):
+        """Cuerpo JSON de la petición (RequestBodyError 400 si no es JSON válido)"""
+        try:
+            return json.loads(self.read_body().decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise RequestBodyError(400, 'JSON inválido')
+    
+    def count(self, name):
+        """Incrementar un contador de métricas (si el servidor los provee)"""
+        if self.counters is not None:
+            self.counters.increment(name)
+    
     def do_GET(self):
         """Manejar peticiones GET"""
+        self.count('requests_processed')
         parsed_path = urlparse(self.path)
         
         if parsed_path.path == '/health':
@@ -50,17 +308,47 @@ class QBTCKernelHandler(BaseHTTPRequestHandler):
             self.handle_status()
         elif parsed_path.path == '/constants':
             self.handle_constants()
+        elif parsed_path.path == '/is_prime':
+            self.handle_is_prime(parsed_path)
+        elif parsed_path.path == '/metrics':
+            self.send_json_response(200, self.counters.snapshot())
+        elif parsed_path.path == '/primes':
+            self.handle_primes_range(parsed_path)
+        elif parsed_path.path == JOBS_PATH:
+            self.handle_list_jobs()
+        elif parsed_path.path.startswith(JOBS_PATH + '/'):
+            self.handle_get_job(parsed_path)
+        elif parsed_path.path.startswith(STREAM_PATH + '/'):
+            self.handle_stream(parsed_path)
         else:
             self.send_error(404, 'Endpoint no encontrado')
     
     def do_POST(self):
         """Manejar peticiones POST"""
+        self.count('requests_processed')
         parsed_path = urlparse(self.path)
         
-        if parsed_path.path == '/process':
-            self.handle_process_state()
-        elif parsed_path.path == '/manifest':
-            self.handle_manifest_intention()
+        try:
+            if parsed_path.path == '/process':
+                self.handle_process_state()
+            elif parsed_path.path == '/manifest':
+                self.handle_manifest_intention()
+            elif parsed_path.path == '/batch':
+                self.handle_batch()
+            elif parsed_path.path == JOBS_PATH:
+                self.handle_submit_job()
+            else:
+                self.send_error(404, 'Endpoint no encontrado')
+        except RequestBodyError as e:
+            self.send_json_response(e.status, {'error': str(e)})
+    
+    def do_DELETE(self):
+        """Manejar peticiones DELETE"""
+        self.count('requests_processed')
+        parsed_path = urlparse(self.path)
+        
+        if parsed_path.path.startswith(JOBS_PATH + '/'):
+            self.handle_cancel_job(parsed_path)
         else:
             self.send_error(404, 'Endpoint no encontrado')
     
@@ -93,65 +381,247 @@ class QBTCKernelHandler(BaseHTTPRequestHandler):
     
     def handle_process_state(self):
         """Endpoint para procesar estados cuánticos"""
+        quantum_state = self.read_json_body()
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            quantum_state = json.loads(post_data.decode('utf-8'))
-            
             logger.info(f"Procesando estado cuántico: {quantum_state}")
             result = self.kernel.procesar_estado(quantum_state)
+            self.count('states_processed')
             
             self.send_json_response(200, result)
             
-        except json.JSONDecodeError:
-            self.send_error(400, 'JSON inválido')
         except Exception as e:
             logger.error(f"Error procesando estado: {e}")
             self.send_error(500, f'Error interno: {str(e)}')
     
     def handle_manifest_intention(self):
         """Endpoint para manifestar intenciones"""
+        pure_query = self.read_json_body()
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            pure_query = json.loads(post_data.decode('utf-8'))
-            
             logger.info(f"Manifestando intención: {pure_query}")
             result = self.kernel.manifest_intention(pure_query)
+            self.count('intentions_manifested')
             
             self.send_json_response(200, result)
             
-        except json.JSONDecodeError:
-            self.send_error(400, 'JSON inválido')
         except Exception as e:
             logger.error(f"Error manifestando intención: {e}")
             self.send_error(500, f'Error interno: {str(e)}')
     
-    def send_json_response(self, status_code, data):
+    def handle_batch(self):
+        """Endpoint por lotes: varias llamadas process/manifest en una sola petición"""
+        body = self.read_json_body()
+        try:
+            calls = body['requests']
+            if not isinstance(calls, list):
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            self.send_json_response(400, {'error': "Se esperaba {'requests': [{'op': ..., "
+                                                   "'payload': ...}, ...]}"})
+            return
+        if len(calls) > MAX_BATCH_SIZE:
+            self.send_json_response(413, {'error': f"Máximo {MAX_BATCH_SIZE} llamadas por lote"})
+            return
+        
+        operations = {
+            'process': (self.kernel.procesar_estado, 'states_processed'),
+            'manifest': (self.kernel.manifest_intention, 'intentions_manifested'),
+        }
+        results = []
+        for call in calls:
+            operation = operations.get(call.get('op')) if isinstance(call, dict) else None
+            if operation is None:
+                results.append({'status': 400, 'error': 'Operación desconocida'})
+                continue
+            method, counter = operation
+            try:
+                results.append({'status': 200, 'result': method(call.get('payload'))})
+                self.count(counter)
+            except Exception as e:
+                logger.error(f"Error en lote ({call['op']}): {e}")
+                results.append({'status': 500, 'error': f'Error interno: {str(e)}'})
+        self.send_json_response(200, {'results': results})
+    
+    def jobs_unavailable(self):
+        """Responde 501 si este proceso no gestiona trabajos (modo pre-fork)"""
+        if self.jobs is not None:
+            return False
+        self.send_json_response(501, {'error': 'API de trabajos no disponible en modo pre-fork'})
+        return True
+    
+    def handle_submit_job(self):
+        """Endpoint para encolar un trabajo largo: responde 202 con su id"""
+        if self.jobs_unavailable():
+            return
+        request = self.read_json_body()
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Se esperaba un objeto JSON {'kind': ..., 'params': {...}}")
+            job = self.jobs.submit(request.get('kind'), request.get('params'))
+        except ValueError as e:
+            self.send_json_response(400, {'error': str(e)})
+            return
+        except JobQueueFull as e:
+            self.send_json_response(429, {'error': str(e)},
+                                    {'Retry-After': str(RETRY_AFTER_SECONDS)})
+            return
+        
+        location = f"{JOBS_PATH}/{job.id}"
+        self.send_json_response(202, {'id': job.id, 'status': job.status, 'location': location},
+                                {'Location': location})
+    
+    def handle_list_jobs(self):
+        """Endpoint con el estado resumido de los trabajos vigentes"""
+        if self.jobs_unavailable():
+            return
+        jobs = [{'id': job.id, 'kind': job.kind, 'status': job.status,
+                 'progress': round(job.progress, 6)} for job in self.jobs.list_jobs()]
+        self.send_json_response(200, {'jobs': jobs, 'counts': self.jobs.stats()})
+    
+    def handle_get_job(self, parsed_path):
+        """Endpoint de progreso, parciales y resultado paginado de un trabajo"""
+        if self.jobs_unavailable():
+            return
+        job = self.jobs.get(parsed_path.path[len(JOBS_PATH) + 1:])
+        if job is None:
+            self.send_error(404, 'Trabajo no encontrado')
+            return
+        
+        query = parse_qs(parsed_path.query)
+        try:
+            offset = max(0, int(query.get('offset', ['0'])[0]))
+            limit = max(0, min(PAGE_SIZE, int(query.get('limit', [str(PAGE_SIZE)])[0])))
+        except ValueError:
+            self.send_error(400, 'offset y limit deben ser enteros')
+            return
+        self.send_json_response(200, job.snapshot(offset, limit))
+    
+    def handle_cancel_job(self, parsed_path):
+        """Endpoint para cancelar un trabajo (o descartar uno terminado)"""
+        if self.jobs_unavailable():
+            return
+        job = self.jobs.cancel(parsed_path.path[len(JOBS_PATH) + 1:])
+        if job is None:
+            self.send_error(404, 'Trabajo no encontrado')
+            return
+        self.send_json_response(202, {'id': job.id, 'status': job.status})
+    
+    def handle_is_prime(self, parsed_path):
+        """Endpoint de primalidad: criba precalculada o Miller-Rabin fuera de ella"""
+        try:
+            n = int(parse_qs(parsed_path.query)['n'][0])
+        except (KeyError, ValueError):
+            self.send_json_response(400, {'error': "'n' debe ser un entero"})
+            return
+        
+        self.count('is_prime_queries')
+        table = self.prime_table
+        if table is not None and 0 <= n < len(table):
+            result = bool(table[n])
+        else:
+            result = self.engine.is_prime(n)
+        self.send_json_response(200, {'n': n, 'is_prime': result})
+    
+    def handle_primes_range(self, parsed_path):
+        """Endpoint de primos en [start, limit]: JSON o binario según Accept"""
+        query = parse_qs(parsed_path.query)
+        try:
+            start = int(query.get('start', ['0'])[0])
+            limit = int(query['limit'][0])
+        except (KeyError, ValueError):
+            self.send_json_response(400, {'error': "'limit' (y 'start' opcional) deben ser enteros"})
+            return
+        if not 0 <= start <= limit + 1 or limit + 1 - start > MAX_RANGE_SPAN:
+            self.send_json_response(400, {'error': f"Se requiere 0 <= start <= limit y un rango "
+                                                   f"de como máximo {MAX_RANGE_SPAN} valores"})
+            return
+        
+        try:
+            encoding = negotiate_encoding(self.headers.get('Accept'))
+            if encoding is None:
+                primes = self.engine.iter_primes(limit, start)
+                self.send_json_response(200, {'start': start, 'limit': limit, 'primes': list(primes)})
+                return
+            header, payload = encode_range(start, limit + 1, encoding)
+        except ValueError as e:
+            self.send_json_response(406, {'error': str(e)})
+            return
+        
+        # Cabecera y buffer de primos se escriben por separado, sin concatenar
+        self.send_response(200)
+        self.send_header('Content-Type', content_type(encoding))
+        self.send_header('Content-Length', str(len(header) + len(payload)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(header)
+        self.wfile.write(payload)
+    
+    def handle_stream(self, parsed_path):
+        """Endpoint de streaming: emite elementos según el motor los produce (SSE o NDJSON)"""
+        kind = parsed_path.path[len(STREAM_PATH) + 1:]
+        query = parse_qs(parsed_path.query)
+        try:
+            params = parse_stream_request(kind, query)
+        except ValueError as e:
+            self.send_json_response(400, {'error': str(e)})
+            return
+        
+        event_stream = wants_event_stream(self.headers.get('Accept'), query)
+        # Chunked solo si el cliente habla HTTP/1.1; la conexión se cierra al terminar
+        chunked = self.request_version == 'HTTP/1.1'
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', SSE_CONTENT_TYPE if event_stream else NDJSON_CONTENT_TYPE)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        stream = STREAM_KINDS[kind]
+        writer = ChunkedStreamWriter(self.wfile, self.connection,
+                                     encode_sse if event_stream else encode_ndjson, chunked)
+        try:
+            count = writer.pump(stream.source(self.engine, params), stream.render)
+            trailer = f"event: end\ndata: {json.dumps({'count': count})}\n\n" if event_stream else ''
+            writer.finish(trailer.encode('utf-8'))
+            logger.info(f"Stream {kind} completado: {count} elementos")
+        except ClientDisconnected as e:
+            logger.info(f"Stream {kind} detenido: cliente desconectado tras "
+                        f"{writer.written} elementos ({e})")
+    
+    def send_json_response(self, status_code, data, headers=None):
         """Enviar respuesta JSON"""
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         
-        response_json = json.dumps(data, indent=2, ensure_ascii=False)
-        self.wfile.write(response_json.encode('utf-8'))
+        body = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
 class QBTCKernelServer:
     """Servidor principal del Kernel QBTC"""
     
-    def __init__(self, host=SERVER_HOST, port=SERVER_PORT):
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, enable_jobs=True,
+                 request_timeout=REQUEST_TIMEOUT_SECONDS, max_connections=MAX_CONNECTIONS):
         self.host = host
         self.port = port
+        self.request_timeout = request_timeout
+        self.max_connections = max_connections
         self.kernel = QBTCPureKernel()
+        self.engine = PrimeResonanceEngine()
+        self.jobs = JobManager(engine=self.engine) if enable_jobs else None
+        self.prime_table = None
+        self.counters = SharedCounters()
         self.server = None
         self.running = False
         self.metrics = {
-            'requests_processed': 0,
-            'states_processed': 0,
-            'intentions_manifested': 0,
             'uptime_start': datetime.now()
         }
         
@@ -160,46 +630,90 @@ class QBTCKernelServer:
     def create_handler(self):
         """Crear handler con instancia del kernel"""
         def handler(*args, **kwargs):
-            return QBTCKernelHandler(*args, kernel_instance=self.kernel, **kwargs)
+            return QBTCKernelHandler(*args, kernel_instance=self.kernel,
+                                     job_manager=self.jobs, engine=self.engine,
+                                     prime_table=self.prime_table, counters=self.counters,
+                                     request_timeout=self.request_timeout, **kwargs)
         return handler
     
+    def create_http_server(self, bind_and_activate=True):
+        """Crear el servidor HTTP: un hilo por conexión, acotado a max_connections"""
+        return BoundedThreadingHTTPServer((self.host, self.port), self.create_handler(),
+                                          bind_and_activate, self.max_connections)
+    
+    def warm_up(self, limit=WARM_PRIME_LIMIT, phase_limit=WARM_PHASE_LIMIT):
+        """Precalcular la criba de /is_prime, las tablas de fases y las perezosas del motor"""
+        if self.prime_table is None or len(self.prime_table) <= limit:
+            started = time.perf_counter()
+            self.prime_table = sieve_bytearray(limit)
+            if QBTCConstants.PHASE_TABLE_LIMIT < phase_limit:
+                QBTCConstants.build_phase_tables(phase_limit)
+            # Un reporte pequeño materializa NumPy diferido y las tablas del motor
+            self.engine.get_qbtc_analysis_report(self.engine.generate_primes_sieve(1000))
+            logger.info(f"Criba hasta {limit} y fases hasta {phase_limit} precalculadas en "
+                        f"{time.perf_counter() - started:.2f}s")
+    
+    def log_endpoints(self):
+        """Listar endpoints disponibles en el log"""
+        logger.info("Endpoints disponibles:")
+        logger.info("  GET  /health   - Health check")
+        logger.info("  GET  /status   - Estado del sistema")
+        logger.info("  GET  /constants - Constantes universales")
+        logger.info("  GET  /metrics  - Contadores agregados")
+        logger.info("  GET  /is_prime?n= - Test de primalidad")
+        logger.info("  POST /process  - Procesar estado cuántico")
+        logger.info("  POST /manifest - Manifestar intención")
+        logger.info("  GET  /primes   - Primos de un rango (JSON o binario por Accept)")
+        if self.jobs is not None:
+            logger.info("  POST /jobs     - Encolar trabajo largo del motor de primos")
+            logger.info("  GET  /jobs/{id} - Progreso y resultado de un trabajo")
+            logger.info("  DELETE /jobs/{id} - Cancelar trabajo")
+        logger.info("  GET  /stream/{primes|twin_primes|sacred_sequence} - Resultados "
+                    "incrementales (SSE o NDJSON)")
+    
     def start_server(self):
         """Iniciar el servidor HTTP"""
         try:
-            handler_class = self.create_handler()
-            self.server = HTTPServer((self.host, self.port), handler_class)
+            self.warm_up()
+            # Un hilo por conexión: los endpoints interactivos no esperan a /jobs
+            self.server = self.create_http_server()
             self.running = True
+            if threading.current_thread() is threading.main_thread():
+                # SIGTERM termina serve_forever (shutdown() desde otro hilo) y el drenado
+                # se hace aquí, en el hilo principal, antes de que salga el proceso
+                signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(
+                    target=self.server.shutdown, daemon=True).start())
             
             logger.info(f"Servidor QBTC Kernel iniciado en http://{self.host}:{self.port}")
-            logger.info("Endpoints disponibles:")
-            logger.info("  GET  /health   - Health check")
-            logger.info("  GET  /status   - Estado del sistema")
-            logger.info("  GET  /constants - Constantes universales")
-            logger.info("  POST /process  - Procesar estado cuántico")
-            logger.info("  POST /manifest - Manifestar intención")
+            self.log_endpoints()
             
             # Iniciar thread para métricas
             metrics_thread = threading.Thread(target=self.log_metrics, daemon=True)
             metrics_thread.start()
             
-            # Servir indefinidamente
+            # Servir hasta SIGTERM o Ctrl+C
             self.server.serve_forever()
             
         except KeyboardInterrupt:
             logger.info("Recibida señal de interrupción...")
-            self.stop_server()
         except Exception as e:
             logger.error(f"Error fatal del servidor: {e}")
+        finally:
             self.stop_server()
     
-    def stop_server(self):
-        """Detener el servidor"""
+    def stop_server(self, drain_timeout=DRAIN_TIMEOUT_SECONDS):
+        """Detener el servidor tras terminar las peticiones en curso"""
         if self.server and self.running:
             logger.info("Deteniendo servidor QBTC Kernel...")
             self.running = False
-            self.server.shutdown()
+            remaining = self.server.drain(drain_timeout)
+            if remaining:
+                logger.warning(f"{remaining} conexiones sin terminar tras {drain_timeout}s")
+            if self.jobs is not None:
+                self.jobs.shutdown()
             self.server.server_close()
-            logger.info("Servidor detenido")
+            logger.info(f"Servidor detenido ({self.server.rejected} conexiones rechazadas "
+                        f"por saturación)")
     
     def log_metrics(self):
         """Log periódico de métricas del sistema"""
@@ -207,13 +721,18 @@ class QBTCKernelServer:
             time.sleep(60)  # Log cada minuto
             
             uptime = datetime.now() - self.metrics['uptime_start']
+            totals = self.counters.totals()
+            jobs = self.jobs.stats() if self.jobs is not None else {}
             logger.info(f"MÉTRICAS SISTEMA - Uptime: {uptime}, "
-                       f"Requests: {self.metrics['requests_processed']}, "
-                       f"States: {self.metrics['states_processed']}, "
-                       f"Intentions: {self.metrics['intentions_manifested']}")
+                       f"Requests: {totals['requests_processed']}, "
+                       f"States: {totals['states_processed']}, "
+                       f"Intentions: {totals['intentions_manifested']}, "
+                       f"Primality: {totals['is_prime_queries']}, "
+                       f"Jobs: {jobs}")
 
 def main():
     """Función principal"""
+    configure_logging()
     server = QBTCKernelServer()
     
     try:
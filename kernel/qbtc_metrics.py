@@ -0,0 +1,77 @@
+# qbtc_metrics.py
+# Contadores de métricas del Kernel QBTC en memoria compartida - un slot por
+# proceso trabajador, agregables desde cualquier proceso tras un fork
+
+import copy
+import os
+import threading
+from typing import Dict, Iterable, List
+
+# Contadores registrados por el handler HTTP
+COUNTER_NAMES = ('requests_processed', 'states_processed', 'intentions_manifested',
+                 'is_prime_queries')
+
+
+class SharedCounters:
+    """
+    Contadores enteros por slot sobre memoria anónima compartida
+
+    La memoria se reserva antes de hacer fork, de modo que padre e hijos ven
+    los mismos valores; cada proceso escribe solo en su slot (for_slot) y
+    cualquiera puede leer los totales agregados.
+    """
+
+    def __init__(self, names: Iterable[str] = COUNTER_NAMES, slots: int = 1):
+        # multiprocessing solo se importa al crear contadores (arranque rápido)
+        from multiprocessing.sharedctypes import RawArray
+
+        self.names = tuple(names)
+        self.slots = slots
+        self.slot = 0
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._values = RawArray('Q', len(self.names) * slots)
+        self._pids = RawArray('q', slots)
+        self._restarts = RawArray('Q', 1)
+        self._pids[0] = os.getpid()
+        self._lock = threading.Lock()
+
+    def for_slot(self, slot: int) -> 'SharedCounters':
+        """Vista que escribe en otro slot (con su propio lock, válido tras fork)"""
+        view = copy.copy(self)
+        view.slot = slot
+        view._lock = threading.Lock()
+        return view
+
+    def bind_process(self, pid: int = None):
+        """Asocia el slot de esta vista a un proceso"""
+        self._pids[self.slot] = pid or os.getpid()
+
+    def increment(self, name: str, amount: int = 1):
+        """Suma amount al contador del slot propio"""
+        position = self.slot * len(self.names) + self._index[name]
+        with self._lock:
+            self._values[position] += amount
+
+    def record_restart(self):
+        """Cuenta un reinicio de trabajador (solo lo escribe el supervisor)"""
+        self._restarts[0] += 1
+
+    @property
+    def restarts(self) -> int:
+        return self._restarts[0]
+
+    def per_slot(self) -> List[Dict[str, int]]:
+        """Valores de cada slot junto con el pid asociado"""
+        width = len(self.names)
+        return [{'slot': slot, 'pid': self._pids[slot],
+                 **dict(zip(self.names, self._values[slot * width:(slot + 1) * width]))}
+                for slot in range(self.slots)]
+
+    def totals(self) -> Dict[str, int]:
+        """Suma de cada contador sobre todos los slots"""
+        width = len(self.names)
+        return {name: sum(self._values[i::width]) for i, name in enumerate(self.names)}
+
+    def snapshot(self) -> Dict:
+        """Totales, detalle por slot y reinicios"""
+        return {'totals': self.totals(), 'workers': self.per_slot(), 'restarts': self.restarts}
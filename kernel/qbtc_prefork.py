@@ -0,0 +1,219 @@
+# qbtc_prefork.py
+# Modo pre-fork del Servidor del Kernel QBTC - el proceso padre precalcula
+# la criba y las tablas de fases (QBTCConstants.build_phase_tables) una sola
+# vez y crea N procesos trabajadores que las comparten copy-on-write y aceptan
+# en el mismo puerto (SO_REUSEPORT), con supervisión, reinicio de trabajadores
+# caídos y métricas agregadas
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+from qbtc_kernel_server import (DRAIN_TIMEOUT_SECONDS, LISTEN_BACKLOG, SERVER_HOST, SERVER_PORT,
+                                WARM_PRIME_LIMIT, QBTCKernelServer, configure_logging)
+from qbtc_metrics import COUNTER_NAMES, SharedCounters
+
+# Configuración
+RESTART_WINDOW_SECONDS = 60    # Ventana para contar reinicios
+MAX_RESTARTS_PER_WINDOW = 10   # Más reinicios en la ventana detienen el servidor
+# Espera a los trabajadores antes de SIGKILL: su drenado más un margen para salir
+SHUTDOWN_TIMEOUT_SECONDS = DRAIN_TIMEOUT_SECONDS + 5
+# Sin SO_REUSEPORT los trabajadores aceptan sobre el socket heredado del padre
+REUSE_PORT = hasattr(socket, 'SO_REUSEPORT')
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkKernelServer(QBTCKernelServer):
+    """Servidor del Kernel QBTC con procesos trabajadores supervisados"""
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, workers=None,
+                 warm_limit=WARM_PRIME_LIMIT):
+        # Los trabajos en segundo plano viven en un único proceso: /jobs queda desactivado
+        super().__init__(host, port, enable_jobs=False)
+        self.workers = workers or os.cpu_count() or 1
+        self.warm_limit = warm_limit
+        self.counters = SharedCounters(COUNTER_NAMES, slots=self.workers)
+        self.children = {}  # pid -> slot
+        self.restart_times = []
+        self.listener = None
+
+    def create_socket(self, listen):
+        """Crear socket TCP en (host, port) con SO_REUSEPORT si está disponible"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if REUSE_PORT:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        if listen:
+            sock.listen(LISTEN_BACKLOG)
+        return sock
+
+    def bind(self):
+        """Reservar el puerto en el padre (escuchando solo si no hay SO_REUSEPORT)"""
+        self.listener = self.create_socket(listen=not REUSE_PORT)
+        self.port = self.listener.getsockname()[1]
+
+    def spawn_worker(self, slot):
+        """Crear un proceso trabajador para un slot"""
+        pid = os.fork()
+        if pid == 0:
+            self.run_worker(slot)
+        self.children[pid] = slot
+        logger.info(f"Trabajador {slot} iniciado (pid {pid})")
+
+    def run_worker(self, slot):
+        """Cuerpo del proceso trabajador: sirve HTTP hasta SIGTERM (no retorna)"""
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C lo gestiona el padre
+            self.counters = self.counters.for_slot(slot)
+            self.counters.bind_process()
+
+            if REUSE_PORT:
+                # Socket propio en el mismo puerto: el kernel reparte las conexiones
+                self.listener.close()
+                self.listener = self.create_socket(listen=True)
+
+            httpd = self.create_http_server(bind_and_activate=False)
+            httpd.socket.close()
+            httpd.socket = self.listener
+            httpd.server_name, httpd.server_port = self.host, self.port
+            self.server = httpd
+
+            # shutdown() espera al bucle de serve_forever: se invoca desde otro hilo
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(
+                target=httpd.shutdown, daemon=True).start())
+            httpd.serve_forever()
+            # Terminar las peticiones en curso antes de salir
+            remaining = httpd.drain()
+            if remaining:
+                logger.warning(f"Trabajador {slot}: {remaining} conexiones sin terminar")
+        except Exception as e:
+            logger.error(f"Error fatal en trabajador {slot}: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def signal_workers(self, signum):
+        """Enviar una señal a todos los trabajadores vivos"""
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def request_stop(self, signum=None, frame=None):
+        """Iniciar la parada: los trabajadores terminan y supervise() retorna"""
+        self.running = False
+        self.signal_workers(signal.SIGTERM)
+
+    def allow_restart(self):
+        """Limitar reinicios para no entrar en un bucle de caídas"""
+        now = time.monotonic()
+        self.restart_times = [t for t in self.restart_times if now - t < RESTART_WINDOW_SECONDS]
+        if len(self.restart_times) >= MAX_RESTARTS_PER_WINDOW:
+            return False
+        self.restart_times.append(now)
+        return True
+
+    def supervise(self):
+        """Esperar a los trabajadores y reiniciar los que terminen inesperadamente"""
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            slot = self.children.pop(pid, None)
+            if slot is None or not self.running:
+                continue
+
+            logger.warning(f"Trabajador {slot} (pid {pid}) terminó con código "
+                           f"{os.waitstatus_to_exitcode(status)}")
+            if not self.allow_restart():
+                logger.error(f"Más de {MAX_RESTARTS_PER_WINDOW} reinicios en "
+                             f"{RESTART_WINDOW_SECONDS}s; deteniendo servidor")
+                self.request_stop()
+                continue
+            self.counters.record_restart()
+            self.spawn_worker(slot)
+
+    def start_server(self):
+        """Precalcular tablas, crear los trabajadores y supervisarlos"""
+        try:
+            self.warm_up(self.warm_limit)
+            self.bind()
+            # Lo precalculado queda fuera del GC: recolectar en un hijo no toca sus páginas
+            gc.freeze()
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGTERM, self.request_stop)
+
+            self.running = True
+            for slot in range(self.workers):
+                self.spawn_worker(slot)
+
+            logger.info(f"Servidor QBTC Kernel pre-fork iniciado en http://{self.host}:{self.port} "
+                        f"con {self.workers} trabajadores")
+            self.log_endpoints()
+
+            metrics_thread = threading.Thread(target=self.log_metrics, daemon=True)
+            metrics_thread.start()
+
+            self.supervise()
+
+        except KeyboardInterrupt:
+            logger.info("Recibida señal de interrupción...")
+        except Exception as e:
+            logger.error(f"Error fatal del servidor: {e}")
+        finally:
+            self.stop_server()
+
+    def stop_server(self):
+        """Detener trabajadores (SIGTERM y, tras el plazo, SIGKILL) y cerrar el socket"""
+        self.request_stop()
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT_SECONDS
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.children.pop(pid, None)
+            elif time.monotonic() > deadline:
+                logger.warning("Trabajadores sin terminar; enviando SIGKILL")
+                self.signal_workers(signal.SIGKILL)
+                deadline = float('inf')
+            else:
+                time.sleep(0.05)
+        self.children.clear()
+
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            logger.info("Servidor pre-fork detenido")
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Servidor del Kernel QBTC en modo pre-fork')
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos trabajadores (por defecto, núcleos disponibles)')
+    parser.add_argument('--warm-limit', type=int, default=WARM_PRIME_LIMIT,
+                        help='Límite de la criba precalculada compartida')
+    args = parser.parse_args()
+
+    configure_logging()
+    server = PreforkKernelServer(args.host, args.port, args.workers, args.warm_limit)
+    server.start_server()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
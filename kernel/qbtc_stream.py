@@ -0,0 +1,176 @@
+# qbtc_stream.py
+# Streaming de resultados incrementales del Kernel QBTC - emite primos o
+# entradas de la secuencia sagrada según se producen (SSE o NDJSON por
+# chunked transfer encoding), con memoria constante en el servidor
+
+import json
+import select
+import socket
+import time
+from typing import Callable, Dict, Iterator, NamedTuple
+
+from qbtc_job_manager import MAX_LIMIT, MAX_SACRED_COUNT, REQUIRED, validate_params
+
+# Configuración
+STREAM_PATH = '/stream'
+SSE_CONTENT_TYPE = 'text/event-stream'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 512          # Elementos máximos por chunk escrito
+STREAM_FLUSH_INTERVAL = 0.05     # Segundos entre envíos de lotes incompletos
+STREAM_WRITE_TIMEOUT = 30        # Segundos antes de abandonar un cliente que no lee
+
+
+class ClientDisconnected(Exception):
+    """El cliente cerró la conexión o dejó de leer durante el stream"""
+
+
+class StreamKind(NamedTuple):
+    """Tipo de stream: generador del motor, parámetros y formato de elementos"""
+    source: Callable
+    params: Dict[str, tuple]
+    render: Callable = int
+
+
+# Parámetros por tipo: nombre -> (valor por defecto, mínimo, máximo)
+STREAM_KINDS: Dict[str, StreamKind] = {
+    'primes': StreamKind(lambda engine, p: engine.iter_primes(p['limit'], p['start']),
+                         {'limit': (REQUIRED, 2, MAX_LIMIT), 'start': (0, 0, MAX_LIMIT)}),
+    'twin_primes': StreamKind(lambda engine, p: engine.iter_twin_primes(p['limit'], p['start']),
+                              {'limit': (REQUIRED, 2, MAX_LIMIT), 'start': (0, 0, MAX_LIMIT)},
+                              list),
+    # Orden de aceptación: la modulación QBTC requiere la secuencia completa
+    'sacred_sequence': StreamKind(lambda engine, p: engine.iter_sacred_primes(p['count']),
+                                  {'count': (50, 1, MAX_SACRED_COUNT)}),
+}
+
+
+def parse_stream_request(kind: str, query: Dict[str, list]) -> Dict:
+    """
+    Valida tipo y parámetros de query string de un stream
+
+    Raises:
+        ValueError: Tipo desconocido o parámetro inválido
+    """
+    if kind not in STREAM_KINDS:
+        raise ValueError(f"Stream desconocido: {kind!r} "
+                         f"(admitidos: {', '.join(sorted(STREAM_KINDS))})")
+    params = {}
+    for name, values in query.items():
+        if name == 'format':
+            continue
+        try:
+            params[name] = int(values[-1])
+        except ValueError:
+            raise ValueError(f"'{name}' debe ser un entero")
+    return validate_params(STREAM_KINDS[kind].params, params, kind)
+
+
+def wants_event_stream(accept: str, query: Dict[str, list]) -> bool:
+    """SSE si el cliente lo pide por Accept o ?format=sse; NDJSON en otro caso"""
+    requested = query.get('format', [''])[-1].lower()
+    if requested:
+        return requested == 'sse'
+    return SSE_CONTENT_TYPE in (accept or '')
+
+
+def encode_ndjson(items: list, first_index: int) -> bytes:
+    """Una línea JSON por elemento"""
+    return ''.join(json.dumps(item) + '\n' for item in items).encode('utf-8')
+
+
+def encode_sse(items: list, first_index: int) -> bytes:
+    """Un evento SSE por elemento con id = posición en el stream"""
+    return ''.join(f"id: {first_index + i}\ndata: {json.dumps(item)}\n\n"
+                   for i, item in enumerate(items)).encode('utf-8')
+
+
+class ChunkedStreamWriter:
+    """
+    Escritor de cuerpo HTTP/1.1 chunked con lotes y detección de desconexión
+
+    Con clientes HTTP/1.0 (chunked=False) los datos se escriben tal cual y el
+    final del cuerpo lo marca el cierre de la conexión.
+
+    El control de flujo es el propio socket: un cliente lento bloquea la
+    escritura y con ella el avance del generador (como mucho un lote en
+    memoria); si no lee en STREAM_WRITE_TIMEOUT segundos se abandona.
+    """
+
+    def __init__(self, wfile, connection, encode: Callable[[list, int], bytes], chunked=True,
+                 batch_size=STREAM_BATCH_SIZE, flush_interval=STREAM_FLUSH_INTERVAL,
+                 write_timeout=STREAM_WRITE_TIMEOUT):
+        self.wfile = wfile
+        self.connection = connection
+        self.encode = encode
+        self.chunked = chunked
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        connection.settimeout(write_timeout)
+
+    def client_disconnected(self) -> bool:
+        """Comprueba sin bloquear si el cliente cerró su extremo de la conexión"""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if not readable:
+                return False
+            return self.connection.recv(1, socket.MSG_PEEK) == b''
+        except (OSError, ValueError):
+            return True
+
+    def write_chunk(self, data: bytes):
+        """Escribe un chunk; un error de socket se traduce en ClientDisconnected"""
+        if self.chunked:
+            data = b'%X\r\n%s\r\n' % (len(data), data)
+        try:
+            self.wfile.write(data)
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, socket.timeout, OSError) as e:
+            raise ClientDisconnected(str(e)) from e
+
+    def write_items(self, items: list, render: Callable):
+        """Codifica y escribe un lote de elementos"""
+        self.write_chunk(self.encode([render(item) for item in items], self.written))
+        self.written += len(items)
+
+    def pump(self, source: Iterator, render: Callable) -> int:
+        """
+        Consume el generador escribiendo lotes hasta agotarlo o perder al cliente
+
+        El primer elemento se envía en cuanto se produce; después se agrupan
+        hasta batch_size elementos o hasta que pasen flush_interval segundos
+        desde el último envío (un generador lento emite elemento a elemento).
+        El generador se cierra siempre, deteniendo el cálculo si el cliente se
+        desconecta.
+
+        Returns:
+            int: Elementos enviados
+
+        Raises:
+            ClientDisconnected: El cliente cerró la conexión o dejó de leer
+        """
+        batch = []
+        last_flush = None
+        try:
+            for item in source:
+                batch.append(item)
+                now = time.monotonic()
+                if (last_flush is None or len(batch) >= self.batch_size
+                        or now - last_flush >= self.flush_interval):
+                    if self.client_disconnected():
+                        raise ClientDisconnected('conexión cerrada por el cliente')
+                    self.write_items(batch, render)
+                    batch = []
+                    last_flush = now
+            if batch:
+                self.write_items(batch, render)
+        finally:
+            source.close()
+        return self.written
+
+    def finish(self, trailer: bytes = b''):
+        """Escribe el último evento opcional y el chunk terminador"""
+        if trailer:
+            self.write_chunk(trailer)
+        if self.chunked:
+            self.write_chunk(b'')
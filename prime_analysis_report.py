@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Reporte de Análisis QBTC con Evaluación Diferida
+QuantumLeverageEngine - Métricas bajo Demanda
+
+LazyAnalysisReport es un Mapping de solo lectura con las mismas claves que el
+reporte de get_qbtc_analysis_report (que lo devuelve con lazy=True y, por
+defecto, lo materializa como dict): cada campo se calcula en su primer
+acceso y queda memorizado. Los intermedios compartidos (gaps, fases, senos,
+z-mods, conteo sagrado, mejora QBTC...) son nodos de un pequeño grafo de
+dependencias, de modo que consultar solo `resonance_factor` cuesta únicamente
+sus dependencias y ninguna métrica se calcula dos veces.
+
+El reporte trabaja sobre una copia de la serie tomada al crearlo, de modo
+que modificar la lista original no altera los campos pendientes. Una serie
+vacía da un reporte sin claves (igual a {}). to_dict() materializa todo como
+dict anidado (serializable a JSON).
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Dict, Tuple
+
+from prime_array import PrimeArray
+from quantum_resonance_config import QBTCConstants
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: solo para copiar series ndarray
+np = lazy_optional_import('numpy')
+
+# Claves del reporte en el orden del reporte original
+REPORT_FIELDS = ('total_primes', 'min_prime', 'max_prime', 'average_gap', 'max_gap', 'min_gap',
+                 'twin_prime_count', 'palindromic_count', 'resonance_factor', 'qbtc_metrics',
+                 'system_version', 'analysis_timestamp')
+QBTC_METRIC_FIELDS = ('z_complex_magnitude', 'lambda_7919', 'prime_7919', 'golden_ratio',
+                      'quantum_phase_distribution', 'z_modulation_coherence',
+                      'lambda_resonance_strength', 'sacred_prime_density',
+                      'qbtc_optimization_score')
+SYSTEM_VERSION = 'QBTC-Enhanced v1.0'
+ANALYSIS_TIMESTAMP = '2025-08-14'
+# Primos finales cuya fase se lista en quantum_phase_distribution
+PHASE_DISTRIBUTION_SIZE = 10
+
+# Grafo de nodos: nombre -> (etapa de perfilado o None, función(report) -> valor)
+_NODES: Dict[str, Tuple[str, Callable]] = {}
+
+
+def _node(name: str, stage: str = None) -> Callable:
+    """Registra una función como nodo del grafo de dependencias"""
+    def register(func: Callable) -> Callable:
+        _NODES[name] = (stage, func)
+        return func
+    return register
+
+
+# Intermedios compartidos
+
+@_node('gaps')
+def _gaps(report):
+    primes = report.primes
+    return [primes[i + 1] - primes[i] for i in range(len(primes) - 1)]
+
+
+@_node('sacred_count')
+def _sacred_count(report):
+    return report.engine.count_sacred_primes(report.primes)
+
+
+@_node('phases')
+def _phases(report):
+    return QBTCConstants.get_quantum_phases(report.primes)
+
+
+@_node('sin_phases')
+def _sin_phases(report):
+    return QBTCConstants.get_sin_quantum_phases(report.primes)
+
+
+@_node('z_modulations')
+def _z_modulations(report):
+    return report.engine._z_modulations(report.primes)
+
+
+@_node('qbtc_enhancement')
+def _qbtc_enhancement(report):
+    return report.engine._calculate_qbtc_resonance_enhancement(report.primes,
+                                                              report.value('phases'))
+
+
+# Análisis básico
+
+@_node('total_primes')
+def _total_primes(report):
+    return len(report.primes)
+
+
+@_node('min_prime')
+def _min_prime(report):
+    return min(report.primes)
+
+
+@_node('max_prime')
+def _max_prime(report):
+    return max(report.primes)
+
+
+@_node('average_gap', 'basic_analysis')
+def _average_gap(report):
+    gaps = report.value('gaps')
+    return sum(gaps) / len(gaps) if gaps else 0
+
+
+@_node('max_gap', 'basic_analysis')
+def _max_gap(report):
+    gaps = report.value('gaps')
+    return max(gaps) if gaps else 0
+
+
+@_node('min_gap', 'basic_analysis')
+def _min_gap(report):
+    gaps = report.value('gaps')
+    return min(gaps) if gaps else 0
+
+
+@_node('twin_prime_count', 'basic_analysis')
+def _twin_prime_count(report):
+    return len(report.engine.find_twin_primes(report.value('max_prime'), as_array=True))
+
+
+@_node('palindromic_count', 'basic_analysis')
+def _palindromic_count(report):
+    return len([p for p in report.primes if report.engine.is_palindromic(p)])
+
+
+@_node('resonance_factor', 'basic_analysis')
+def _resonance_factor(report):
+    if len(report.primes) < 2:
+        return 0.0
+    return report.engine._calculate_resonance_factor(
+        report.primes, report.value('sacred_count'), report.value('gaps'),
+        report.value('qbtc_enhancement'))
+
+
+# Métricas QBTC
+
+@_node('quantum_phase_distribution', 'qbtc_metrics')
+def _quantum_phase_distribution(report):
+    return [QBTCConstants.get_quantum_phase(p)
+            for p in report.primes[-PHASE_DISTRIBUTION_SIZE:]]
+
+
+@_node('z_modulation_coherence', 'qbtc_metrics')
+def _z_modulation_coherence(report):
+    return report.engine._calculate_z_modulation_coherence(report.primes,
+                                                          report.value('z_modulations'))
+
+
+@_node('lambda_resonance_strength', 'qbtc_metrics')
+def _lambda_resonance_strength(report):
+    return report.engine._calculate_lambda_resonance_strength(report.primes,
+                                                             report.value('sin_phases'))
+
+
+@_node('sacred_prime_density', 'qbtc_metrics')
+def _sacred_prime_density(report):
+    return report.value('sacred_count') / len(report.primes)
+
+
+@_node('qbtc_optimization_score', 'qbtc_metrics')
+def _qbtc_optimization_score(report):
+    return report.engine._calculate_qbtc_optimization_score(
+        report.primes, report.value('sacred_count'), report.value('z_modulation_coherence'),
+        report.value('lambda_resonance_strength'), report.value('qbtc_enhancement'))
+
+
+# Campos constantes: no dependen de la serie
+_CONSTANTS = {
+    'z_complex_magnitude': QBTCConstants.Z_MAGNITUDE,
+    'lambda_7919': QBTCConstants.LAMBDA_7919,
+    'prime_7919': QBTCConstants.PRIME_7919,
+    'golden_ratio': QBTCConstants.GOLDEN_RATIO,
+    'system_version': SYSTEM_VERSION,
+    'analysis_timestamp': ANALYSIS_TIMESTAMP,
+}
+
+
+def _snapshot(primes):
+    """Copia inmutable de la serie: PrimeArray se comparte, ndarray se copia y el resto es tupla"""
+    if isinstance(primes, PrimeArray):
+        return primes
+    if np is not None and isinstance(primes, np.ndarray):
+        return primes.copy()
+    return tuple(primes)
+
+
+class LazyAnalysisReport(Mapping):
+    """
+    Reporte QBTC de solo lectura cuyos campos se calculan en su primer acceso
+
+    Se comporta como el dict del reporte original (indexación, get, keys,
+    items, `in`, ==, {**report}); 'qbtc_metrics' es a su vez un Mapping
+    diferido que comparte la memoización del reporte.
+    """
+
+    def __init__(self, engine, primes, sacred_count: int = None, snapshot: bool = True):
+        """
+        Args:
+            engine: PrimeResonanceEngine que aporta los cálculos
+            primes: Serie de primos (lista, PrimeArray o np.ndarray)
+            sacred_count (int): Conteo precalculado de primos sagrados (opcional)
+            snapshot (bool): Copiar la serie (False solo si se evalúa de inmediato)
+        """
+        self.engine = engine
+        self.primes = _snapshot(primes) if snapshot else primes
+        self._fields = REPORT_FIELDS if len(self.primes) else ()
+        self._values = dict(_CONSTANTS)
+        if sacred_count is not None:
+            self._values['sacred_count'] = sacred_count
+        self._values['qbtc_metrics'] = QBTCMetricsView(self)
+
+    def value(self, name: str):
+        """Valor memorizado de un nodo (campo o intermedio), calculándolo si falta"""
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        stage, compute = _NODES[name]
+        if stage is None:
+            result = compute(self)
+        else:
+            with self.engine._stage(stage):
+                result = compute(self)
+        self._values[name] = result
+        return result
+
+    def computed(self) -> Tuple[str, ...]:
+        """Nodos ya evaluados (campos, intermedios y constantes)"""
+        return tuple(self._values)
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return self.value(key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def to_dict(self) -> Dict:
+        """Evalúa todos los campos y devuelve el reporte como dict anidado"""
+        return {key: value.to_dict() if isinstance(value, QBTCMetricsView) else value
+                for key, value in self.items()}
+
+    def __repr__(self):
+        fields = self._fields + (QBTC_METRIC_FIELDS if self._fields else ())
+        pending = sum(1 for key in fields if key not in self._values)
+        return (f"LazyAnalysisReport(total_primes={len(self.primes)}, "
+                f"pendientes={pending})")
+
+
+class QBTCMetricsView(Mapping):
+    """Sub-reporte 'qbtc_metrics' diferido sobre la memoización del reporte"""
+
+    def __init__(self, report: LazyAnalysisReport):
+        self._report = report
+
+    def __getitem__(self, key):
+        if key not in QBTC_METRIC_FIELDS:
+            raise KeyError(key)
+        return self._report.value(key)
+
+    def __iter__(self):
+        return iter(QBTC_METRIC_FIELDS)
+
+    def __len__(self):
+        return len(QBTC_METRIC_FIELDS)
+
+    def __contains__(self, key):
+        return key in QBTC_METRIC_FIELDS
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"QBTCMetricsView({self._report!r})"
@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Contenedores Compactos de Números Primos
+QuantumLeverageEngine - Almacenamiento Tipado
+
+PrimeArray guarda primos ordenados en un buffer uint64 (np.ndarray o
+array('Q'), 8 bytes por primo frente a ~36 de una lista de int), con
+indexado e iteración compatibles con list, exportación por protocolo de
+buffer y pertenencia por búsqueda binaria. CompressedPrimeArray añade una
+forma delta + varint (LEB128) con puntos de control para acceso aleatorio,
+y PrimePairArray representa pares (p, p + offset) como los primos gemelos.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from itertools import compress, islice
+from typing import Iterable, Iterator, Tuple
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: el buffer es un array('Q')
+np = lazy_optional_import('numpy')
+
+# Elementos entre puntos de control de la forma comprimida
+COMPRESSED_BLOCK = 128
+# Elementos convertidos a int de Python por lote durante la iteración
+_ITER_BLOCK = 65536
+
+
+def _as_storage(values):
+    """Convierte valores a buffer uint64 (np.ndarray o array('Q'))"""
+    if np is not None:
+        if isinstance(values, np.ndarray):
+            return np.ascontiguousarray(values.reshape(-1), dtype=np.uint64)
+        if isinstance(values, array) and values.typecode == 'Q':
+            return np.frombuffer(values, dtype=np.uint64)
+        if not isinstance(values, Sequence):
+            # Iterables sin longitud: acumulación compacta sin lista intermedia
+            return np.frombuffer(array('Q', values), dtype=np.uint64)
+        return np.array(values, dtype=np.uint64).reshape(-1)
+    return array('Q', values)
+
+
+class PrimeArray(Sequence):
+    """
+    Secuencia ordenada de primos sobre un buffer uint64 contiguo
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, values: Iterable[int] = ()):
+        """
+        Inicializa el contenedor
+
+        Args:
+            values: Primos en orden creciente (iterable, array('Q') o np.ndarray)
+        """
+        self._data = values._data if isinstance(values, PrimeArray) else _as_storage(values)
+
+    @classmethod
+    def from_sieve(cls, sieve: bytearray, start: int = 0, stop: int = None) -> 'PrimeArray':
+        """
+        Extrae los primos de una criba sin pasar por una lista de int
+
+        Args:
+            sieve (bytearray): Criba generada por sieve_bytearray
+            start (int): Primer valor a considerar
+            stop (int): Límite exclusivo (por defecto toda la criba)
+
+        Returns:
+            PrimeArray: Primos en [start, stop)
+        """
+        stop = len(sieve) if stop is None else min(stop, len(sieve))
+        start = min(max(start, 0), stop)
+        if np is not None:
+            flags = np.frombuffer(sieve, dtype=np.uint8, count=stop - start, offset=start)
+            return cls(np.flatnonzero(flags).astype(np.uint64) + np.uint64(start))
+        return cls(array('Q', compress(range(start, stop), sieve[start:stop])))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PrimeArray(self._data[index])
+        return int(self._data[index])
+
+    def __iter__(self) -> Iterator[int]:
+        data = self._data
+        if np is None:
+            return iter(data)
+        return (p for start in range(0, len(data), _ITER_BLOCK)
+                for p in data[start:start + _ITER_BLOCK].tolist())
+
+    def __reversed__(self) -> Iterator[int]:
+        return reversed(self.tolist())
+
+    def __contains__(self, value) -> bool:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return False
+        index = self.searchsorted(value)
+        return index < len(self._data) and int(self._data[index]) == value
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PrimeArray):
+            other = other._data
+        elif not isinstance(other, (Sequence, array)) and not (
+                np is not None and isinstance(other, np.ndarray)):
+            return NotImplemented
+        if len(other) != len(self._data):
+            return False
+        if np is not None:
+            return bool(np.array_equal(self._data, np.asarray(other, dtype=np.uint64)))
+        return all(a == b for a, b in zip(self._data, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        head = ', '.join(map(str, islice(self, 8)))
+        more = ', ...' if len(self) > 8 else ''
+        return f"PrimeArray([{head}{more}], len={len(self)})"
+
+    def __array__(self, dtype=None, copy=None):
+        return self._data if dtype is None else self._data.astype(dtype)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return memoryview(self._data)
+
+    def searchsorted(self, value: int, side: str = 'left') -> int:
+        """
+        Posición de inserción de value manteniendo el orden (búsqueda binaria)
+
+        Args:
+            value (int): Valor buscado
+            side (str): 'left' o 'right', como numpy.searchsorted
+
+        Returns:
+            int: Índice de inserción
+        """
+        if value < 0:
+            return 0
+        if np is not None:
+            if value > 0xFFFFFFFFFFFFFFFF:
+                return len(self._data)
+            return int(np.searchsorted(self._data, np.uint64(value), side=side))
+        search = bisect_left if side == 'left' else bisect_right
+        return search(self._data, value)
+
+    def index(self, value, start: int = 0, stop: int = None) -> int:
+        index = self.searchsorted(value)
+        stop = len(self) if stop is None else stop
+        if start <= index < stop and value in self:
+            return index
+        raise ValueError(f"{value} no está en PrimeArray")
+
+    def count(self, value) -> int:
+        if value not in self:
+            return 0
+        return self.searchsorted(value, 'right') - self.searchsorted(value)
+
+    def buffer(self) -> memoryview:
+        """Vista memoryview sin copia del buffer uint64 subyacente"""
+        return memoryview(self._data)
+
+    def to_numpy(self):
+        """
+        Vista np.ndarray uint64 sin copia
+
+        Returns:
+            np.ndarray: Vista de los primos
+        """
+        if np is None:
+            raise ImportError("to_numpy requiere NumPy")
+        if isinstance(self._data, np.ndarray):
+            return self._data
+        return np.frombuffer(self._data, dtype=np.uint64)
+
+    def tolist(self):
+        """Copia como lista de int de Python"""
+        return self._data.tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados por el buffer de primos"""
+        return len(self._data) * 8
+
+    def compress(self, block: int = COMPRESSED_BLOCK) -> 'CompressedPrimeArray':
+        """Forma comprimida delta + varint de este contenedor"""
+        return CompressedPrimeArray.from_primes(self, block)
+
+
+def _encode_varints(deltas) -> bytes:
+    """Codifica enteros no negativos en LEB128 concatenado"""
+    if np is not None:
+        deltas = np.asarray(deltas, dtype=np.uint64)
+        sizes = np.ones(deltas.size, dtype=np.int64)
+        for shift in range(7, 64, 7):
+            sizes += deltas >= np.uint64(1 << shift)
+        offsets = np.cumsum(sizes) - sizes
+        out = np.empty(int(sizes.sum()), dtype=np.uint8)
+        for k in range(int(sizes.max()) if sizes.size else 0):
+            selected = sizes > k
+            chunk = (deltas[selected] >> np.uint64(7 * k)) & np.uint64(0x7F)
+            continuation = np.where(sizes[selected] > k + 1, 0x80, 0).astype(np.uint64)
+            out[offsets[selected] + k] = (chunk | continuation).astype(np.uint8)
+        return out.tobytes()
+
+    out = bytearray()
+    for delta in deltas:
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def _decode_varints(data: bytes, count: int = None):
+    """Decodifica LEB128 concatenado (np.ndarray uint64 o array('Q'))"""
+    if np is not None:
+        raw = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero(raw < 0x80)
+        if count is not None:
+            ends = ends[:count]
+            raw = raw[:int(ends[-1]) + 1] if ends.size else raw[:0]
+        starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+        if not ends.size:
+            return np.zeros(0, dtype=np.uint64)
+        position = np.arange(raw.size, dtype=np.int64) - np.repeat(starts, ends - starts + 1)
+        contributions = (raw & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+        return np.add.reduceat(contributions, starts)
+
+    values = array('Q')
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        if count is not None and len(values) == count:
+            break
+        value = shift = 0
+    return values
+
+
+class CompressedPrimeArray(Sequence):
+    """
+    Primos ordenados como deltas varint con puntos de control por bloque
+    """
+
+    def __init__(self, data: bytes, length: int, checkpoints, offsets, block: int):
+        """
+        Inicializa a partir de la codificación (ver from_primes)
+
+        Args:
+            data (bytes): Deltas LEB128 concatenados
+            length (int): Número de primos
+            checkpoints: Primer primo de cada bloque
+            offsets: Offset en bytes del inicio de cada bloque
+            block (int): Elementos por bloque
+        """
+        self.data = data
+        self.length = length
+        self.checkpoints = checkpoints
+        self.offsets = offsets
+        self.block = block
+
+    @classmethod
+    def from_primes(cls, primes: Iterable[int],
+                    block: int = COMPRESSED_BLOCK) -> 'CompressedPrimeArray':
+        """
+        Comprime una secuencia ordenada de primos
+
+        Args:
+            primes: Primos en orden creciente
+            block (int): Elementos entre puntos de control
+
+        Returns:
+            CompressedPrimeArray: Forma comprimida
+        """
+        values = PrimeArray(primes)
+        storage = values._data
+        length = len(values)
+        block = max(int(block), 1)
+        if np is not None:
+            deltas = np.diff(storage, prepend=np.uint64(0))
+            deltas[::block] = 0  # Cada bloque empieza en su punto de control
+            checkpoints = storage[::block].copy()
+            sizes = np.ones(length, dtype=np.int64)
+            for shift in range(7, 64, 7):
+                sizes += deltas >= np.uint64(1 << shift)
+            offsets = (np.cumsum(sizes) - sizes)[::block].copy()
+        else:
+            deltas = array('Q', (0 if i % block == 0 else storage[i] - storage[i - 1]
+                                 for i in range(length)))
+            checkpoints = storage[::block]
+            offsets = array('Q')
+            position = 0
+            for i, delta in enumerate(deltas):
+                if i % block == 0:
+                    offsets.append(position)
+                position += max(1, -(-delta.bit_length() // 7))
+        return cls(_encode_varints(deltas), length, checkpoints, offsets, block)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _decode_block(self, block_index: int):
+        start = int(self.offsets[block_index])
+        count = min(self.block, self.length - block_index * self.block)
+        # Un varint uint64 ocupa como máximo 10 bytes
+        deltas = _decode_varints(memoryview(self.data)[start:start + 10 * count], count)
+        base = int(self.checkpoints[block_index])
+        if np is not None:
+            return (np.cumsum(deltas) + np.uint64(base)).tolist()
+        values, total = [], base
+        for delta in deltas:
+            total += delta
+            values.append(total)
+        return values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return PrimeArray(self.decompress()._data[index])
+            # Rango contiguo: solo se decodifican los bloques que lo cubren
+            first, last = start // self.block, -(-stop // self.block)
+            values = [value for block_index in range(first, last)
+                      for value in self._decode_block(block_index)]
+            skip = first * self.block
+            return PrimeArray(array('Q', values[start - skip:max(stop - skip, 0)]))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("índice fuera de rango en CompressedPrimeArray")
+        block_index, position = divmod(index, self.block)
+        return self._decode_block(block_index)[position]
+
+    def __iter__(self) -> Iterator[int]:
+        for block_index in range(len(self.checkpoints)):
+            yield from self._decode_block(block_index)
+
+    def __contains__(self, value) -> bool:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return False
+        if not self.length or value < 0:
+            return False
+        block_index = bisect_right(self.checkpoints, value) - 1
+        return block_index >= 0 and value in self._decode_block(block_index)
+
+    def decompress(self) -> PrimeArray:
+        """
+        Reconstruye el PrimeArray completo
+
+        Returns:
+            PrimeArray: Primos descomprimidos
+        """
+        if np is not None:
+            # Suma acumulada global desplazada al punto de control de cada bloque
+            totals = np.cumsum(_decode_varints(self.data, self.length), dtype=np.uint64)
+            shift = self.checkpoints - totals[::self.block]
+            return PrimeArray(totals + np.repeat(shift, self.block)[:self.length])
+        return PrimeArray(array('Q', iter(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes de la codificación más los puntos de control"""
+        return len(self.data) + 16 * len(self.checkpoints)
+
+
+class PrimePairArray(Sequence):
+    """
+    Pares (p, p + offset) almacenados como un único PrimeArray de primeros elementos
+    """
+
+    __slots__ = ('firsts', 'offset')
+
+    def __init__(self, firsts: Iterable[int] = (), offset: int = 2):
+        """
+        Inicializa el contenedor de pares
+
+        Args:
+            firsts: Primer primo de cada par, en orden creciente
+            offset (int): Distancia entre los primos del par (2 para gemelos)
+        """
+        self.firsts = firsts if isinstance(firsts, PrimeArray) else PrimeArray(firsts)
+        self.offset = offset
+
+    def __len__(self) -> int:
+        return len(self.firsts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PrimePairArray(self.firsts[index], self.offset)
+        p = self.firsts[index]
+        return p, p + self.offset
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        offset = self.offset
+        return ((p, p + offset) for p in self.firsts)
+
+    def __contains__(self, pair) -> bool:
+        try:
+            p, q = pair
+        except (TypeError, ValueError):
+            return False
+        return q - p == self.offset and p in self.firsts
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PrimePairArray):
+            return self.offset == other.offset and self.firsts == other.firsts
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(other) == len(self) and all(
+            tuple(a) == b for a, b in zip(other, self))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        head = ', '.join(map(str, islice(self, 4)))
+        more = ', ...' if len(self) > 4 else ''
+        return f"PrimePairArray([{head}{more}], len={len(self)})"
+
+    def to_numpy(self):
+        """
+        Matriz (n, 2) uint64 con los pares
+
+        Returns:
+            np.ndarray: Columnas p y p + offset
+        """
+        firsts = self.firsts.to_numpy()
+        return np.stack([firsts, firsts + np.uint64(self.offset)], axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados por los primeros elementos de los pares"""
+        return self.firsts.nbytes
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de Constelaciones de Primos (k-tuplas)
+QuantumLeverageEngine - Patrones Admisibles
+
+Busca simultáneamente varias constelaciones admisibles, como (0, 2), (0, 4),
+(0, 6), (0, 2, 6) o (0, 4, 6, 10), en una única pasada de criba segmentada.
+Los candidatos se filtran por residuos de una rueda antes de consultar la
+criba, y las coincidencias se emiten por patrón a medida que se producen.
+"""
+
+import math
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from prime_sieve import iter_sieve_segments, primes_up_to
+from prime_wheel import get_wheel
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: se combinan bytes vía enteros
+np = lazy_optional_import('numpy')
+
+# Módulo de la rueda usada para filtrar candidatos (2·3·5)
+WHEEL_MODULUS = 30
+DEFAULT_SEGMENT_SIZE = 1 << 20
+
+Pattern = Tuple[int, ...]
+
+
+def normalize_pattern(pattern: Sequence[int]) -> Pattern:
+    """
+    Normaliza un patrón a desplazamientos ordenados que comienzan en 0
+
+    Args:
+        pattern (Sequence[int]): Desplazamientos de la constelación
+
+    Returns:
+        Pattern: Tupla ordenada y sin duplicados con primer elemento 0
+    """
+    offsets = sorted(set(int(o) for o in pattern))
+    if not offsets:
+        raise ValueError("El patrón de constelación no puede estar vacío")
+    return tuple(o - offsets[0] for o in offsets)
+
+
+def is_admissible(pattern: Sequence[int]) -> bool:
+    """
+    Verifica si un patrón es admisible (no cubre todos los residuos de ningún primo)
+
+    Args:
+        pattern (Sequence[int]): Desplazamientos de la constelación
+
+    Returns:
+        bool: True si el patrón puede repetirse infinitamente
+    """
+    offsets = normalize_pattern(pattern)
+    for q in primes_up_to(len(offsets)):
+        if len({o % q for o in offsets}) == q:
+            return False
+    return True
+
+
+def wheel_residues(pattern: Pattern, modulus: int = WHEEL_MODULUS) -> List[int]:
+    """
+    Residuos r (mod modulus) para los que p ≡ r puede iniciar la constelación
+
+    Args:
+        pattern (Pattern): Patrón normalizado
+        modulus (int): Módulo de la rueda
+
+    Returns:
+        List[int]: Residuos admisibles para el primer primo del patrón
+    """
+    return [r for r in get_wheel(modulus).residues
+            if all(math.gcd(r + o, modulus) == 1 for o in pattern)]
+
+
+def _match_positions(segment: bytearray, pattern: Pattern, first: int, stop: int,
+                     step: int) -> Iterator[int]:
+    """Posiciones i = first + k·step < stop con segment[i + o] == 1 para todo o"""
+    if first >= stop:
+        return
+    count = len(range(first, stop, step))
+    if np is not None:
+        view = np.frombuffer(segment, dtype=np.uint8)
+        mask = view[first:stop:step].copy()
+        for offset in pattern[1:]:
+            mask &= view[first + offset:first + offset + step * count:step][:count]
+        for k in np.flatnonzero(mask):
+            yield first + int(k) * step
+        return
+
+    combined = int.from_bytes(segment[first:stop:step], 'little')
+    for offset in pattern[1:]:
+        shifted = segment[first + offset:first + offset + step * count:step]
+        combined &= int.from_bytes(shifted, 'little')
+    matches = combined.to_bytes(count, 'little')
+    k = matches.find(1)
+    while k != -1:
+        yield first + k * step
+        k = matches.find(1, k + 1)
+
+
+def iter_constellations(limit: int, patterns: Iterable[Sequence[int]],
+                        segment_size: int = DEFAULT_SEGMENT_SIZE,
+                        start: int = 0) -> Iterator[Tuple[Pattern, int]]:
+    """
+    Emite las constelaciones de todos los patrones en una sola pasada de criba
+
+    Una coincidencia (pattern, p) indica que p + o es primo para cada
+    desplazamiento o del patrón, con p + max(o) <= limit.
+
+    Args:
+        limit (int): Límite superior para todos los primos de la constelación
+        patterns: Patrones admisibles, p.ej. [(0, 2), (0, 4), (0, 2, 6)]
+        segment_size (int): Tamaño de segmento de la criba
+        start (int): Valor mínimo del primer primo de la constelación
+
+    Yields:
+        Tuple[Pattern, int]: Patrón normalizado y primer primo, por segmento
+    """
+    normalized = []
+    for pattern in patterns:
+        offsets = normalize_pattern(pattern)
+        if not is_admissible(offsets):
+            raise ValueError(f"Patrón no admisible: {tuple(pattern)}")
+        if offsets not in normalized:
+            normalized.append(offsets)
+    if not normalized:
+        return
+
+    modulus = WHEEL_MODULUS
+    residues = {offsets: wheel_residues(offsets, modulus) for offsets in normalized}
+    overlap = max(offsets[-1] for offsets in normalized)
+
+    for low, high, segment in iter_sieve_segments(limit, max(segment_size, 2 * modulus),
+                                                  start, overlap):
+        for offsets in normalized:
+            # Solo inicios cuyo último elemento no supera el límite
+            stop = min(high, limit - offsets[-1] + 1) - low
+            matches = []
+            # Primer giro de la rueda: los primos 2, 3, 5 pueden formar parte del patrón
+            for p in range(low, min(low + stop, modulus)):
+                if all(segment[p - low + o] for o in offsets):
+                    matches.append(p)
+            wheel_low = max(low, modulus)
+            for r in residues[offsets]:
+                first = wheel_low + (r - wheel_low) % modulus - low
+                matches.extend(low + i for i in _match_positions(segment, offsets, first,
+                                                                 stop, modulus))
+            matches.sort()
+            for p in matches:
+                yield offsets, p
+
+
+def find_constellations(limit: int, patterns: Iterable[Sequence[int]],
+                        segment_size: int = DEFAULT_SEGMENT_SIZE) -> Dict[Pattern, List[int]]:
+    """
+    Agrupa por patrón las constelaciones encontradas en una única pasada
+
+    Args:
+        limit (int): Límite superior para todos los primos de la constelación
+        patterns: Patrones admisibles
+        segment_size (int): Tamaño de segmento de la criba
+
+    Returns:
+        Dict[Pattern, List[int]]: Primer primo de cada constelación por patrón
+    """
+    patterns = [normalize_pattern(p) for p in patterns]
+    results: Dict[Pattern, List[int]] = {p: [] for p in patterns}
+    for pattern, p in iter_constellations(limit, patterns, segment_size):
+        results[pattern].append(p)
+    return results
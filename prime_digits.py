@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Primitivas Aritméticas de Dígitos
+QuantumLeverageEngine - Suma de Dígitos y Palíndromos
+
+Calcula sumas de dígitos y detecta palíndromos sin convertir a str, usando
+una tabla precomputada de sumas para bloques de 10^k. Incluye versiones por
+lotes sobre arrays de enteros y un microbenchmark contra la ruta de cadenas.
+"""
+
+import time
+from array import array
+from typing import Dict, Iterable
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: las versiones por lotes usan array
+np = lazy_optional_import('numpy')
+
+# Tabla de sumas de dígitos para bloques de DIGIT_CHUNK_EXPONENT dígitos
+DIGIT_CHUNK_EXPONENT = 4
+DIGIT_CHUNK = 10 ** DIGIT_CHUNK_EXPONENT
+
+
+def _build_chunk_tables(exponent: int):
+    """Sumas e inversiones (con ceros a la izquierda) de 0..10^exponent - 1, dígito a dígito"""
+    sums, reversed_chunk = [0], [0]
+    for _ in range(exponent):
+        # Añadir un dígito d más significativo: valor = d·10^k + resto
+        sums = [d + rest for d in range(10) for rest in sums]
+        reversed_chunk = [rest * 10 + d for d in range(10) for rest in reversed_chunk]
+    return sums, reversed_chunk
+
+
+_CHUNK_SUMS, _REVERSED_CHUNK_LIST = _build_chunk_tables(DIGIT_CHUNK_EXPONENT)
+DIGIT_SUM_TABLE = bytes(_CHUNK_SUMS)
+
+# Inversión de bloques: con ceros a la izquierda (bloques internos) y sin ellos
+# (bloque más significativo), junto con 10^dígitos del bloque superior
+_REVERSED_CHUNK = tuple(_REVERSED_CHUNK_LIST)
+_TOP_SCALE = tuple(10 ** digits
+                   for digits in range(1, DIGIT_CHUNK_EXPONENT + 1)
+                   for _ in range(10 ** (digits - 1) if digits > 1 else 0, 10 ** digits))
+_REVERSED_TOP = tuple(r // (DIGIT_CHUNK // scale) for r, scale in zip(_REVERSED_CHUNK, _TOP_SCALE))
+del _CHUNK_SUMS, _REVERSED_CHUNK_LIST
+
+
+def digit_sum(n: int) -> int:
+    """
+    Calcula la suma de dígitos decimales de un entero
+
+    Args:
+        n (int): Número (se usa su valor absoluto)
+
+    Returns:
+        int: Suma de dígitos
+    """
+    n = abs(n)
+    table = DIGIT_SUM_TABLE
+    if n < DIGIT_CHUNK:
+        return table[n]
+    total = 0
+    while n:
+        n, chunk = divmod(n, DIGIT_CHUNK)
+        total += table[chunk]
+    return total
+
+
+def is_palindromic_number(n: int) -> bool:
+    """
+    Verifica si un entero es palindrómico invirtiéndolo por bloques de 10^k
+
+    Args:
+        n (int): Número a verificar (los negativos no son palindrómicos)
+
+    Returns:
+        bool: True si es palindrómico
+    """
+    if n < 0:
+        return False
+    if n < DIGIT_CHUNK:
+        return _REVERSED_TOP[n] == n
+    if n % 10 == 0:
+        return False
+    rest = n
+    reverse = 0
+    while rest >= DIGIT_CHUNK:
+        rest, chunk = divmod(rest, DIGIT_CHUNK)
+        reverse = reverse * DIGIT_CHUNK + _REVERSED_CHUNK[chunk]
+    return reverse * _TOP_SCALE[rest] + _REVERSED_TOP[rest] == n
+
+
+def _absolute_uint64(values):
+    """Valores absolutos como vector uint64 (sin desbordar), o None si no caben"""
+    if isinstance(values, np.ndarray):
+        vector = values.reshape(-1)
+    else:
+        try:
+            vector = np.array(values, dtype=np.int64).reshape(-1)
+        except OverflowError:
+            # Enteros de Python >= 2**63: uint64 si todos son no negativos
+            try:
+                vector = np.array(values, dtype=np.uint64).reshape(-1)
+            except OverflowError:
+                return None
+    kind = vector.dtype.kind
+    if kind == 'u':
+        return vector.astype(np.uint64)
+    if kind in 'bif':
+        # |INT64_MIN| no cabe en int64, pero su patrón de bits leído como uint64 es 2**63
+        return np.abs(vector.astype(np.int64, copy=False)).view(np.uint64)
+    return None
+
+
+def digit_sums(values: Iterable[int]):
+    """
+    Calcula la suma de dígitos de un vector completo de enteros
+
+    Args:
+        values: Secuencia o np.ndarray de enteros (se usa su valor absoluto);
+            los uint64 se procesan sin pasar por int64
+
+    Returns:
+        np.ndarray int64 si NumPy está disponible, array('H') en otro caso
+    """
+    if np is not None:
+        rest = _absolute_uint64(values)
+        if rest is None:
+            # Enteros fuera de 64 bits: ruta escalar con enteros de Python
+            flat = values.reshape(-1) if isinstance(values, np.ndarray) else values
+            return np.fromiter((digit_sum(int(v)) for v in flat), dtype=np.int64)
+        table = np.frombuffer(DIGIT_SUM_TABLE, dtype=np.uint8)
+        chunk = np.uint64(DIGIT_CHUNK)
+        total = np.zeros(rest.size, dtype=np.int64)
+        while rest.any():
+            total += table[rest % chunk]
+            rest //= chunk
+        return total
+    return array('H', map(digit_sum, values))
+
+
+def palindromic_mask(values: Iterable[int]):
+    """
+    Marca qué enteros de un vector son palindrómicos
+
+    Args:
+        values: Secuencia o np.ndarray de enteros
+
+    Returns:
+        np.ndarray bool si NumPy está disponible, bytes (0/1) en otro caso
+    """
+    if np is not None:
+        original = np.asarray(values, dtype=np.int64).reshape(-1)
+        # Los negativos no son palindrómicos: con -1 // 10 == -1 el bucle no terminaría
+        rest = np.where(original > 0, original, 0)
+        reverse = np.zeros_like(original)
+        while rest.any():
+            active = rest > 0
+            reverse[active] = reverse[active] * 10 + rest[active] % 10
+            rest //= 10
+        return (reverse == original) & (original >= 0)
+    return bytes(map(is_palindromic_number, values))
+
+
+def benchmark_digit_primitives(count: int = 200000, start: int = 10 ** 6) -> Dict[str, float]:
+    """
+    Microbenchmark de las primitivas aritméticas frente a la ruta con str
+
+    Args:
+        count (int): Cantidad de enteros consecutivos a evaluar
+        start (int): Primer entero del rango
+
+    Returns:
+        Dict[str, float]: Segundos por ruta y aceleraciones relativas
+    """
+    values = range(start, start + count)
+
+    def timed(func) -> float:
+        begin = time.perf_counter()
+        func()
+        return time.perf_counter() - begin
+
+    results = {
+        'count': count,
+        'digit_sum_str': timed(lambda: [sum(int(d) for d in str(v)) for v in values]),
+        'digit_sum_table': timed(lambda: [digit_sum(v) for v in values]),
+        'palindrome_str': timed(lambda: [str(v) == str(v)[::-1] for v in values]),
+        'palindrome_arith': timed(lambda: [is_palindromic_number(v) for v in values]),
+        'digit_sums_batch': timed(lambda: digit_sums(values)),
+        'palindromic_mask_batch': timed(lambda: palindromic_mask(values)),
+    }
+    results['digit_sum_speedup'] = results['digit_sum_str'] / max(results['digit_sum_table'], 1e-9)
+    results['digit_sum_batch_speedup'] = results['digit_sum_str'] / max(results['digit_sums_batch'], 1e-9)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark_digit_primitives().items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio de Factorización de Enteros
+QuantumLeverageEngine - Estructura de Factores
+
+Factoriza enteros usando una tabla compacta de menor factor primo (SPF,
+uint32) para el rango denso y Pollard–Rho con detección de ciclos de Brent
+más allá de él. Incluye factorización por lotes y funciones divisor.
+"""
+
+import math
+import random
+from array import array
+from typing import Dict, Iterable, List
+
+from prime_sieve import primes_up_to
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: la tabla SPF usa array('I')
+np = lazy_optional_import('numpy')
+
+# Bases deterministas de Miller–Rabin para n < 3.3·10^24
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# Primos usados en la división de prueba previa a Pollard–Rho
+_TRIAL_PRIMES = tuple(primes_up_to(1000))
+
+
+def is_probable_prime(n: int) -> bool:
+    """
+    Test de Miller–Rabin (determinista para n < 3.3·10^24)
+
+    Args:
+        n (int): Número a verificar
+
+    Returns:
+        bool: True si n es primo (probable más allá del rango determinista)
+    """
+    if n < 2:
+        return False
+    for p in MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def pollard_rho_brent(n: int, seed: int = None) -> int:
+    """
+    Encuentra un factor no trivial de un compuesto impar con Pollard–Rho (Brent)
+
+    Args:
+        n (int): Número compuesto
+        seed (int): Semilla opcional para reproducibilidad
+
+    Returns:
+        int: Factor no trivial de n
+    """
+    if n % 2 == 0:
+        return 2
+    rng = random.Random(seed if seed is not None else n)
+    while True:
+        y = rng.randrange(1, n)
+        c = rng.randrange(1, n)
+        m = 128
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            # Retroceso paso a paso cuando el producto acumulado colapsa
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+
+class FactorizationService:
+    """
+    Factorización con tabla SPF densa y Pollard–Rho (Brent) para valores grandes
+    """
+
+    def __init__(self, dense_limit: int = 1000000):
+        """
+        Inicializa el servicio construyendo la tabla de menor factor primo
+
+        Args:
+            dense_limit (int): Límite superior del rango cubierto por la tabla SPF
+        """
+        self.dense_limit = max(int(dense_limit), 1)
+        self.spf = self._build_spf_table(self.dense_limit)
+
+    @staticmethod
+    def _build_spf_table(limit: int):
+        """Tabla spf[n] = menor factor primo de n (uint32) para n <= limit"""
+        # Recorriendo primos en orden descendente, el último en escribir es el menor
+        sieving_primes = primes_up_to(math.isqrt(limit))
+        if np is not None:
+            spf = np.zeros(limit + 1, dtype=np.uint32)
+            for p in reversed(sieving_primes):
+                spf[p * p::p] = p
+            unset = np.flatnonzero(spf == 0)
+            spf[unset] = unset
+            return spf
+
+        spf = array('I', bytes(4 * (limit + 1)))
+        for p in reversed(sieving_primes):
+            count = len(range(p * p, limit + 1, p))
+            spf[p * p::p] = array('I', [p]) * count
+        for n in range(limit + 1):
+            if spf[n] == 0:
+                spf[n] = n
+        return spf
+
+    def smallest_prime_factor(self, n: int) -> int:
+        """
+        Obtiene el menor factor primo de n
+
+        Args:
+            n (int): Entero >= 2
+
+        Returns:
+            int: Menor factor primo
+        """
+        if n <= self.dense_limit:
+            return int(self.spf[n])
+        for p in _TRIAL_PRIMES:
+            if n % p == 0:
+                return p
+        return min(self.factorize(n))
+
+    def factorize(self, n: int) -> Dict[int, int]:
+        """
+        Factoriza un entero en primos
+
+        Args:
+            n (int): Entero a factorizar (se usa su valor absoluto)
+
+        Returns:
+            Dict[int, int]: Primo -> exponente, en orden creciente de primos
+        """
+        n = abs(int(n))
+        factors: Dict[int, int] = {}
+        if n < 2:
+            return factors
+
+        if n > self.dense_limit:
+            for p in _TRIAL_PRIMES:
+                if p * p > n:
+                    break
+                while n % p == 0:
+                    factors[p] = factors.get(p, 0) + 1
+                    n //= p
+            if n > self.dense_limit:
+                pending = [n]
+                n = 1
+                while pending:
+                    m = pending.pop()
+                    if m <= self.dense_limit:
+                        self._peel_dense(m, factors)
+                    elif is_probable_prime(m):
+                        factors[m] = factors.get(m, 0) + 1
+                    else:
+                        d = pollard_rho_brent(m)
+                        pending.extend((d, m // d))
+
+        self._peel_dense(n, factors)
+        return dict(sorted(factors.items()))
+
+    def _peel_dense(self, n: int, factors: Dict[int, int]) -> None:
+        """Acumula en factors la factorización de n <= dense_limit vía tabla SPF"""
+        spf = self.spf
+        while n > 1:
+            p = int(spf[n])
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    def factorize_batch(self, values: Iterable[int]) -> List[Dict[int, int]]:
+        """
+        Factoriza un vector completo de enteros
+
+        Args:
+            values: Secuencia o np.ndarray de enteros
+
+        Returns:
+            List[Dict[int, int]]: Factorización de cada valor
+        """
+        return [self.factorize(int(v)) for v in values]
+
+    def divisor_sigma(self, n: int, k: int = 1) -> int:
+        """
+        Función divisor σ_k(n) = Σ d^k sobre los divisores d de n
+
+        Args:
+            n (int): Entero positivo
+            k (int): Potencia (0 = número de divisores, 1 = suma de divisores)
+
+        Returns:
+            int: σ_k(n)
+        """
+        result = 1
+        for p, e in self.factorize(n).items():
+            if k == 0:
+                result *= e + 1
+            else:
+                pk = p ** k
+                result *= (pk ** (e + 1) - 1) // (pk - 1)
+        return result
+
+    def divisor_count(self, n: int) -> int:
+        """Número de divisores τ(n) = σ_0(n)"""
+        return self.divisor_sigma(n, 0)
+
+    def euler_phi(self, n: int) -> int:
+        """Función φ de Euler a partir de la factorización"""
+        result = abs(int(n))
+        for p in self.factorize(n):
+            result -= result // p
+        return result
+
+    def divisors(self, n: int) -> List[int]:
+        """
+        Lista ordenada de divisores positivos de n
+
+        Args:
+            n (int): Entero positivo
+
+        Returns:
+            List[int]: Divisores en orden creciente
+        """
+        result = [1]
+        for p, e in self.factorize(n).items():
+            result = [d * p ** i for d in result for i in range(e + 1)]
+        return sorted(result)
+
+    def divisor_counts(self, values: Iterable[int]):
+        """
+        Calcula τ(n) para un vector de enteros dentro del rango denso
+
+        Con NumPy se pela la tabla SPF de forma vectorizada sobre todo el vector.
+
+        Args:
+            values: Secuencia o np.ndarray de enteros en [1, dense_limit]
+
+        Returns:
+            np.ndarray int64 si NumPy está disponible, List[int] en otro caso
+        """
+        if np is None:
+            return [self.divisor_count(int(v)) for v in values]
+
+        rest = np.array(values, dtype=np.int64).reshape(-1)
+        if rest.size and (rest.min() < 1 or rest.max() > self.dense_limit):
+            return np.array([self.divisor_count(int(v)) for v in rest], dtype=np.int64)
+
+        counts = np.ones(rest.size, dtype=np.int64)
+        exponent = np.zeros(rest.size, dtype=np.int64)
+        last = np.zeros(rest.size, dtype=np.int64)
+        active = rest > 1
+        while active.any():
+            p = self.spf[rest[active]].astype(np.int64)
+            same = p == last[active]
+            idx = np.flatnonzero(active)
+            exponent[idx[same]] += 1
+            new = idx[~same]
+            counts[new] *= exponent[new] + 1
+            exponent[new] = 1
+            last[new] = p[~same]
+            rest[idx] //= p
+            active = rest > 1
+        return counts * (exponent + 1)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Espectro de Correlación de Gaps entre Primos
+QuantumLeverageEngine - Pares (p, p + g) para Todos los Gaps a la Vez
+
+Cuenta, para cada g <= max_gap, los pares de primos (p, p + g) con
+p + g <= limit: la autocorrelación de la criba vista como vector 0/1.
+Cubre de una vez todos los gaps de QuantumResonanceConfig.RESONANT_GAPS
+(g = 2 son los gemelos, g = 4 los primos primos...) sin una pasada por gap.
+
+Dos métodos exactos:
+
+- 'fft': autocorrelación de la criba de impares con NumPy (rfft, |F|², irfft)
+  en O(N log N), independiente de max_gap; para límites hasta FFT_MAX_LIMIT.
+- 'blocked': criba segmentada empaquetada como entero de Python (un bit por
+  valor), con popcount(x & (x >> g)) por gap y segmento; memoria acotada
+  para cualquier N y sin NumPy. Es la más rápida para max_gap pequeños.
+
+'auto' elige FFT si NumPy está disponible, el límite cabe en memoria y hay
+suficientes gaps para amortizar la transformada.
+"""
+
+from array import array
+from typing import Dict, Iterable, Mapping, NamedTuple
+
+from prime_sieve import iter_sieve_segments, sieve_bytearray
+from quantum_resonance_config import QuantumResonanceConfig
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: sin él solo hay método 'blocked'
+np = lazy_optional_import('numpy')
+
+# Gap máximo por defecto: el mayor de RESONANT_GAPS
+DEFAULT_MAX_GAP = max(gap for gaps in QuantumResonanceConfig.RESONANT_GAPS.values()
+                      for gap in gaps)
+# Límite máximo para la FFT (memoria ~16 bytes por valor)
+FFT_MAX_LIMIT = 1 << 25
+# A partir de cuántos gaps compensa la FFT frente al conteo por bits
+FFT_MIN_GAPS = 512
+DEFAULT_SEGMENT_SIZE = 1 << 22
+METHODS = ('auto', 'fft', 'blocked')
+# Categoría de RESONANT_GAPS -> clave de RESONANCE_WEIGHTS (el resto pesa 1.0)
+GAP_CATEGORY_WEIGHT_KEYS = {'twins': 'twin_prime'}
+
+_BITS_TABLE = bytes.maketrans(b'\x00\x01', b'01')
+
+
+class GapSpectrum(NamedTuple):
+    """Pares de primos por gap: counts[g] = #{p : p, p + g primos, p + g <= limit}"""
+    limit: int
+    counts: array   # array('Q') de longitud max_gap + 1 (counts[0] = π(limit))
+    method: str
+
+    @property
+    def max_gap(self) -> int:
+        return len(self.counts) - 1
+
+    def count(self, gap: int) -> int:
+        """Pares a distancia gap (0 fuera del espectro calculado)"""
+        return self.counts[gap] if 0 <= gap <= self.max_gap else 0
+
+    def category_counts(self, categories: Mapping[str, Iterable[int]] = None) -> Dict[str, int]:
+        """
+        Pares por categoría de gaps resonantes
+
+        Args:
+            categories: nombre -> gaps (por defecto QuantumResonanceConfig.RESONANT_GAPS)
+
+        Returns:
+            Dict[str, int]: Suma de pares de los gaps de cada categoría
+        """
+        categories = QuantumResonanceConfig.RESONANT_GAPS if categories is None else categories
+        return {name: sum(self.count(gap) for gap in gaps) for name, gaps in categories.items()}
+
+    def weighted_counts(self, weights: Mapping[str, float] = None) -> Dict[str, float]:
+        """
+        Pares por categoría ponderados por RESONANCE_WEIGHTS
+
+        Args:
+            weights: categoría -> peso; por defecto el peso de RESONANCE_WEIGHTS
+                asociado en GAP_CATEGORY_WEIGHT_KEYS (1.0 si no tiene)
+
+        Returns:
+            Dict[str, float]: Conteo ponderado por categoría
+        """
+        if weights is None:
+            weights = {category: QuantumResonanceConfig.RESONANCE_WEIGHTS[key]
+                       for category, key in GAP_CATEGORY_WEIGHT_KEYS.items()}
+        return {name: count * weights.get(name, 1.0)
+                for name, count in self.category_counts().items()}
+
+    def resonance_factor(self, weights: Mapping[str, float] = None) -> float:
+        """Peso medio de los pares resonantes (1.0 si no hay ninguno)"""
+        total = sum(self.category_counts().values())
+        if not total:
+            return 1.0
+        return sum(self.weighted_counts(weights).values()) / total
+
+
+def _pack_sieve(sieve) -> int:
+    """Criba 0/1 como entero con el bit i = sieve[i]"""
+    if not sieve:
+        return 0
+    return int(bytes(sieve).translate(_BITS_TABLE)[::-1], 2)
+
+
+def _blocked_counts(limit: int, max_gap: int, segment_size: int) -> array:
+    """Conteo exacto por segmentos con un popcount por gap"""
+    counts = array('Q', bytes(8 * (max_gap + 1)))
+    for low, high, segment in iter_sieve_segments(limit, segment_size, overlap=max_gap):
+        bits = _pack_sieve(segment)
+        # Primer elemento del par dentro de [low, high); el segundo puede caer en el solape
+        left = bits & ((1 << (high - low)) - 1)
+        counts[0] += left.bit_count()
+        for gap in range(1, max_gap + 1):
+            counts[gap] += (left & (bits >> gap)).bit_count()
+    return counts
+
+
+def _fft_counts(limit: int, max_gap: int) -> array:
+    """Autocorrelación de la criba de impares por FFT (redondeo exacto a entero)"""
+    sieve = sieve_bytearray(limit)
+    counts = array('Q', bytes(8 * (max_gap + 1)))
+    counts[0] = sieve.count(1)
+    # Pares con 2: solo (2, 2 + g) con g impar
+    for gap in range(1, min(max_gap, limit - 2) + 1, 2):
+        counts[gap] = sieve[2 + gap]
+
+    odd = np.frombuffer(sieve, dtype=np.uint8)[1::2].astype(np.float64)
+    half_gap = max_gap // 2
+    size = 1 << (len(odd) + half_gap - 1).bit_length()
+    spectrum = np.fft.rfft(odd, size)
+    correlation = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, size)[:half_gap + 1]
+    for lag, value in enumerate(np.rint(correlation[1:]).astype(np.int64).tolist(), 1):
+        counts[2 * lag] = value
+    return counts
+
+
+def gap_spectrum(limit: int, max_gap: int = DEFAULT_MAX_GAP, method: str = 'auto',
+                 segment_size: int = DEFAULT_SEGMENT_SIZE) -> GapSpectrum:
+    """
+    Calcula el espectro de correlación de gaps hasta un límite
+
+    Args:
+        limit (int): Límite superior (inclusive) de ambos primos del par
+        max_gap (int): Mayor gap a contar
+        method (str): 'auto', 'fft' (requiere NumPy) o 'blocked'
+        segment_size (int): Valores por segmento del método 'blocked'
+
+    Returns:
+        GapSpectrum: Pares por gap de 0 a max_gap
+
+    Raises:
+        ValueError: Método desconocido, max_gap negativo o 'fft' sin NumPy
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método no soportado: {method!r} (admitidos: {', '.join(METHODS)})")
+    if max_gap < 0:
+        raise ValueError("max_gap debe ser >= 0")
+    if method == 'fft' and np is None:
+        raise ValueError("El método 'fft' requiere NumPy")
+    if method == 'auto':
+        use_fft = np is not None and limit <= FFT_MAX_LIMIT and max_gap >= FFT_MIN_GAPS
+        method = 'fft' if use_fft else 'blocked'
+
+    if limit < 2:
+        counts = array('Q', bytes(8 * (max_gap + 1)))
+    elif method == 'fft':
+        counts = _fft_counts(limit, max_gap)
+    else:
+        counts = _blocked_counts(limit, max_gap, segment_size)
+    return GapSpectrum(limit, counts, method)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Importación Diferida de Dependencias Opcionales
+QuantumLeverageEngine - Arranque Rápido
+
+Permite que los módulos del motor declaren NumPy (u otra dependencia
+opcional) sin pagar su importación al cargar: el módulo se ejecuta en el
+primer acceso a un atributo. Si la dependencia no está instalada, o está
+bloqueada en sys.modules, se obtiene None como con el import opcional clásico.
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_optional_import(name: str):
+    """
+    Obtiene un módulo opcional cuya ejecución se difiere hasta su primer uso
+
+    Args:
+        name (str): Nombre absoluto del módulo (p.ej. 'numpy')
+
+    Returns:
+        Módulo (diferido si aún no estaba cargado) o None si no está disponible
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.loader is None:
+        return None
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación Opcional del Motor de Resonancias
+QuantumLeverageEngine - Perfilado por Método y Etapa
+
+Registra tiempo de pared, número de llamadas y bytes asignados (tracemalloc)
+por método público y por etapa interna del PrimeResonanceEngine, con volcado
+opcional de cProfile/pstats por llamada. Desactivado, el coste es una única
+comprobación de atributo por llamada.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Optional
+
+# Contexto vacío reutilizable para etapas con el perfilado desactivado
+NULL_STAGE = nullcontext()
+
+
+class EngineProfiler:
+    """
+    Acumulador de estadísticas de tiempo, llamadas y memoria por método y etapa
+    """
+
+    def __init__(self, trace_memory: bool = False, cprofile_dir: Optional[str] = None):
+        """
+        Inicializa el perfilador
+
+        Args:
+            trace_memory (bool): Medir bytes asignados con tracemalloc
+            cprofile_dir (str): Directorio donde volcar un .pstats por llamada pública
+        """
+        self.trace_memory = trace_memory
+        self.cprofile_dir = cprofile_dir
+        self.methods: Dict[str, Dict] = {}
+        self.stages: Dict[str, Dict] = {}
+        self._depth = 0
+        self._dump_counter = 0
+        self._started_tracemalloc = False
+        # cProfile y tracemalloc se importan solo al activarse (arranque rápido)
+        self._tracemalloc = None
+        if trace_memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+        if cprofile_dir:
+            os.makedirs(cprofile_dir, exist_ok=True)
+
+    def close(self) -> None:
+        """Detiene tracemalloc si fue iniciado por este perfilador"""
+        if self._started_tracemalloc:
+            self._tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _memory(self) -> int:
+        return self._tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+    @staticmethod
+    def _record(table: Dict[str, Dict], name: str, elapsed_ns: int, allocated: int) -> None:
+        entry = table.get(name)
+        if entry is None:
+            entry = table[name] = {'calls': 0, 'total_ns': 0, 'max_ns': 0, 'allocated_bytes': 0}
+        entry['calls'] += 1
+        entry['total_ns'] += elapsed_ns
+        entry['max_ns'] = max(entry['max_ns'], elapsed_ns)
+        entry['allocated_bytes'] += max(allocated, 0)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Contexto que mide una etapa interna"""
+        memory_before = self._memory()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._record(self.stages, name, time.perf_counter_ns() - start,
+                         self._memory() - memory_before)
+
+    def call(self, name: str, func: Callable, *args, **kwargs):
+        """
+        Ejecuta y mide una llamada a método público
+
+        Solo la llamada más externa se vuelca a cProfile, ya que los perfiles
+        de cProfile no pueden anidarse.
+        """
+        profile = None
+        if self.cprofile_dir and self._depth == 0:
+            import cProfile
+            profile = cProfile.Profile()
+        memory_before = self._memory()
+        self._depth += 1
+        start = time.perf_counter_ns()
+        try:
+            if profile is not None:
+                return profile.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._depth -= 1
+            self._record(self.methods, name, elapsed, self._memory() - memory_before)
+            if profile is not None:
+                self._dump_counter += 1
+                profile.dump_stats(os.path.join(
+                    self.cprofile_dir, f"{name}-{self._dump_counter:05d}.pstats"))
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """
+        Obtiene las estadísticas acumuladas
+
+        Returns:
+            Dict[str, Dict]: {'methods': {...}, 'stages': {...}} con calls,
+                total_ns, mean_ns, max_ns y allocated_bytes por entrada
+        """
+        def export(table: Dict[str, Dict]) -> Dict[str, Dict]:
+            return {name: {**entry, 'mean_ns': entry['total_ns'] / entry['calls']}
+                    for name, entry in table.items()}
+        return {'methods': export(self.methods), 'stages': export(self.stages)}
+
+    def reset(self) -> None:
+        """Descarta las estadísticas acumuladas"""
+        self.methods.clear()
+        self.stages.clear()
+
+
+def profiled(method: Callable) -> Callable:
+    """
+    Decorador de métodos públicos del motor: mide si hay perfilador activo
+
+    El objeto instrumentado debe exponer el atributo `profiler` (None cuando
+    el perfilado está desactivado).
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        return profiler.call(name, method, self, *args, **kwargs)
+    return wrapper
+
+
+def profiled_stage(stage_name: str) -> Callable:
+    """
+    Decorador de métodos internos: registra su ejecución como etapa nombrada
+
+    Args:
+        stage_name (str): Nombre de la etapa en las estadísticas
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = self.profiler
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            with profiler.stage(stage_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
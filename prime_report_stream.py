@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Acumuladores en Streaming para Reportes de Análisis
+QuantumLeverageEngine - Reportes con Memoria Acotada
+
+Procesa secuencias de primos arbitrariamente largas (iterables, generadores o
+arrays mapeados en memoria) en bloques de tamaño fijo, acumulando sumas,
+extremos y momentos (Welford/Chan) para reproducir las métricas del reporte
+QBTC sin materializar listas intermedias de longitud completa.
+"""
+
+import math
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator
+
+from prime_array import PrimeArray
+from prime_digits import palindromic_mask
+from quantum_resonance_config import QBTCConstants
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: los bloques se procesan como listas
+np = lazy_optional_import('numpy')
+
+# Bytes estimados por primo de un bloque (valores, gaps, fases, z-mods y temporales)
+BYTES_PER_PRIME = 96
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+MIN_CHUNK_SIZE = 1024
+# Primos finales retenidos para las métricas que solo miran la cola de la serie
+TAIL_SIZE = 10
+
+
+def chunk_size_for_memory(memory_limit: int) -> int:
+    """
+    Tamaño de bloque que mantiene el pico de memoria bajo un límite
+
+    Args:
+        memory_limit (int): Presupuesto de memoria en bytes
+
+    Returns:
+        int: Número de primos por bloque
+    """
+    return max(MIN_CHUNK_SIZE, int(memory_limit) // BYTES_PER_PRIME)
+
+
+def iter_chunks(values, chunk_size: int) -> Iterator:
+    """
+    Divide una secuencia o iterable en bloques consecutivos
+
+    Los np.ndarray (incluidos np.memmap) se recorren por vistas sin copiar el
+    resto del array; cualquier otro iterable se consume con islice.
+
+    Args:
+        values: Iterable de enteros, PrimeArray, np.ndarray o np.memmap
+        chunk_size (int): Elementos por bloque
+
+    Yields:
+        np.ndarray int64 si NumPy está disponible, List[int] en otro caso
+    """
+    if np is not None and isinstance(values, PrimeArray):
+        values = values.to_numpy()
+    if np is not None and isinstance(values, np.ndarray):
+        flat = values.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            yield np.asarray(flat[start:start + chunk_size], dtype=np.int64)
+        return
+
+    iterator = iter(values)
+    while True:
+        if np is not None:
+            chunk = np.fromiter(islice(iterator, chunk_size), dtype=np.int64)
+            if not chunk.size:
+                return
+        else:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+        yield chunk
+
+
+class RunningMoments:
+    """
+    Conteo, suma, extremos y varianza poblacional combinando bloques (Chan/Welford)
+    """
+
+    def __init__(self):
+        """Inicializa los momentos vacíos"""
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def update(self, values) -> None:
+        """
+        Incorpora un bloque de valores
+
+        Args:
+            values: np.ndarray o secuencia de números
+        """
+        n = len(values)
+        if not n:
+            return
+        if np is not None and isinstance(values, np.ndarray):
+            total = values.sum().item()
+            chunk_mean = total / n
+            chunk_m2 = float(np.square(values - chunk_mean).sum())
+            low, high = values.min().item(), values.max().item()
+        else:
+            total = sum(values)
+            chunk_mean = total / n
+            chunk_m2 = sum((v - chunk_mean) ** 2 for v in values)
+            low, high = min(values), max(values)
+
+        combined = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / combined
+        self.m2 += chunk_m2 + delta * delta * self.count * n / combined
+        self.count = combined
+        self.total += total
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+    @property
+    def variance(self) -> float:
+        """Varianza poblacional de los valores acumulados"""
+        return self.m2 / self.count if self.count else 0.0
+
+
+class ReportAccumulator:
+    """
+    Estado acumulado por bloques para las métricas de get_qbtc_analysis_report
+    """
+
+    def __init__(self, sacred_primes: Iterable[int]):
+        """
+        Inicializa el acumulador
+
+        Args:
+            sacred_primes: Primos sagrados cuya presencia se cuenta
+        """
+        self.sacred_primes = frozenset(sacred_primes)
+        self._sacred_array = (np.array(sorted(self.sacred_primes), dtype=np.int64)
+                              if np is not None else None)
+        self.primes = RunningMoments()
+        self.gaps = RunningMoments()
+        self.z_modulations = RunningMoments()
+        self.palindromic_count = 0
+        self.sacred_count = 0
+        self.golden_count = 0
+        self.phase_sum = 0.0
+        self.abs_sin_phase_sum = 0.0
+        self.tail = deque(maxlen=TAIL_SIZE)
+        self._last = None
+
+    def update(self, chunk) -> None:
+        """
+        Incorpora un bloque de primos consecutivos de la serie
+
+        Args:
+            chunk: np.ndarray int64 o List[int]
+        """
+        if not len(chunk):
+            return
+        golden_center = QBTCConstants.GOLDEN_RATIO * 10
+        z_real = QBTCConstants.QUANTUM_MODULATION_REAL
+        z_offset = QBTCConstants.QUANTUM_MODULATION_IMAG * 10
+
+        if np is not None and isinstance(chunk, np.ndarray):
+            gaps = (np.diff(chunk) if self._last is None
+                    else np.diff(chunk, prepend=self._last))
+            values = chunk.astype(np.float64)
+            phases = QBTCConstants.get_quantum_phases(values)
+            self.phase_sum += float(phases.sum())
+            self.abs_sin_phase_sum += float(np.abs(np.sin(phases)).sum())
+            self.z_modulations.update(np.remainder(values * z_real + z_offset,
+                                                   QBTCConstants.Z_MAGNITUDE))
+            self.golden_count += int(np.count_nonzero(
+                np.abs((chunk % 100) - golden_center) < 5))
+            self.sacred_count += int(np.count_nonzero(np.isin(chunk, self._sacred_array)))
+            self.palindromic_count += int(np.count_nonzero(palindromic_mask(chunk)))
+            tail = chunk[-TAIL_SIZE:].tolist()
+        else:
+            series = chunk if self._last is None else [self._last] + chunk
+            gaps = [b - a for a, b in zip(series, series[1:])]
+            phases = QBTCConstants.get_quantum_phases(chunk)
+            self.phase_sum += sum(phases)
+            self.abs_sin_phase_sum += sum(abs(math.sin(phase)) for phase in phases)
+            self.z_modulations.update([(p * z_real + z_offset) % QBTCConstants.Z_MAGNITUDE
+                                       for p in chunk])
+            self.golden_count += sum(1 for p in chunk if abs((p % 100) - golden_center) < 5)
+            self.sacred_count += sum(1 for p in chunk if p in self.sacred_primes)
+            self.palindromic_count += sum(palindromic_mask(chunk))
+            tail = chunk[-TAIL_SIZE:]
+
+        self.primes.update(chunk)
+        self.gaps.update(gaps)
+        self.tail.extend(tail)
+        self._last = tail[-1]
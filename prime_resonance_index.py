@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de Rango sobre Scores de Resonancia QBTC
+QuantumLeverageEngine - Consultas "Top Resonantes en [a, b]"
+
+ResonanceRangeIndex guarda la tabla de primos hasta un límite junto con una
+columna con su índice de resonancia QBTC (el mismo de la modulación de la
+secuencia sagrada) y responde máximos y top-k por rango de valores sin
+repuntuar la ventana:
+
+- Máximo de rango en O(1): argmax por bloques de BLOCK_SIZE primos y una
+  sparse table sobre los bloques; los bloques parciales de los extremos se
+  recorren directamente (como mucho 2·BLOCK_SIZE scores).
+- Top-k en O(k log k) consultas de máximo: heap de subrangos que se parten
+  alrededor de cada máximo extraído.
+
+Los empates se resuelven a favor del primo menor, como la ordenación estable
+de qbtc_modulation_order. extend() amplía la tabla recalculando solo los
+bloques nuevos y el sufijo afectado de cada nivel; save()/load() persisten
+primos y scores en un único archivo binario.
+
+Formato de archivo (little-endian): cabecera de 32 bytes
+    magic b'QRI' | versión u8 | 4 bytes de relleno | limit u64 | count u64 |
+    block u64
+seguida de count primos uint64 y count scores float64.
+"""
+
+import heapq
+import struct
+import sys
+from array import array
+from itertools import compress
+from typing import List, Optional, Tuple
+
+from prime_sieve import sieve_range
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: columnas array('Q')/array('d')
+np = lazy_optional_import('numpy')
+
+# Primos por bloque de la descomposición (argmax directo dentro del bloque)
+BLOCK_SIZE = 64
+INDEX_MAGIC = b'QRI'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<3sB4xQQQ')
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+class ResonanceRangeIndex:
+    """
+    Tabla de primos con columna de resonancia e índice de máximos por rango
+    """
+
+    def __init__(self, engine=None, block_size: int = BLOCK_SIZE):
+        """
+        Inicializa un índice vacío (límite 1); ver build() y load()
+
+        Args:
+            engine: PrimeResonanceEngine que puntúa los primos (por defecto el compartido)
+            block_size (int): Primos por bloque de la descomposición
+        """
+        if engine is None:
+            from prime_resonance_utils import get_default_engine
+            engine = get_default_engine()
+        self.engine = engine
+        self.block_size = block_size
+        self.limit = 1
+        if np is not None:
+            self.primes = np.empty(0, dtype=np.uint64)
+            self.scores = np.empty(0, dtype=np.float64)
+        else:
+            self.primes = array('Q')
+            self.scores = array('d')
+        # levels[j][b] = índice del máximo de los bloques [b, b + 2**j)
+        self.levels = []
+
+    @classmethod
+    def build(cls, limit: int, engine=None, block_size: int = BLOCK_SIZE) -> 'ResonanceRangeIndex':
+        """
+        Construye el índice para todos los primos <= limit
+
+        Args:
+            limit (int): Límite superior de la tabla
+            engine: PrimeResonanceEngine que puntúa los primos
+            block_size (int): Primos por bloque
+
+        Returns:
+            ResonanceRangeIndex: Índice listo para consultas
+        """
+        index = cls(engine, block_size)
+        index.extend(limit)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.primes)
+
+    def __repr__(self) -> str:
+        return f"ResonanceRangeIndex(limit={self.limit}, primes={len(self)})"
+
+    def _score(self, primes):
+        """Índice de resonancia QBTC por primo, siempre por la misma ruta de cálculo"""
+        return self.engine.qbtc_resonance_indices(primes, vectorize=np is not None)
+
+    def extend(self, limit: int) -> int:
+        """
+        Amplía la tabla hasta limit puntuando solo los primos nuevos
+
+        Se recalculan el argmax del último bloque incompleto y de los bloques
+        nuevos, y en cada nivel de la sparse table solo las entradas cuyo
+        intervalo alcanza esos bloques.
+
+        Args:
+            limit (int): Nuevo límite superior (sin efecto si no supera el actual)
+
+        Returns:
+            int: Primos añadidos
+        """
+        if limit <= self.limit:
+            return 0
+        sieve = sieve_range(self.limit + 1, limit + 1)
+        old_count = len(self.primes)
+        if np is not None:
+            new_primes = (np.flatnonzero(np.frombuffer(sieve, dtype=np.uint8)).astype(np.uint64)
+                          + np.uint64(self.limit + 1))
+            self.primes = np.concatenate([self.primes, new_primes])
+            self.scores = np.concatenate([self.scores, self._score(new_primes)])
+        else:
+            new_primes = array('Q', compress(range(self.limit + 1, limit + 1), sieve))
+            self.primes.extend(new_primes)
+            self.scores.extend(self._score(new_primes))
+        self.limit = limit
+        if len(new_primes):
+            self._rebuild_from(old_count // self.block_size)
+        return len(new_primes)
+
+    def _better(self, left: int, right: int) -> int:
+        """Índice de mayor score entre dos (el izquierdo gana los empates)"""
+        return right if self.scores[right] > self.scores[left] else left
+
+    def _scan(self, start: int, stop: int) -> int:
+        """Argmax directo (primera aparición) de scores[start:stop]"""
+        if np is not None:
+            return start + int(np.argmax(self.scores[start:stop]))
+        return max(range(start, stop), key=self.scores.__getitem__)
+
+    def _rebuild_from(self, first_block: int):
+        """Recalcula argmax de bloques y niveles a partir de un bloque"""
+        size = self.block_size
+        count = len(self.primes)
+        block_count = -(-count // size)
+
+        if np is not None:
+            tail = self.scores[first_block * size:]
+            padded = np.full(-(-len(tail) // size) * size, -np.inf)
+            padded[:len(tail)] = tail
+            block_max = (np.argmax(padded.reshape(-1, size), axis=1) +
+                         np.arange(first_block, block_count) * size)
+            base = self.levels[0][:first_block] if self.levels else np.empty(0, dtype=np.int64)
+            levels = [np.concatenate([base, block_max]).astype(np.int64)]
+        else:
+            base = self.levels[0][:first_block] if self.levels else array('q')
+            levels = [base + array('q', (self._scan(b * size, min((b + 1) * size, count))
+                                        for b in range(first_block, block_count)))]
+
+        width = 1
+        while 2 * width <= block_count:
+            previous = levels[-1]
+            length = block_count - 2 * width + 1
+            # Entradas anteriores a `start` no alcanzan ningún bloque recalculado
+            start = max(0, min(first_block - 2 * width + 1, length))
+            old = self.levels[len(levels)] if len(levels) < len(self.levels) else previous[:0]
+            if np is not None:
+                left = previous[start:length]
+                right = previous[start + width:length + width]
+                merged = np.where(self.scores[right] > self.scores[left], right, left)
+                levels.append(np.concatenate([old[:start], merged]))
+            else:
+                levels.append(old[:start] + array('q', (
+                    self._better(previous[b], previous[b + width]) for b in range(start, length))))
+            width *= 2
+        self.levels = levels
+
+    def _block_argmax(self, first: int, stop: int) -> int:
+        """Argmax de los bloques [first, stop) con dos consultas a la sparse table"""
+        level = (stop - first).bit_length() - 1
+        entries = self.levels[level]
+        return self._better(int(entries[first]), int(entries[stop - (1 << level)]))
+
+    def argmax(self, start: int, stop: int) -> int:
+        """
+        Posición del primo de mayor resonancia en las posiciones [start, stop)
+
+        Raises:
+            ValueError: Rango vacío o fuera de la tabla
+        """
+        if not 0 <= start < stop <= len(self.primes):
+            raise ValueError(f"Rango de posiciones inválido: [{start}, {stop})")
+        size = self.block_size
+        first_block, last_block = start // size, (stop - 1) // size
+        if first_block == last_block:
+            return self._scan(start, stop)
+        best = self._scan(start, (first_block + 1) * size)
+        if first_block + 1 < last_block:
+            best = self._better(best, self._block_argmax(first_block + 1, last_block))
+        return self._better(best, self._scan(last_block * size, stop))
+
+    def positions(self, low: int, high: int) -> Tuple[int, int]:
+        """Posiciones [start, stop) de los primos p con low <= p <= high"""
+        if high > self.limit:
+            raise ValueError(f"El rango supera el límite del índice ({self.limit}); "
+                             f"usar extend()")
+        if np is not None:
+            bounds = np.array([max(low, 0), max(high + 1, 0)], dtype=np.uint64)
+            start, stop = np.searchsorted(self.primes, bounds)
+            return int(start), int(stop)
+        from bisect import bisect_left
+        return bisect_left(self.primes, max(low, 0)), bisect_left(self.primes, max(high + 1, 0))
+
+    def range_max(self, low: int, high: int) -> Optional[Tuple[int, float]]:
+        """
+        Primo de mayor resonancia en [low, high]
+
+        Returns:
+            Tuple[int, float]: (primo, score), o None si el rango no contiene primos
+        """
+        start, stop = self.positions(low, high)
+        if start >= stop:
+            return None
+        position = self.argmax(start, stop)
+        return int(self.primes[position]), float(self.scores[position])
+
+    def top_k(self, low: int, high: int, k: int) -> List[Tuple[int, float]]:
+        """
+        Los k primos de mayor resonancia en [low, high], en orden descendente
+
+        Args:
+            low (int): Límite inferior del rango de valores
+            high (int): Límite superior (inclusive, <= limit)
+            k (int): Cantidad de primos
+
+        Returns:
+            List[Tuple[int, float]]: (primo, score) ordenados por score descendente
+        """
+        start, stop = self.positions(low, high)
+        heap = []
+
+        def push(first, last):
+            if first < last:
+                position = self.argmax(first, last)
+                heapq.heappush(heap, (-self.scores[position], position, first, last))
+
+        push(start, stop)
+        result = []
+        while heap and len(result) < k:
+            negated, position, first, last = heapq.heappop(heap)
+            result.append((int(self.primes[position]), float(-negated)))
+            push(first, position)
+            push(position + 1, last)
+        return result
+
+    def save(self, path: str):
+        """Persiste límite, primos y scores en un archivo binario"""
+        header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.limit, len(self.primes),
+                                   self.block_size)
+        with open(path, 'wb') as handle:
+            handle.write(header)
+            if np is not None:
+                handle.write(self.primes.astype('<u8', copy=False).tobytes())
+                handle.write(self.scores.astype('<f8', copy=False).tobytes())
+                return
+            for column in (self.primes, self.scores):
+                if not _LITTLE_ENDIAN:
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                column.tofile(handle)
+
+    @classmethod
+    def load(cls, path: str, engine=None) -> 'ResonanceRangeIndex':
+        """
+        Carga un índice guardado con save() y reconstruye los niveles
+
+        Raises:
+            ValueError: Archivo truncado o con cabecera no reconocida
+        """
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        if len(data) < INDEX_HEADER.size:
+            raise ValueError("Índice de resonancia truncado")
+        magic, version, limit, count, block_size = INDEX_HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("Cabecera de índice de resonancia no reconocida")
+        if len(data) != INDEX_HEADER.size + 16 * count:
+            raise ValueError("Índice de resonancia truncado")
+
+        index = cls(engine, block_size)
+        index.limit = limit
+        primes_end = INDEX_HEADER.size + 8 * count
+        if np is not None:
+            index.primes = np.frombuffer(data, dtype='<u8', count=count,
+                                         offset=INDEX_HEADER.size).astype(np.uint64)
+            index.scores = np.frombuffer(data, dtype='<f8', count=count,
+                                         offset=primes_end).astype(np.float64)
+        else:
+            index.primes.frombytes(data[INDEX_HEADER.size:primes_end])
+            index.scores.frombytes(data[primes_end:])
+            if not _LITTLE_ENDIAN:
+                index.primes.byteswap()
+                index.scores.byteswap()
+        if count:
+            index._rebuild_from(0)
+        return index
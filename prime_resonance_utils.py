@@ -8,17 +8,41 @@ según la lógica de resonancia cuántica del sistema QuantumLeverageEngine.
 """
 
 import math
+import heapq
 import logging
-from typing import List, Tuple, Dict, Set, Iterator
+from array import array
+from typing import List, Tuple, Dict, Set, Iterator, Mapping, NamedTuple
 from functools import lru_cache
-from quantum_resonance_config import QBTCConstants, QUANTUM_CONFIG
+from itertools import compress
+import quantum_resonance_config
+from quantum_resonance_config import QBTCConstants
+from prime_sieve import sieve_bytearray, sieve_range, primes_from_sieve, iter_sieve_segments
+from prime_digits import digit_sum, digit_sums, is_palindromic_number, palindromic_mask
+from prime_constellations import DEFAULT_SEGMENT_SIZE, iter_constellations, normalize_pattern
+from prime_wheel import get_wheel
+from prime_factorization import FactorizationService, is_probable_prime
+from prime_array import PrimeArray, PrimePairArray
+from prime_analysis_report import LazyAnalysisReport
+from prime_gap_spectrum import DEFAULT_MAX_GAP, GapSpectrum, gap_spectrum
+from prime_profiling import NULL_STAGE, EngineProfiler, profiled, profiled_stage
+from prime_report_stream import (DEFAULT_MEMORY_LIMIT, MIN_CHUNK_SIZE, ReportAccumulator,
+                                 chunk_size_for_memory, iter_chunks)
 
-# Configuración del sistema para procesos en segundo plano
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: rutas escalares con tablas array('d')
+np = lazy_optional_import('numpy')
+
+# Sin handlers al importar: la configuración de logging corresponde a main()
 logger = logging.getLogger('PrimeResonanceEngine')
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class PopulationScores(NamedTuple):
+    """Resultado de score_population: arrays paralelos indexados por primo"""
+    primes: object   # Primos <= límite (np.ndarray uint64 o array('Q'))
+    flags: object    # Máscaras RESONANCE_FLAG_BITS por primo (uint8)
+    scores: object   # Resonancia compuesta por primo (float64)
 
 class PrimeResonanceEngine:
     """
@@ -26,13 +50,78 @@ class PrimeResonanceEngine:
     Implementa identificación y generación de números primos con patrones sagrados
     """
     
+    # Diferencias resonantes precomputadas (evita reconstruir listas por candidato)
+    RESONANT_DIFFERENCES = frozenset([2, 4, 6, 8, 10, 12, 14, 18, 20, 24, 30])
+    QBTC_RESONANT_GAPS = frozenset([int(QBTCConstants.Z_REAL), int(QBTCConstants.Z_IMAG),
+                                    int(QBTCConstants.LAMBDA_7919), 6, 12, 18, 24, 30])
+    
+    # Tamaño mínimo de secuencia para usar rutas vectorizadas con NumPy
+    VECTORIZE_THRESHOLD = 2048
+    
+    # Módulo de la rueda que pre-filtra todos los bucles de candidatos
+    CANDIDATE_WHEEL = 2310
+    
+    # Bloques especulativos de la secuencia sagrada: amplitud inicial y máxima
+    SACRED_BLOCK_SPAN = 4096
+    MAX_SACRED_BLOCK_SPAN = 1 << 18
+    # Clases de candidato según los criterios que no dependen del gap
+    SACRED_REJECT, SACRED_GAP_DEPENDENT, SACRED_ACCEPT = 0, 1, 2
+    
     def __init__(self):
         """Inicializa el motor con constantes de resonancia cuántica"""
         self.sacred_primes = [7, 11, 13, 17, 19, 23, 29]
+        # Estructuras congeladas de pertenencia (ver count_sacred_primes)
+        self.sacred_set = frozenset(self.sacred_primes)
+        self._sacred_sorted = tuple(sorted(self.sacred_set))
         self.quantum_threshold = 1000000  # Límite para optimización
         self.resonance_cache = {}
+        self._factorizer = None
+        self.profiler = None  # Instrumentación opcional (enable_profiling)
         logger.info("PrimeResonanceEngine inicializado con primos sagrados: %s", self.sacred_primes)
     
+    def is_sacred_prime(self, n: int, extended: bool = False) -> bool:
+        """
+        Verifica pertenencia a los primos sagrados en O(1)
+        
+        Args:
+            n (int): Número a verificar
+            extended (bool): Usar SACRED_PRIMES_EXTENDED (bitmap) en lugar de la base
+            
+        Returns:
+            bool: True si n es primo sagrado
+        """
+        if extended:
+            return quantum_resonance_config.QUANTUM_CONFIG.is_sacred_prime(n, extended=True)
+        return n in self.sacred_set
+    
+    def count_sacred_primes(self, primes) -> int:
+        """
+        Cuenta las apariciones de primos sagrados en una serie
+        
+        Las series ordenadas (PrimeArray o arrays verificados) se fusionan con
+        los primos sagrados ordenados por búsqueda binaria; el resto se recorre
+        una sola vez contra el frozenset.
+        
+        Args:
+            primes: List[int], PrimeArray o np.ndarray de primos
+            
+        Returns:
+            int: Número de elementos que son primos sagrados
+        """
+        if isinstance(primes, PrimeArray):
+            return sum(primes.count(p) for p in self._sacred_sorted)
+        if np is not None and (isinstance(primes, np.ndarray) or
+                               len(primes) >= self.VECTORIZE_THRESHOLD):
+            values = np.asarray(primes)
+            if values.dtype.kind in 'iu':
+                sacred = np.asarray(self._sacred_sorted, dtype=values.dtype)
+                if values.size < 2 or bool((values[1:] >= values[:-1]).all()):
+                    found = (np.searchsorted(values, sacred, 'right') -
+                             np.searchsorted(values, sacred, 'left'))
+                    return int(found.sum())
+                return int(np.count_nonzero(np.isin(values, sacred)))
+        return sum(map(self.sacred_set.__contains__, primes))
+    
     @lru_cache(maxsize=10000)
     def is_prime(self, n: int) -> bool:
         """
@@ -51,6 +140,10 @@ class PrimeResonanceEngine:
         if n % 2 == 0:
             return False
         
+        # Más allá del umbral cuántico, Miller–Rabin determinista
+        if n > self.quantum_threshold:
+            return is_probable_prime(n)
+        
         # Optimización: verificar solo hasta la raíz cuadrada
         sqrt_n = int(math.sqrt(n)) + 1
         
@@ -68,75 +161,219 @@ class PrimeResonanceEngine:
         
         return True
     
-    def generate_primes_sieve(self, limit: int) -> List[int]:
+    def enable_profiling(self, trace_memory: bool = False,
+                         cprofile_dir: str = None) -> EngineProfiler:
+        """
+        Activa la instrumentación por método público y etapa interna
+        
+        Args:
+            trace_memory (bool): Medir bytes asignados con tracemalloc
+            cprofile_dir (str): Directorio para volcar un .pstats por llamada
+            
+        Returns:
+            EngineProfiler: Perfilador activo
+        """
+        self.disable_profiling()
+        self.profiler = EngineProfiler(trace_memory, cprofile_dir)
+        return self.profiler
+    
+    def disable_profiling(self) -> None:
+        """Desactiva la instrumentación (coste casi nulo por llamada)"""
+        if self.profiler is not None:
+            self.profiler.close()
+        self.profiler = None
+    
+    def get_profile_stats(self) -> Dict[str, Dict]:
+        """
+        Obtiene las estadísticas de instrumentación acumuladas
+        
+        Returns:
+            Dict[str, Dict]: {'methods': {...}, 'stages': {...}} o {} si está desactivada
+        """
+        return self.profiler.as_dict() if self.profiler is not None else {}
+    
+    def _stage(self, name: str):
+        """Contexto de etapa interna (vacío si el perfilado está desactivado)"""
+        return self.profiler.stage(name) if self.profiler is not None else NULL_STAGE
+    
+    @property
+    def factorizer(self) -> FactorizationService:
+        """Servicio de factorización (tabla SPF hasta quantum_threshold, creada al primer uso)"""
+        if self._factorizer is None:
+            self._factorizer = FactorizationService(self.quantum_threshold)
+        return self._factorizer
+    
+    @profiled
+    def factorize(self, n: int) -> Dict[int, int]:
+        """
+        Factoriza un entero usando la tabla SPF y Pollard–Rho (Brent)
+        
+        Args:
+            n (int): Entero a factorizar
+            
+        Returns:
+            Dict[int, int]: Primo -> exponente
+        """
+        return self.factorizer.factorize(n)
+    
+    @profiled
+    def generate_primes_sieve(self, limit: int, as_array: bool = False) -> List[int]:
         """
         Genera lista de primos hasta un límite usando Criba de Eratóstenes optimizada
         
         Args:
             limit (int): Límite superior para generar primos
+            as_array (bool): Devolver un PrimeArray compacto en lugar de List[int]
             
         Returns:
-            List[int]: Lista de números primos
+            List[int]: Lista de números primos (PrimeArray si as_array)
         """
         if limit < 2:
-            return []
+            return PrimeArray() if as_array else []
         
         logger.info("Generando primos hasta %d usando criba cuántica", limit)
         
-        # Inicializar criba
-        sieve = [True] * (limit + 1)
-        sieve[0] = sieve[1] = False
-        
-        # Aplicar criba
-        for i in range(2, int(math.sqrt(limit)) + 1):
-            if sieve[i]:
-                for j in range(i * i, limit + 1, i):
-                    sieve[j] = False
-        
-        primes = [i for i in range(2, limit + 1) if sieve[i]]
+        # Criba compartida sobre bytearray
+        with self._stage('sieve'):
+            sieve = sieve_bytearray(limit)
+            primes = PrimeArray.from_sieve(sieve) if as_array else primes_from_sieve(sieve)
         logger.info("Generados %d primos hasta %d", len(primes), limit)
         
         return primes
     
-    def find_twin_primes(self, limit: int) -> List[Tuple[int, int]]:
+    def iter_primes(self, limit: int, start: int = 0,
+                    segment_size: int = DEFAULT_SEGMENT_SIZE) -> Iterator[int]:
+        """
+        Genera perezosamente los primos en [start, limit] por segmentos de criba
+        
+        Args:
+            limit (int): Límite superior (inclusive)
+            start (int): Primer valor a considerar
+            segment_size (int): Valores cribados por segmento (memoria acotada)
+            
+        Yields:
+            int: Primos en orden ascendente
+        """
+        for low, high, segment in iter_sieve_segments(limit, segment_size, start):
+            yield from compress(range(low, high), segment)
+    
+    @profiled
+    def find_twin_primes(self, limit: int, as_array: bool = False) -> List[Tuple[int, int]]:
         """
         Encuentra pares de primos gemelos (p, p+2) hasta un límite
         
         Args:
             limit (int): Límite superior de búsqueda
+            as_array (bool): Devolver un PrimePairArray compacto
             
         Returns:
-            List[Tuple[int, int]]: Lista de pares de primos gemelos
+            List[Tuple[int, int]]: Lista de pares de primos gemelos (PrimePairArray si as_array)
         """
-        twins = []
-        primes = self.generate_primes_sieve(limit)
-        prime_set = set(primes)
-        
         logger.info("Buscando primos gemelos hasta %d", limit)
         
-        for prime in primes:
-            if prime + 2 in prime_set and prime + 2 <= limit:
-                twins.append((prime, prime + 2))
+        with self._stage('constellation_scan'):
+            matches = iter_constellations(limit, [(0, 2)])
+            if as_array:
+                twins = PrimePairArray(PrimeArray(prime for _, prime in matches), 2)
+            else:
+                twins = [(prime, prime + 2) for _, prime in matches]
         
         logger.info("Encontrados %d pares de primos gemelos", len(twins))
         return twins
     
-    def find_mersenne_primes(self, max_exponent: int = 31) -> List[int]:
+    def iter_twin_primes(self, limit: int, start: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Genera perezosamente los pares de primos gemelos (p, p+2) con p+2 <= limit
+        
+        Args:
+            limit (int): Límite superior de búsqueda
+            start (int): Valor mínimo del primer primo del par
+            
+        Yields:
+            Tuple[int, int]: Pares de primos gemelos en orden ascendente
+        """
+        for _, prime in iter_constellations(limit, [(0, 2)], start=start):
+            yield prime, prime + 2
+    
+    @profiled
+    def find_prime_constellations(self, limit: int,
+                                  patterns: Dict[str, Tuple[int, ...]] = None,
+                                  as_array: bool = False) -> Dict[str, List[int]]:
+        """
+        Encuentra varias constelaciones de primos en una única pasada de criba
+        
+        Args:
+            limit (int): Límite superior para todos los primos de la constelación
+            patterns (Dict[str, Tuple[int, ...]]): Patrones por nombre
+                (por defecto QUANTUM_CONFIG.CONSTELLATION_PATTERNS)
+            as_array (bool): Devolver un PrimeArray por nombre
+            
+        Returns:
+            Dict[str, List[int]]: Primer primo de cada constelación por nombre
+        """
+        if patterns is None:
+            patterns = quantum_resonance_config.QUANTUM_CONFIG.CONSTELLATION_PATTERNS
+        
+        logger.info("Buscando %d constelaciones de primos hasta %d", len(patterns), limit)
+        
+        names_by_pattern = {}
+        for name, pattern in patterns.items():
+            names_by_pattern.setdefault(normalize_pattern(pattern), []).append(name)
+        
+        results = {name: array('Q') if as_array else [] for name in patterns}
+        for pattern, prime in iter_constellations(limit, names_by_pattern):
+            for name in names_by_pattern[pattern]:
+                results[name].append(prime)
+        if as_array:
+            results = {name: PrimeArray(found) for name, found in results.items()}
+        
+        logger.info("Constelaciones encontradas: %s",
+                    {name: len(found) for name, found in results.items()})
+        return results
+    
+    @profiled
+    def gap_correlation_spectrum(self, limit: int, max_gap: int = DEFAULT_MAX_GAP,
+                                 method: str = 'auto') -> GapSpectrum:
+        """
+        Cuenta los pares de primos (p, p+g) de todos los gaps g <= max_gap a la vez
+        
+        Args:
+            limit (int): Límite superior para ambos primos del par
+            max_gap (int): Mayor gap del espectro (por defecto el mayor de RESONANT_GAPS)
+            method (str): 'auto', 'fft' (NumPy) o 'blocked'
+            
+        Returns:
+            GapSpectrum: Pares por gap, con conteos por categoría y ponderados
+        """
+        logger.info("Calculando espectro de gaps hasta %d (gap máximo %d)", limit, max_gap)
+        
+        with self._stage('gap_spectrum'):
+            spectrum = gap_spectrum(limit, max_gap, method)
+        
+        logger.info("Espectro de gaps calculado con el método %s", spectrum.method)
+        return spectrum
+    
+    @profiled
+    def find_mersenne_primes(self, max_exponent: int = 31, as_array: bool = False) -> List[int]:
         """
         Encuentra números primos de Mersenne de la forma 2^p - 1
         
         Args:
             max_exponent (int): Exponente máximo a verificar
+            as_array (bool): Devolver un PrimeArray (exponentes hasta 64; uint64
+                lanza OverflowError más allá)
             
         Returns:
-            List[int]: Lista de primos de Mersenne
+            List[int]: Lista de primos de Mersenne (PrimeArray si as_array)
         """
         mersenne_primes = []
         
         logger.info("Buscando primos de Mersenne hasta exponente %d", max_exponent)
         
         # Solo verificar exponentes primos (propiedad de Mersenne)
-        prime_exponents = [p for p in range(2, max_exponent + 1) if self.is_prime(p)]
+        wheel = get_wheel(self.CANDIDATE_WHEEL)
+        prime_exponents = [p for p in wheel.candidates(2, max_exponent + 1, True)
+                           if self.is_prime(p)]
         
         for p in prime_exponents:
             mersenne_candidate = (2 ** p) - 1
@@ -144,28 +381,30 @@ class PrimeResonanceEngine:
                 mersenne_primes.append(mersenne_candidate)
                 logger.info("Primo de Mersenne encontrado: 2^%d - 1 = %d", p, mersenne_candidate)
         
-        return mersenne_primes
+        return PrimeArray(mersenne_primes) if as_array else mersenne_primes
     
-    def find_sophie_germain_primes(self, limit: int) -> List[int]:
+    @profiled
+    def find_sophie_germain_primes(self, limit: int, as_array: bool = False) -> List[int]:
         """
         Encuentra primos de Sophie Germain donde p y 2p+1 son ambos primos
         
         Args:
             limit (int): Límite superior de búsqueda
+            as_array (bool): Devolver un PrimeArray compacto
             
         Returns:
-            List[int]: Lista de primos de Sophie Germain
+            List[int]: Lista de primos de Sophie Germain (PrimeArray si as_array)
         """
-        sophie_primes = []
+        sophie_primes = array('Q') if as_array else []
         
         logger.info("Buscando primos de Sophie Germain hasta %d", limit)
         
-        for p in range(2, limit + 1):
+        for p in get_wheel(self.CANDIDATE_WHEEL).candidates(2, limit + 1, True):
             if self.is_prime(p) and self.is_prime(2 * p + 1):
                 sophie_primes.append(p)
         
         logger.info("Encontrados %d primos de Sophie Germain", len(sophie_primes))
-        return sophie_primes
+        return PrimeArray(sophie_primes) if as_array else sophie_primes
     
     def is_palindromic(self, n: int) -> bool:
         """
@@ -177,37 +416,40 @@ class PrimeResonanceEngine:
         Returns:
             bool: True si es palindrómico
         """
-        str_n = str(n)
-        return str_n == str_n[::-1]
+        return is_palindromic_number(n)
     
-    def find_palindromic_primes(self, limit: int) -> List[int]:
+    @profiled
+    def find_palindromic_primes(self, limit: int, as_array: bool = False) -> List[int]:
         """
         Encuentra números primos palindrómicos
         
         Args:
             limit (int): Límite superior de búsqueda
+            as_array (bool): Devolver un PrimeArray compacto
             
         Returns:
-            List[int]: Lista de primos palindrómicos
+            List[int]: Lista de primos palindrómicos (PrimeArray si as_array)
         """
-        palindromic_primes = []
+        palindromic_primes = array('Q') if as_array else []
         
         logger.info("Buscando primos palindrómicos hasta %d", limit)
         
-        for n in range(2, limit + 1):
+        for n in get_wheel(self.CANDIDATE_WHEEL).candidates(2, limit + 1, True):
             if self.is_prime(n) and self.is_palindromic(n):
                 palindromic_primes.append(n)
         
         logger.info("Encontrados %d primos palindrómicos", len(palindromic_primes))
-        return palindromic_primes
+        return PrimeArray(palindromic_primes) if as_array else palindromic_primes
     
-    def generate_sacred_prime_sequence(self, count: int = 50) -> List[int]:
+    @profiled
+    def generate_sacred_prime_sequence(self, count: int = 50, top_k: int = None) -> List[int]:
         """
         Genera secuencia de primos sagrados usando lógica cuántica QBTC mejorada
         Integra constantes Z_COMPLEX y Lambda_7919 para resonancia avanzada
         
         Args:
             count (int): Cantidad de primos sagrados a generar
+            top_k (int): Conservar solo los top_k primos extendidos más resonantes
             
         Returns:
             List[int]: Secuencia de primos sagrados con modulación QBTC
@@ -215,26 +457,172 @@ class PrimeResonanceEngine:
         if count <= len(self.sacred_primes):
             return self.sacred_primes[:count]
         
-        sacred_sequence = self.sacred_primes.copy()
         logger.info("Generando secuencia de %d primos sagrados con QBTC", count)
-        
-        # Continuar con primos usando modulación cuántica QBTC
-        candidate = 31  # Siguiente primo después de 29
-        
-        while len(sacred_sequence) < count:
-            if self.is_prime(candidate):
-                # Verificar resonancia cuántica QBTC mejorada
-                if self._has_qbtc_quantum_resonance(candidate, sacred_sequence):
-                    sacred_sequence.append(candidate)
-                    logger.info("Primo sagrado QBTC agregado: %d (total: %d)", 
-                              candidate, len(sacred_sequence))
-            candidate += 2  # Solo números impares
+        with self._stage('candidate_scan'):
+            sacred_sequence = list(self.iter_sacred_primes(count))
         
         # Aplicar modulación cuántica final usando Z_COMPLEX
-        modulated_sequence = self._apply_qbtc_modulation(sacred_sequence)
+        modulated_sequence = self._apply_qbtc_modulation(sacred_sequence, top_k)
         
         return modulated_sequence
     
+    def iter_sacred_primes(self, count: int = None) -> Iterator[int]:
+        """
+        Genera perezosamente la secuencia sagrada en orden de aceptación
+        
+        Emite primero los primos sagrados base y después cada candidato con
+        resonancia QBTC, sin la modulación final de generate_sacred_prime_sequence.
+        
+        Args:
+            count (int): Cantidad máxima de primos a emitir (None = sin límite)
+            
+        Yields:
+            int: Primos sagrados en el orden en que se aceptan
+        """
+        sacred_sequence = self.sacred_primes.copy()
+        yield from sacred_sequence[:count]
+        if count is not None and count <= len(sacred_sequence):
+            return
+        
+        # Continuar con primos usando modulación cuántica QBTC, por bloques especulativos:
+        # los criterios propios del candidato se evalúan vectorialmente para todo el
+        # bloque y solo el criterio del gap se resuelve en una pasada secuencial
+        last_sacred = sacred_sequence[-1]
+        emitted = len(sacred_sequence)
+        gaps = self.QBTC_RESONANT_GAPS
+        start, span = 31, self.SACRED_BLOCK_SPAN  # Siguiente primo después de 29
+        while True:
+            for candidate, resonance_class in self._classify_sacred_block(start, start + span):
+                if (resonance_class == self.SACRED_ACCEPT or
+                        candidate - last_sacred in gaps):
+                    last_sacred = candidate
+                    emitted += 1
+                    logger.info("Primo sagrado QBTC agregado: %d (total: %d)",
+                                candidate, emitted)
+                    yield candidate
+                    if count is not None and emitted >= count:
+                        return
+            start += span
+            span = min(span * 2, self.MAX_SACRED_BLOCK_SPAN)
+    
+    def _classify_sacred_block(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Clasifica los primos de [start, stop) según los criterios del candidato
+        
+        La primalidad sale de una criba del intervalo y los criterios de fase,
+        modulación Z, dígitos de 7919, golden ratio y suma de dígitos prima se
+        evalúan para todo el bloque (vectorizados con NumPy). Cada primo queda
+        como aceptado, rechazado o pendiente del gap con el último aceptado.
+        
+        Returns:
+            List[Tuple[int, int]]: (primo, clase) de los primos no rechazados, en orden
+        """
+        sieve = sieve_range(start, stop)
+        table = self._sacred_class_table()
+        if np is not None:
+            primes = np.flatnonzero(np.frombuffer(sieve, dtype=np.uint8)) + start
+            classes = np.asarray(table, dtype=np.uint8)[self._qbtc_criteria_codes(primes)]
+            keep = np.flatnonzero(classes)
+            return list(zip(primes[keep].tolist(), classes[keep].tolist()))
+        
+        classified = []
+        for prime in compress(range(start, stop), sieve):
+            resonance_class = table[self._qbtc_criteria_code(prime)]
+            if resonance_class:
+                classified.append((prime, resonance_class))
+        return classified
+    
+    @staticmethod
+    def _qbtc_resonance_score(lambda_resonance: bool, z_resonance: bool,
+                              prime_7919_resonance: bool, golden_resonance: bool,
+                              has_qbtc_resonant_gap: bool) -> float:
+        """Score combinado de los cinco criterios de resonancia QBTC"""
+        return sum([
+            lambda_resonance * 0.25,
+            z_resonance * 0.20,
+            prime_7919_resonance * 0.15,
+            golden_resonance * 0.20,
+            has_qbtc_resonant_gap * 0.20
+        ])
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _sacred_class_table(cls) -> Tuple[int, ...]:
+        """
+        Clase de candidato para cada código de criterios (ver _qbtc_criteria_code)
+        
+        Se deriva de _qbtc_resonance_score evaluando el score con y sin gap
+        resonante, de modo que la clasificación coincide exactamente con
+        _has_qbtc_quantum_resonance.
+        """
+        table = []
+        for code in range(32):
+            lambda_res, z_res, p7919, golden, digit_sum_prime = (bool(code >> bit & 1)
+                                                                 for bit in range(5))
+            if not digit_sum_prime:
+                table.append(cls.SACRED_REJECT)
+            elif cls._qbtc_resonance_score(lambda_res, z_res, p7919, golden, False) > 0.3:
+                table.append(cls.SACRED_ACCEPT)
+            elif cls._qbtc_resonance_score(lambda_res, z_res, p7919, golden, True) > 0.3:
+                table.append(cls.SACRED_GAP_DEPENDENT)
+            else:
+                table.append(cls.SACRED_REJECT)
+        return tuple(table)
+    
+    def _qbtc_criteria_code(self, candidate: int) -> int:
+        """
+        Criterios de resonancia QBTC que dependen solo del candidato, como bits
+        
+        Bits: 0 fase Lambda, 1 modulación Z, 2 dígitos de 7919, 3 golden ratio,
+        4 suma de dígitos prima.
+        """
+        # Criterio 1: Fase cuántica usando Lambda_7919
+        lambda_resonance = (abs(QBTCConstants.get_sin_quantum_phase(candidate)) >
+                            QBTCConstants.LAMBDA_Z_RATIO / 10)
+        
+        # Criterio 2: Modulación compleja Z
+        z_modulation = (candidate * QBTCConstants.QUANTUM_MODULATION_REAL + 
+                       QBTCConstants.QUANTUM_MODULATION_IMAG * 100)
+        z_resonance = abs(z_modulation % QBTCConstants.Z_MAGNITUDE - QBTCConstants.Z_REAL) < 2.0
+        
+        # Criterio 3: Resonancia con primo fundamental 7919
+        prime_7919_resonance = (candidate % 100) in [19, 79]  # Dígitos del 7919
+        
+        # Criterio 4: Suma de dígitos en relación con golden ratio
+        candidate_digit_sum = digit_sum(candidate)
+        golden_resonance = abs(candidate_digit_sum - QBTCConstants.GOLDEN_RATIO * 10) < 3.0
+        
+        return (lambda_resonance | z_resonance << 1 | prime_7919_resonance << 2 |
+                golden_resonance << 3 | self.is_prime(candidate_digit_sum) << 4)
+    
+    def _qbtc_criteria_codes(self, candidates):
+        """Versión vectorizada de _qbtc_criteria_code para un np.ndarray de enteros"""
+        values = candidates.astype(np.float64)
+        threshold = QBTCConstants.LAMBDA_Z_RATIO / 10
+        sines = np.abs(QBTCConstants.get_sin_quantum_phase(values))
+        lambda_resonance = sines > threshold
+        # np.sin puede diferir de math.sin en el último ulp: los casos al borde
+        # del umbral se reevalúan con la ruta escalar
+        for i in np.flatnonzero(np.abs(sines - threshold) < 1e-9):
+            lambda_resonance[i] = (abs(QBTCConstants.get_sin_quantum_phase(int(candidates[i]))) >
+                                   threshold)
+        
+        z_modulation = (values * QBTCConstants.QUANTUM_MODULATION_REAL +
+                        QBTCConstants.QUANTUM_MODULATION_IMAG * 100)
+        z_resonance = (np.abs(np.remainder(z_modulation, QBTCConstants.Z_MAGNITUDE) -
+                              QBTCConstants.Z_REAL) < 2.0)
+        
+        last_digits = candidates % 100
+        prime_7919_resonance = (last_digits == 19) | (last_digits == 79)
+        
+        sums = digit_sums(candidates)
+        golden_resonance = np.abs(sums - QBTCConstants.GOLDEN_RATIO * 10) < 3.0
+        digit_sum_prime = np.frombuffer(sieve_bytearray(int(sums.max(initial=0))),
+                                        dtype=np.uint8)[sums].astype(bool)
+        
+        return (lambda_resonance.astype(np.intp) | z_resonance << 1 |
+                prime_7919_resonance << 2 | golden_resonance << 3 | digit_sum_prime << 4)
+    
     def _has_quantum_resonance(self, candidate: int, sacred_primes: List[int]) -> bool:
         """
         Verifica si un primo candidato tiene resonancia cuántica con los existentes
@@ -256,12 +644,10 @@ class PrimeResonanceEngine:
         difference = candidate - last_sacred
         
         # Criterio 1: Diferencia resonante
-        resonant_differences = [2, 4, 6, 8, 10, 12, 14, 18, 20, 24, 30]
-        has_resonant_diff = difference in resonant_differences
+        has_resonant_diff = difference in self.RESONANT_DIFFERENCES
         
         # Criterio 2: Suma de dígitos prima
-        digit_sum = sum(int(digit) for digit in str(candidate))
-        has_prime_digit_sum = self.is_prime(digit_sum)
+        has_prime_digit_sum = self.is_prime(digit_sum(candidate))
         
         # Criterio 3: No múltiplo de primos sagrados básicos (evita patrones destructivos)
         avoids_destructive = all(candidate % sp != 0 for sp in self.sacred_primes[:3])
@@ -282,49 +668,100 @@ class PrimeResonanceEngine:
             bool: True si tiene resonancia cuántica QBTC
         """
         # Criterios QBTC de resonancia cuántica avanzada
-        last_sacred = sacred_primes[-1]
-        difference = candidate - last_sacred
+        code = self._qbtc_criteria_code(candidate)
         
-        # Criterio 1: Fase cuántica usando Lambda_7919
-        quantum_phase = QBTCConstants.get_quantum_phase(candidate)
-        lambda_resonance = abs(math.sin(quantum_phase)) > QBTCConstants.LAMBDA_Z_RATIO / 10
+        # Criterio 5: Gap resonante con modulación QBTC
+        has_qbtc_resonant_gap = candidate - sacred_primes[-1] in self.QBTC_RESONANT_GAPS
         
-        # Criterio 2: Modulación compleja Z
-        z_modulation = (candidate * QBTCConstants.QUANTUM_MODULATION_REAL + 
-                       QBTCConstants.QUANTUM_MODULATION_IMAG * 100)
-        z_resonance = abs(z_modulation % QBTCConstants.Z_MAGNITUDE - QBTCConstants.Z_REAL) < 2.0
+        # Evaluación combinada
+        resonance_score = self._qbtc_resonance_score(code & 1, code >> 1 & 1, code >> 2 & 1,
+                                                     code >> 3 & 1, has_qbtc_resonant_gap)
         
-        # Criterio 3: Resonancia con primo fundamental 7919
-        prime_7919_resonance = (candidate % 100) in [19, 79]  # Dígitos del 7919
+        # Umbral de resonancia QBTC
+        return resonance_score > 0.3 and bool(code >> 4 & 1)
+    
+    @profiled
+    def qbtc_resonance_indices(self, primes, vectorize: bool = None):
+        """
+        Calcula el índice de resonancia QBTC de cada primo de una secuencia
         
-        # Criterio 4: Suma de dígitos en relación con golden ratio
-        digit_sum = sum(int(digit) for digit in str(candidate))
-        golden_resonance = abs(digit_sum - QBTCConstants.GOLDEN_RATIO * 10) < 3.0
+        Índice = (frac(p·Re_mod) + |sin(p·λ/|Z|)| + (p mod ⌊φ·100⌋)/100) / 3
         
-        # Criterio 5: Gap resonante con modulación QBTC
-        qbtc_resonant_gaps = [int(QBTCConstants.Z_REAL), int(QBTCConstants.Z_IMAG), 
-                              int(QBTCConstants.LAMBDA_7919), 6, 12, 18, 24, 30]
-        has_qbtc_resonant_gap = difference in qbtc_resonant_gaps
+        Args:
+            primes: Secuencia o np.ndarray de primos
+            vectorize (bool): Forzar la ruta NumPy (True) o la escalar (False);
+                por defecto NumPy a partir de VECTORIZE_THRESHOLD primos
+            
+        Returns:
+            np.ndarray float64 en la ruta vectorizada, List[float] en otro caso
+        """
+        golden_modulus = int(QBTCConstants.GOLDEN_RATIO * 100)
+        if vectorize is None:
+            vectorize = len(primes) >= self.VECTORIZE_THRESHOLD
+        if np is not None and vectorize:
+            values = np.asarray(primes, dtype=np.int64)
+            as_float = values.astype(np.float64)
+            z_factor = np.remainder(as_float * QBTCConstants.QUANTUM_MODULATION_REAL, 1.0)
+            lambda_factor = np.abs(np.sin(as_float * QBTCConstants.LAMBDA_Z_RATIO))
+            golden_factor = np.remainder(values, golden_modulus) / 100.0
+            return (z_factor + lambda_factor + golden_factor) / 3.0
+        
+        real = QBTCConstants.QUANTUM_MODULATION_REAL
+        ratio = QBTCConstants.LAMBDA_Z_RATIO
+        sin = math.sin
+        return [((p * real) % 1.0 + abs(sin(p * ratio)) + (p % golden_modulus) / 100.0) / 3.0
+                for p in primes]
+    
+    @profiled
+    def qbtc_modulation_order(self, sequence, top_k: int = None):
+        """
+        Calcula la permutación de índices de la modulación QBTC sin copiar primos
         
-        # Evaluación combinada
-        resonance_score = sum([
-            lambda_resonance * 0.25,
-            z_resonance * 0.20,
-            prime_7919_resonance * 0.15,
-            golden_resonance * 0.20,
-            has_qbtc_resonant_gap * 0.20
-        ])
+        Los primos base conservan su posición; el resto se ordena por índice de
+        resonancia descendente (estable ante empates). Con top_k solo se
+        seleccionan, mediante heap/partición, los top_k primos más resonantes.
         
-        # Umbral de resonancia QBTC
-        return resonance_score > 0.3 and self.is_prime(digit_sum)
+        Args:
+            sequence: Secuencia de primos (lista, array o np.ndarray)
+            top_k (int): Cantidad de primos extendidos a conservar (None = todos)
+            
+        Returns:
+            Permutación de índices (np.ndarray intp con NumPy, List[int] en otro caso)
+        """
+        base_count = min(len(self.sacred_primes), len(sequence))
+        extended_count = len(sequence) - base_count
+        k = extended_count if top_k is None else max(0, min(top_k, extended_count))
+        
+        # Solo se calcula resonancia para la parte extendida
+        resonance = self.qbtc_resonance_indices(sequence[base_count:])
+        
+        if np is not None and isinstance(resonance, np.ndarray):
+            negated = -resonance
+            if k < extended_count:
+                kth = np.partition(negated, k - 1)[k - 1] if k else -np.inf
+                strict = np.flatnonzero(negated < kth)
+                ties = np.flatnonzero(negated == kth)[:k - strict.size]
+                selected = np.concatenate([strict, ties])
+            else:
+                selected = np.arange(extended_count)
+            selected = selected[np.lexsort((selected, negated[selected]))]
+            return np.concatenate([np.arange(base_count), selected + base_count])
+        
+        if k < extended_count:
+            ordered = heapq.nlargest(k, range(extended_count), key=resonance.__getitem__)
+        else:
+            ordered = sorted(range(extended_count), key=resonance.__getitem__, reverse=True)
+        return list(range(base_count)) + [i + base_count for i in ordered]
     
-    def _apply_qbtc_modulation(self, sequence: List[int]) -> List[int]:
+    @profiled_stage('modulation')
+    def _apply_qbtc_modulation(self, sequence: List[int], top_k: int = None) -> List[int]:
         """
         Aplica modulación cuántica QBTC a una secuencia de primos
         Mantiene la primality pero ajusta orden según resonancia
         
         Args:
             sequence (List[int]): Secuencia original de primos
+            top_k (int): Conservar solo los top_k primos extendidos más resonantes
             
         Returns:
             List[int]: Secuencia modulada con orden cuántico optimizado
@@ -332,41 +769,93 @@ class PrimeResonanceEngine:
         if len(sequence) <= len(self.sacred_primes):
             return sequence  # No modular secuencia base
         
-        # Calcular índices de resonancia QBTC para cada primo
-        resonance_indices = []
-        for i, prime in enumerate(sequence):
-            # Factor de resonancia basado en constantes QBTC
-            z_factor = (prime * QBTCConstants.QUANTUM_MODULATION_REAL) % 1.0
-            lambda_factor = math.sin(prime * QBTCConstants.LAMBDA_Z_RATIO)
-            golden_factor = (prime % int(QBTCConstants.GOLDEN_RATIO * 100)) / 100.0
-            
-            # Índice compuesto de resonancia
-            resonance_index = (z_factor + abs(lambda_factor) + golden_factor) / 3.0
-            resonance_indices.append((prime, resonance_index, i))
-        
-        # Mantener primos base en su posición original
-        base_sequence = sequence[:len(self.sacred_primes)]
-        extended_sequence = sequence[len(self.sacred_primes):]
+        order = self.qbtc_modulation_order(sequence, top_k)
+        modulated = [sequence[i] for i in order]
         
-        # Ordenar secuencia extendida por resonancia QBTC
-        extended_with_resonance = [(p, r, i) for p, r, i in resonance_indices 
-                                  if i >= len(self.sacred_primes)]
-        extended_with_resonance.sort(key=lambda x: x[1], reverse=True)
+        logger.info("Modulación QBTC aplicada: %d primos reordenados por resonancia", 
+                   len(modulated) - len(self.sacred_primes))
         
-        # Reconstruir secuencia modulada
-        modulated_extended = [p for p, r, i in extended_with_resonance]
+        return modulated
+    
+    @profiled
+    def score_population(self, limit: int) -> PopulationScores:
+        """
+        Calcula la resonancia compuesta de todos los primos hasta un límite
         
-        logger.info("Modulación QBTC aplicada: %d primos reordenados por resonancia", 
-                   len(modulated_extended))
+        Marca gemelos, palindrómicos, Mersenne, Sophie Germain, sagrados y
+        suma de dígitos prima como bits sobre una única criba compartida, y
+        combina las máscaras con RESONANCE_WEIGHTS mediante una tabla de 64
+        entradas equivalente a calculate_composite_resonance.
         
-        return base_sequence + modulated_extended
+        Args:
+            limit (int): Límite superior de la población
+            
+        Returns:
+            PopulationScores: primos, máscaras de flags y scores por primo
+        """
+        if limit < 2:
+            if np is not None:
+                return PopulationScores(np.zeros(0, dtype=np.uint64),
+                                        np.zeros(0, dtype=np.uint8),
+                                        np.zeros(0, dtype=np.float64))
+            return PopulationScores(array('Q'), array('B'), array('d'))
+        
+        logger.info("Calculando resonancia compuesta de la población hasta %d", limit)
+        
+        # Una sola criba cubre Sophie Germain (2p + 1) y las sumas de dígitos
+        with self._stage('sieve'):
+            sieve = sieve_bytearray(2 * limit + 1)
+        bits = quantum_resonance_config.QUANTUM_CONFIG.RESONANCE_FLAG_BITS
+        
+        if np is not None:
+            flags_by_value = np.frombuffer(sieve, dtype=np.uint8)
+            primes = np.flatnonzero(flags_by_value[:limit + 1]).astype(np.uint64)
+            p = primes.astype(np.int64)
+            flags = np.zeros(p.size, dtype=np.uint8)
+            
+            upper_ok = p + 2 <= limit
+            twin = (upper_ok & (flags_by_value[np.minimum(p + 2, limit)] == 1)) | \
+                   ((p >= 4) & (flags_by_value[np.maximum(p - 2, 0)] == 1))
+            flags[twin] |= bits['twin_prime']
+            
+            flags[palindromic_mask(p)] |= bits['palindromic']
+            flags[(p & (p + 1)) == 0] |= bits['mersenne']
+            flags[flags_by_value[2 * p + 1] == 1] |= bits['sophie_germain']
+            flags[np.isin(p, self.sacred_primes)] |= bits['sacred_sequence']
+            flags[flags_by_value[digit_sums(p)] == 1] |= bits['digit_sum_prime']
+        else:
+            primes = array('Q', primes_from_sieve(sieve, 0, limit + 1))
+            sacred = self.sacred_set
+            flags = array('B', bytes(len(primes)))
+            for i, prime in enumerate(primes):
+                mask = 0
+                if (prime + 2 <= limit and sieve[prime + 2]) or (prime >= 4 and sieve[prime - 2]):
+                    mask |= bits['twin_prime']
+                if is_palindromic_number(prime):
+                    mask |= bits['palindromic']
+                if prime & (prime + 1) == 0:
+                    mask |= bits['mersenne']
+                if sieve[2 * prime + 1]:
+                    mask |= bits['sophie_germain']
+                if prime in sacred:
+                    mask |= bits['sacred_sequence']
+                if sieve[digit_sum(prime)]:
+                    mask |= bits['digit_sum_prime']
+                flags[i] = mask
+        
+        config = quantum_resonance_config.QUANTUM_CONFIG
+        scores = config.calculate_composite_resonance_batch(flags)
+        logger.info("Población puntuada: %d primos hasta %d", len(primes), limit)
+        return PopulationScores(primes, flags, scores)
     
-    def analyze_prime_patterns(self, primes: List[int]) -> Dict:
+    @profiled
+    def analyze_prime_patterns(self, primes: List[int], sacred_count: int = None) -> Dict:
         """
         Analiza patrones en una lista de primos para métricas cuánticas
         
         Args:
             primes (List[int]): Lista de números primos
+            sacred_count (int): Conteo precalculado de primos sagrados (opcional)
             
         Returns:
             Dict: Análisis de patrones y métricas
@@ -383,20 +872,26 @@ class PrimeResonanceEngine:
             'average_gap': sum(gaps) / len(gaps) if gaps else 0,
             'max_gap': max(gaps) if gaps else 0,
             'min_gap': min(gaps) if gaps else 0,
-            'twin_prime_count': len(self.find_twin_primes(max(primes))),
+            'twin_prime_count': len(self.find_twin_primes(max(primes), as_array=True)),
             'palindromic_count': len([p for p in primes if self.is_palindromic(p)]),
-            'resonance_factor': self._calculate_resonance_factor(primes)
+            'resonance_factor': self._calculate_resonance_factor(primes, sacred_count, gaps)
         }
         
         logger.info("Análisis de patrones completado: %d primos analizados", len(primes))
         return analysis
     
-    def _calculate_resonance_factor(self, primes: List[int]) -> float:
+    @profiled_stage('resonance_factor')
+    def _calculate_resonance_factor(self, primes: List[int], sacred_count: int = None,
+                                    gaps: List[int] = None,
+                                    qbtc_enhancement: float = None) -> float:
         """
         Calcula factor de resonancia cuántica para una lista de primos
         
         Args:
             primes (List[int]): Lista de primos
+            sacred_count (int): Conteo precalculado de primos sagrados (opcional)
+            gaps (List[int]): Gaps precalculados (opcional)
+            qbtc_enhancement (float): Mejora QBTC precalculada (opcional)
             
         Returns:
             float: Factor de resonancia (0.0 a 1.0)
@@ -405,25 +900,30 @@ class PrimeResonanceEngine:
             return 0.0
         
         # Calcular resonancia basada en presencia de primos sagrados
-        sacred_present = sum(1 for p in primes if p in self.sacred_primes)
+        sacred_present = self.count_sacred_primes(primes) if sacred_count is None else sacred_count
         sacred_ratio = sacred_present / len(self.sacred_primes)
         
         # Factor de distribución uniforme de gaps
-        gaps = [primes[i+1] - primes[i] for i in range(len(primes)-1)]
-        gap_variance = sum((g - sum(gaps)/len(gaps))**2 for g in gaps) / len(gaps)
+        if gaps is None:
+            gaps = [primes[i+1] - primes[i] for i in range(len(primes)-1)]
+        mean_gap = sum(gaps) / len(gaps)
+        gap_variance = sum((g - mean_gap)**2 for g in gaps) / len(gaps)
         uniformity_factor = 1.0 / (1.0 + gap_variance / 100)
         
         # Factor combinado con mejoras QBTC
-        qbtc_factor = self._calculate_qbtc_resonance_enhancement(primes)
+        qbtc_factor = (self._calculate_qbtc_resonance_enhancement(primes)
+                       if qbtc_enhancement is None else qbtc_enhancement)
         resonance = (sacred_ratio * 0.5) + (uniformity_factor * 0.3) + (qbtc_factor * 0.2)
         return min(1.0, resonance)
     
-    def _calculate_qbtc_resonance_enhancement(self, primes: List[int]) -> float:
+    @profiled_stage('qbtc_enhancement')
+    def _calculate_qbtc_resonance_enhancement(self, primes: List[int], phases=None) -> float:
         """
         Calcula factor de mejora de resonancia usando constantes QBTC
         
         Args:
             primes (List[int]): Lista de primos
+            phases: Fases cuánticas precalculadas de primes (opcional)
             
         Returns:
             float: Factor de mejora QBTC (0.0 a 1.0)
@@ -432,7 +932,10 @@ class PrimeResonanceEngine:
             return 0.0
         
         # Análisis de fase cuántica promedio
-        avg_quantum_phase = sum(QBTCConstants.get_quantum_phase(p) for p in primes) / len(primes)
+        if phases is None:
+            phases = QBTCConstants.get_quantum_phases(primes)
+        total_phase = phases.sum() if np is not None else sum(phases)
+        avg_quantum_phase = float(total_phase) / len(primes)
         phase_coherence = 1.0 - abs(avg_quantum_phase - math.pi) / math.pi
         
         # Presencia del primo fundamental 7919 o múltiplos
@@ -448,55 +951,124 @@ class PrimeResonanceEngine:
         
         return qbtc_enhancement
     
-    def get_qbtc_analysis_report(self, primes: List[int]) -> Dict:
+    @profiled
+    def get_qbtc_analysis_report(self, primes: List[int], lazy: bool = False) -> Dict:
         """
         Genera reporte de análisis completo con métricas QBTC avanzadas
         
+        Los intermedios (gaps, fases, z-mods) se calculan una sola vez y se
+        comparten entre métricas. Con lazy=True se devuelve un
+        LazyAnalysisReport de solo lectura que evalúa cada métrica en su primer
+        acceso, sobre una copia de la serie tomada al crearlo.
+        
         Args:
             primes (List[int]): Lista de números primos
+            lazy (bool): Devolver el reporte diferido en lugar del dict
             
         Returns:
-            Dict: Reporte completo de análisis QBTC
+            Dict: Reporte completo de análisis QBTC ({} si no hay primos;
+                LazyAnalysisReport si lazy)
         """
-        if not primes:
+        if lazy:
+            return LazyAnalysisReport(self, primes)
+        if not len(primes):
             return {}
+        return LazyAnalysisReport(self, primes, snapshot=False).to_dict()
+    
+    @profiled
+    def get_qbtc_analysis_report_chunked(self, primes, memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                                         chunk_size: int = None) -> Dict:
+        """
+        Variante de get_qbtc_analysis_report con memoria acotada para series enormes
         
-        # Análisis básico
-        basic_analysis = self.analyze_prime_patterns(primes)
-        
-        # Análisis QBTC avanzado
-        qbtc_metrics = {
-            'z_complex_magnitude': QBTCConstants.Z_MAGNITUDE,
-            'lambda_7919': QBTCConstants.LAMBDA_7919,
-            'prime_7919': QBTCConstants.PRIME_7919,
-            'golden_ratio': QBTCConstants.GOLDEN_RATIO,
-            'quantum_phase_distribution': [QBTCConstants.get_quantum_phase(p) for p in primes[-10:]],
-            'z_modulation_coherence': self._calculate_z_modulation_coherence(primes),
-            'lambda_resonance_strength': self._calculate_lambda_resonance_strength(primes),
-            'sacred_prime_density': len([p for p in primes if p in self.sacred_primes]) / len(primes),
-            'qbtc_optimization_score': self._calculate_qbtc_optimization_score(primes)
-        }
+        Recorre la serie una sola vez en bloques de tamaño fijo acumulando sumas,
+        extremos y momentos, y cuenta los gemelos con la criba segmentada en
+        streaming. Produce las mismas claves que get_qbtc_analysis_report.
         
-        # Combinar análisis
-        complete_report = {
-            **basic_analysis,
-            'qbtc_metrics': qbtc_metrics,
+        Args:
+            primes: Iterable de primos, generador, np.ndarray o np.memmap
+            memory_limit (int): Pico de memoria aproximado en bytes
+            chunk_size (int): Primos por bloque (por defecto derivado de memory_limit)
+            
+        Returns:
+            Dict: Reporte completo de análisis QBTC
+        """
+        chunk_size = chunk_size or chunk_size_for_memory(memory_limit)
+        accumulator = ReportAccumulator(self.sacred_set)
+        with self._stage('chunk_scan'):
+            for chunk in iter_chunks(primes, chunk_size):
+                accumulator.update(chunk)
+        
+        total = accumulator.primes.count
+        if not total:
+            return {}
+        gaps = accumulator.gaps
+        tail = list(accumulator.tail)
+        
+        with self._stage('constellation_scan'):
+            segment_size = max(MIN_CHUNK_SIZE, min(DEFAULT_SEGMENT_SIZE, memory_limit // 8))
+            twin_count = sum(1 for _ in iter_constellations(accumulator.primes.maximum,
+                                                            [(0, 2)], segment_size))
+        
+        # Mismas fórmulas que los _calculate_* sobre las magnitudes acumuladas
+        phase_coherence = 1.0 - abs(accumulator.phase_sum / total - math.pi) / math.pi
+        has_7919_relation = any(p % 7919 == 0 or p % 79 == 0 or p % 19 == 0 for p in tail)
+        golden_alignment = accumulator.golden_count / total
+        qbtc_enhancement = (phase_coherence * 0.4 +
+                            (1.0 if has_7919_relation else 0.0) * 0.3 +
+                            golden_alignment * 0.3)
+        
+        if total < 2:
+            resonance_factor = 0.0
+        else:
+            sacred_ratio = accumulator.sacred_count / len(self.sacred_primes)
+            uniformity_factor = 1.0 / (1.0 + gaps.variance / 100)
+            resonance_factor = min(1.0, (sacred_ratio * 0.5) + (uniformity_factor * 0.3) +
+                                   (qbtc_enhancement * 0.2))
+        
+        z_coherence = (1.0 if total < 2 else
+                       1.0 / (1.0 + accumulator.z_modulations.variance / QBTCConstants.Z_MAGNITUDE))
+        lambda_strength = accumulator.abs_sin_phase_sum / total
+        sacred_density = accumulator.sacred_count / total
+        
+        logger.info("Análisis de patrones por bloques completado: %d primos analizados", total)
+        return {
+            'total_primes': total,
+            'min_prime': accumulator.primes.minimum,
+            'max_prime': accumulator.primes.maximum,
+            'average_gap': gaps.total / gaps.count if gaps.count else 0,
+            'max_gap': gaps.maximum if gaps.count else 0,
+            'min_gap': gaps.minimum if gaps.count else 0,
+            'twin_prime_count': twin_count,
+            'palindromic_count': accumulator.palindromic_count,
+            'resonance_factor': resonance_factor,
+            'qbtc_metrics': {
+                'z_complex_magnitude': QBTCConstants.Z_MAGNITUDE,
+                'lambda_7919': QBTCConstants.LAMBDA_7919,
+                'prime_7919': QBTCConstants.PRIME_7919,
+                'golden_ratio': QBTCConstants.GOLDEN_RATIO,
+                'quantum_phase_distribution': [QBTCConstants.get_quantum_phase(p) for p in tail],
+                'z_modulation_coherence': z_coherence,
+                'lambda_resonance_strength': lambda_strength,
+                'sacred_prime_density': sacred_density,
+                'qbtc_optimization_score': (z_coherence * 0.25 +
+                                            lambda_strength * 0.25 +
+                                            sacred_density * 0.25 +
+                                            qbtc_enhancement * 0.25)
+            },
             'system_version': 'QBTC-Enhanced v1.0',
             'analysis_timestamp': '2025-08-14'
         }
-        
-        return complete_report
     
-    def _calculate_z_modulation_coherence(self, primes: List[int]) -> float:
-        """Calcula coherencia de modulación usando Z_COMPLEX"""
+    @profiled_stage('z_modulation')
+    def _calculate_z_modulation_coherence(self, primes: List[int],
+                                          z_modulations: List[float] = None) -> float:
+        """Calcula coherencia de modulación usando Z_COMPLEX (z-mods precalculados opcionales)"""
         if not primes:
             return 0.0
         
-        z_modulations = []
-        for prime in primes:
-            z_mod = (prime * QBTCConstants.QUANTUM_MODULATION_REAL + 
-                    QBTCConstants.QUANTUM_MODULATION_IMAG * 10) % QBTCConstants.Z_MAGNITUDE
-            z_modulations.append(z_mod)
+        if z_modulations is None:
+            z_modulations = self._z_modulations(primes)
         
         # Coherencia como inverso de la varianza normalizada
         if len(z_modulations) < 2:
@@ -508,32 +1080,48 @@ class PrimeResonanceEngine:
         
         return coherence
     
-    def _calculate_lambda_resonance_strength(self, primes: List[int]) -> float:
-        """Calcula fuerza de resonancia usando Lambda_7919"""
+    @staticmethod
+    def _z_modulations(primes: List[int]) -> List[float]:
+        """Modulación Z de cada primo"""
+        offset = QBTCConstants.QUANTUM_MODULATION_IMAG * 10
+        return [(prime * QBTCConstants.QUANTUM_MODULATION_REAL + offset) % QBTCConstants.Z_MAGNITUDE
+                for prime in primes]
+    
+    @profiled_stage('trig_scoring')
+    def _calculate_lambda_resonance_strength(self, primes: List[int], sin_phases=None) -> float:
+        """Calcula fuerza de resonancia usando Lambda_7919 (senos precalculados opcionales)"""
         if not primes:
             return 0.0
         
-        resonance_scores = []
-        for prime in primes:
-            # Resonancia basada en fase Lambda
-            lambda_phase = (prime * QBTCConstants.LAMBDA_7919) % (2 * math.pi)
-            resonance_score = abs(math.sin(lambda_phase))
-            resonance_scores.append(resonance_score)
+        # Resonancia basada en fase Lambda (tablas/vectorizado cuando existen)
+        resonance_scores = (QBTCConstants.get_sin_quantum_phases(primes)
+                            if sin_phases is None else sin_phases)
         
         # Promedio de resonancia
-        avg_resonance = sum(resonance_scores) / len(resonance_scores)
+        if np is not None:
+            return float(np.abs(resonance_scores).mean())
+        avg_resonance = sum(map(abs, resonance_scores)) / len(resonance_scores)
         return avg_resonance
     
-    def _calculate_qbtc_optimization_score(self, primes: List[int]) -> float:
-        """Calcula score de optimización QBTC general"""
+    @profiled_stage('optimization_score')
+    def _calculate_qbtc_optimization_score(self, primes: List[int], sacred_count: int = None,
+                                           z_coherence: float = None,
+                                           lambda_strength: float = None,
+                                           qbtc_enhancement: float = None) -> float:
+        """Calcula score de optimización QBTC general (componentes precalculados opcionales)"""
         if not primes:
             return 0.0
         
         # Componentes del score
-        z_coherence = self._calculate_z_modulation_coherence(primes)
-        lambda_strength = self._calculate_lambda_resonance_strength(primes)
-        sacred_density = len([p for p in primes if p in self.sacred_primes]) / len(primes)
-        qbtc_enhancement = self._calculate_qbtc_resonance_enhancement(primes)
+        if z_coherence is None:
+            z_coherence = self._calculate_z_modulation_coherence(primes)
+        if lambda_strength is None:
+            lambda_strength = self._calculate_lambda_resonance_strength(primes)
+        if sacred_count is None:
+            sacred_count = self.count_sacred_primes(primes)
+        sacred_density = sacred_count / len(primes)
+        if qbtc_enhancement is None:
+            qbtc_enhancement = self._calculate_qbtc_resonance_enhancement(primes)
         
         # Score compuesto
         optimization_score = (z_coherence * 0.25 + 
@@ -544,8 +1132,21 @@ class PrimeResonanceEngine:
         return optimization_score
 
 
+@lru_cache(maxsize=None)
+def get_default_engine() -> PrimeResonanceEngine:
+    """
+    Obtiene el motor compartido del proceso, construido en su primer uso
+    
+    Returns:
+        PrimeResonanceEngine: Instancia compartida
+    """
+    return PrimeResonanceEngine()
+
+
 def main():
     """Función principal para demostración del sistema"""
+    # Configuración del sistema para procesos en segundo plano
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     logger.info("=== INICIANDO SISTEMA DE UTILIDADES DE PRIMOS Y RESONANCIAS ===")
     
     # Inicializar motor
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Criba Compartida de Números Primos
+QuantumLeverageEngine - Núcleo de Criba
+
+Implementa la criba de Eratóstenes sobre bytearray que comparten el motor de
+resonancias, las tablas precomputadas y los pipelines de scoring por lotes.
+"""
+
+import math
+from itertools import compress
+from typing import Iterator, List, Tuple
+
+
+def sieve_bytearray(limit: int) -> bytearray:
+    """
+    Construye la criba de Eratóstenes hasta un límite (inclusive)
+
+    Args:
+        limit (int): Límite superior de la criba
+
+    Returns:
+        bytearray: sieve[n] == 1 si n es primo, de longitud limit + 1
+    """
+    if limit < 2:
+        return bytearray(max(limit + 1, 0))
+
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+    return sieve
+
+
+def primes_from_sieve(sieve: bytearray, start: int = 0, stop: int = None) -> List[int]:
+    """
+    Extrae la lista de primos marcados en una criba
+
+    Args:
+        sieve (bytearray): Criba generada por sieve_bytearray
+        start (int): Primer valor a considerar
+        stop (int): Límite exclusivo (por defecto toda la criba)
+
+    Returns:
+        List[int]: Primos en [start, stop)
+    """
+    stop = len(sieve) if stop is None else min(stop, len(sieve))
+    return list(compress(range(start, stop), sieve[start:stop]))
+
+
+def primes_up_to(limit: int) -> List[int]:
+    """
+    Genera los primos hasta un límite (inclusive)
+
+    Args:
+        limit (int): Límite superior
+
+    Returns:
+        List[int]: Lista de primos
+    """
+    return primes_from_sieve(sieve_bytearray(limit))
+
+
+def iter_sieve_segments(limit: int, segment_size: int = 1 << 20,
+                        start: int = 0, overlap: int = 0) -> Iterator[Tuple[int, int, bytearray]]:
+    """
+    Recorre la criba de [start, limit] por segmentos de tamaño fijo
+
+    Cada segmento cubre [low, high) más `overlap` valores adicionales (sin
+    pasar de limit), de modo que los patrones que miran hacia delante no
+    necesitan cruzar segmentos.
+
+    Args:
+        limit (int): Límite superior (inclusive)
+        segment_size (int): Valores por segmento
+        start (int): Primer valor a cribar
+        overlap (int): Valores extra cribados tras cada segmento
+
+    Yields:
+        Tuple[int, int, bytearray]: (low, high, criba) con criba[i] == 1 si
+            low + i es primo; la criba cubre [low, min(high + overlap, limit + 1))
+    """
+    if limit < 2 or start > limit:
+        return
+    segment_size = max(segment_size, 1)
+    base_primes = primes_up_to(math.isqrt(limit + overlap) + 1)
+
+    for low in range(start, limit + 1, segment_size):
+        high = min(low + segment_size, limit + 1)
+        end = min(high + overlap, limit + 1)
+        segment = bytearray([1]) * (end - low)
+        for p in base_primes:
+            square = p * p
+            if square >= end:
+                break
+            first = max(square, -(-low // p) * p)
+            if first < end:
+                segment[first - low::p] = bytes(len(range(first, end, p)))
+        for n in range(low, min(2, end)):
+            segment[n - low] = 0
+        yield low, high, segment
+
+
+def sieve_range(start: int, stop: int) -> bytearray:
+    """
+    Criba de un intervalo [start, stop) sin cribar desde cero
+
+    Args:
+        start (int): Primer valor del intervalo
+        stop (int): Límite exclusivo
+
+    Returns:
+        bytearray: sieve[i] == 1 si start + i es primo, de longitud stop - start
+    """
+    start = max(start, 0)
+    if stop <= start:
+        return bytearray()
+    for _, _, segment in iter_sieve_segments(stop - 1, stop - start, start):
+        return segment
+    return bytearray(stop - start)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Formato Binario de Transferencia de Primos
+QuantumLeverageEngine - Transferencias Masivas
+
+Codifica rangos de primos para HTTP sin pasar por JSON: uint32/uint64
+little-endian, delta + varint (LEB128) o la propia criba empaquetada a un
+bit por valor, precedidos de una cabecera de 32 bytes. El decodificador
+devuelve un np.ndarray que apunta directamente al buffer recibido (u32/u64
+sin copia), o un array tipado si NumPy no está disponible.
+
+Cabecera (little-endian, 32 bytes, alinea la carga útil a 8 bytes):
+    magic b'QBP' | versión u8 | codificación u8 | 3 bytes de relleno |
+    count u64 | start u64 | stop u64
+"""
+
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Optional, Tuple
+
+from prime_array import PrimeArray, _decode_varints, _encode_varints
+from prime_sieve import sieve_range
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: se decodifica a array tipado
+np = lazy_optional_import('numpy')
+
+MEDIA_TYPE = 'application/vnd.qbtc.primes'
+WIRE_MAGIC = b'QBP'
+WIRE_VERSION = 1
+HEADER = struct.Struct('<3sBB3xQQQ')
+# Codificación -> identificador en la cabecera
+ENCODINGS = {'u32': 1, 'u64': 2, 'varint': 3, 'sieve': 4}
+DEFAULT_ENCODING = 'u64'
+# Valores cribados como máximo por petición de rango
+MAX_RANGE_SPAN = 1 << 25
+
+_ENCODING_NAMES = {code: name for name, code in ENCODINGS.items()}
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def negotiate_encoding(accept: Optional[str]) -> Optional[str]:
+    """
+    Codificación binaria pedida en una cabecera Accept
+
+    Reconoce `application/vnd.qbtc.primes; encoding=<u32|u64|varint|sieve>`
+    (u64 si falta el parámetro).
+
+    Args:
+        accept (str): Valor de la cabecera Accept
+
+    Returns:
+        str: Codificación solicitada, o None si el cliente no pide binario
+
+    Raises:
+        ValueError: Se pide el tipo binario con una codificación desconocida
+    """
+    for media_range in (accept or '').split(','):
+        media_type, *parameters = [part.strip() for part in media_range.split(';')]
+        if media_type.lower() != MEDIA_TYPE:
+            continue
+        options = dict(part.split('=', 1) for part in parameters if '=' in part)
+        encoding = options.get('encoding', DEFAULT_ENCODING).strip('"').lower()
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Codificación no soportada: {encoding!r} "
+                             f"(admitidas: {', '.join(ENCODINGS)})")
+        return encoding
+    return None
+
+
+def content_type(encoding: str) -> str:
+    """Content-Type de una respuesta binaria"""
+    return f"{MEDIA_TYPE}; encoding={encoding}"
+
+
+def _pack_bits(sieve: bytearray) -> bytes:
+    """Empaqueta una criba de 0/1 a un bit por valor (orden de bits little-endian)"""
+    if np is not None:
+        return np.packbits(np.frombuffer(sieve, dtype=np.uint8), bitorder='little').tobytes()
+    if not sieve:
+        return b''
+    bits = bytes(sieve).translate(bytes.maketrans(b'\x00\x01', b'01'))[::-1]
+    return int(bits, 2).to_bytes((len(sieve) + 7) // 8, 'little')
+
+
+def _sieve_primes(sieve: bytearray, start: int):
+    """Primos de una criba de intervalo como buffer uint64"""
+    offsets = PrimeArray.from_sieve(sieve)
+    if np is not None:
+        return offsets.to_numpy() + np.uint64(start)
+    return array('Q', (start + offset for offset in offsets))
+
+
+def encode_range(start: int, stop: int, encoding: str = DEFAULT_ENCODING) -> Tuple[bytes, object]:
+    """
+    Codifica los primos de [start, stop)
+
+    Args:
+        start (int): Primer valor del rango
+        stop (int): Límite exclusivo
+        encoding (str): 'u32', 'u64', 'varint' o 'sieve'
+
+    Returns:
+        Tuple[bytes, buffer]: Cabecera y carga útil; la carga útil u32/u64 es
+            el buffer del array de primos, para escribirla sin copia adicional
+
+    Raises:
+        ValueError: Codificación desconocida, rango inválido o demasiado amplio,
+            o valores que no caben en uint32
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Codificación no soportada: {encoding!r}")
+    if not 0 <= start <= stop:
+        raise ValueError("Se requiere 0 <= start <= stop")
+    if stop - start > MAX_RANGE_SPAN:
+        raise ValueError(f"El rango supera {MAX_RANGE_SPAN} valores")
+    if encoding == 'u32' and stop - 1 > 0xFFFFFFFF:
+        raise ValueError("La codificación u32 requiere stop <= 2**32")
+
+    sieve = sieve_range(start, stop)
+    if encoding == 'sieve':
+        header = HEADER.pack(WIRE_MAGIC, WIRE_VERSION, ENCODINGS[encoding],
+                             sieve.count(1), start, stop)
+        return header, _pack_bits(sieve)
+
+    primes = _sieve_primes(sieve, start)
+    header = HEADER.pack(WIRE_MAGIC, WIRE_VERSION, ENCODINGS[encoding], len(primes), start, stop)
+    if encoding == 'varint':
+        if np is not None:
+            deltas = np.diff(primes, prepend=np.uint64(0))
+        else:
+            deltas = [b - a for a, b in zip([0] + primes.tolist(), primes)]
+        return header, _encode_varints(deltas)
+
+    if np is not None:
+        payload = primes.astype('<u4' if encoding == 'u32' else '<u8', copy=False)
+        return header, memoryview(payload).cast('B')
+    payload = array('I' if encoding == 'u32' else 'Q', primes)
+    if not _LITTLE_ENDIAN:
+        payload.byteswap()
+    return header, memoryview(payload).cast('B')
+
+
+def decode_header(data) -> Tuple[str, int, int, int]:
+    """
+    Lee la cabecera de una respuesta binaria
+
+    Returns:
+        Tuple[str, int, int, int]: (codificación, count, start, stop)
+
+    Raises:
+        ValueError: Cabecera truncada, magic o versión no reconocidos
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Respuesta binaria truncada")
+    magic, version, code, count, start, stop = HEADER.unpack_from(data)
+    if magic != WIRE_MAGIC or version != WIRE_VERSION or code not in _ENCODING_NAMES:
+        raise ValueError("Cabecera de formato binario no reconocida")
+    return _ENCODING_NAMES[code], count, start, stop
+
+
+def decode_primes(data):
+    """
+    Decodifica una respuesta binaria de primos
+
+    Con NumPy, u32/u64 se devuelven como vista de solo lectura sobre `data`
+    (np.frombuffer, sin copia ni parseo); varint y sieve se reconstruyen
+    vectorialmente a uint64.
+
+    Args:
+        data: bytes, bytearray o memoryview con cabecera y carga útil
+
+    Returns:
+        np.ndarray (uint32/uint64) con NumPy, array('I'/'Q') en otro caso
+    """
+    encoding, count, start, stop = decode_header(data)
+    payload = memoryview(data)[HEADER.size:]
+
+    if encoding in ('u32', 'u64'):
+        width = 4 if encoding == 'u32' else 8
+        if len(payload) < count * width:
+            raise ValueError("Respuesta binaria truncada")
+        if np is not None:
+            return np.frombuffer(payload, dtype='<u4' if width == 4 else '<u8', count=count)
+        values = array('I' if width == 4 else 'Q')
+        values.frombytes(payload[:count * width])
+        if not _LITTLE_ENDIAN:
+            values.byteswap()
+        return values
+
+    if encoding == 'varint':
+        deltas = _decode_varints(bytes(payload), count)
+        if np is not None:
+            return np.cumsum(deltas, dtype=np.uint64)
+        return array('Q', accumulate(deltas))
+
+    span = stop - start
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=span, bitorder='little')
+        return np.flatnonzero(bits).astype(np.uint64) + np.uint64(start)
+    return array('Q', (start + i for i in range(span) if payload[i >> 3] >> (i & 7) & 1))
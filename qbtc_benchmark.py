@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+Suite Formal de Benchmarks del Sistema QBTC
+QuantumLeverageEngine - Rendimiento Reproducible
+
+Mide criba, is_prime, buscadores especiales, secuencia sagrada, reporte de
+análisis, endpoints HTTP del kernel y tiempo de importación en frío con
+perf_counter_ns / python -X importtime, calentamiento, repeticiones y
+percentiles. Genera curvas de escalado (hasta 10^9 para la
+criba segmentada), guarda resultados en JSON y los compara con una línea
+base marcando regresiones.
+
+Uso:
+    python qbtc_benchmark.py --max-exponent 7 --output bench.json
+    python qbtc_benchmark.py --baseline bench.json --threshold 0.15
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from prime_resonance_index import ResonanceRangeIndex
+from prime_resonance_utils import PrimeResonanceEngine
+from prime_sieve import iter_sieve_segments
+
+logger = logging.getLogger('QBTCBenchmark')
+
+# Versión del formato JSON de resultados
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+
+# Presupuesto de importación en frío para CLI y workers de pools (ms acumulados)
+IMPORT_TIME_BUDGET_MS = 150
+STARTUP_MODULES = ('prime_resonance_utils', 'quantum_resonance_config')
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """
+    Percentil con interpolación lineal sobre muestras ordenadas
+
+    Args:
+        sorted_samples (List[float]): Muestras en orden creciente
+        q (float): Percentil en [0, 100]
+
+    Returns:
+        float: Valor del percentil
+    """
+    if not sorted_samples:
+        return 0.0
+    position = (len(sorted_samples) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return float(sorted_samples[lower])
+    weight = position - lower
+    return sorted_samples[lower] * (1 - weight) + sorted_samples[upper] * weight
+
+
+def benchmark(func: Callable[[], object], name: str, size: int = 0, warmup: int = 2,
+              repeat: int = 7, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Mide una función con calentamiento y repeticiones usando perf_counter_ns
+
+    Args:
+        func (Callable): Función sin argumentos a medir
+        name (str): Nombre del benchmark
+        size (int): Tamaño del problema (eje x de la curva de escalado)
+        warmup (int): Ejecuciones previas descartadas
+        repeat (int): Ejecuciones medidas
+        setup (Callable): Preparación no medida antes de cada ejecución
+
+    Returns:
+        Dict: Estadísticas en nanosegundos (min, mean, p50, p90, p99, max, stdev)
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    samples = []
+    for _ in range(max(repeat, 1)):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+
+    return _summarize(samples, name, size, warmup)
+
+
+def _summarize(samples: List[int], name: str, size: int, warmup: int) -> Dict:
+    """Estadísticas en nanosegundos de una lista de muestras"""
+    samples = sorted(samples)
+    return {
+        'name': name,
+        'size': size,
+        'warmup': warmup,
+        'repeat': len(samples),
+        'min_ns': samples[0],
+        'mean_ns': statistics.fmean(samples),
+        'p50_ns': percentile(samples, 50),
+        'p90_ns': percentile(samples, 90),
+        'p99_ns': percentile(samples, 99),
+        'max_ns': samples[-1],
+        'stdev_ns': statistics.pstdev(samples),
+    }
+
+
+def measure_import_time(module: str, repeat: int = 5) -> Dict:
+    """
+    Mide la importación en frío de un módulo con python -X importtime
+
+    Cada repetición usa un intérprete nuevo y registra el tiempo acumulado
+    que importtime atribuye al módulo (sin el arranque del intérprete).
+
+    Args:
+        module (str): Módulo de nivel superior a importar
+        repeat (int): Intérpretes lanzados
+
+    Returns:
+        Dict: Estadísticas en nanosegundos, como benchmark()
+    """
+    samples = []
+    for _ in range(max(repeat, 1)):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                   cwd=os.path.dirname(os.path.abspath(__file__)),
+                                   capture_output=True, text=True, check=True)
+        for line in completed.stderr.splitlines():
+            fields = line.split('|')
+            # Solo la línea del módulo de nivel superior (sin sangría)
+            if len(fields) == 3 and fields[2] == f' {module}':
+                samples.append(int(fields[1]) * 1000)
+    return _summarize(samples, f'import_{module}', 0, 0)
+
+
+def _count_segmented_primes(limit: int) -> int:
+    """Cuenta primos hasta limit con la criba segmentada (memoria constante)"""
+    return sum(segment[:high - low].count(1) for low, high, segment in iter_sieve_segments(limit))
+
+
+def engine_benchmarks(engine: PrimeResonanceEngine) -> Dict[str, Dict]:
+    """
+    Catálogo de benchmarks del motor: función por tamaño y exponente máximo
+
+    Args:
+        engine (PrimeResonanceEngine): Motor a medir
+
+    Returns:
+        Dict[str, Dict]: nombre -> {'func': f(size), 'max_exponent': int, 'setup'}
+    """
+    clear_cache = PrimeResonanceEngine.is_prime.cache_clear
+
+    def report(size: int):
+        primes = engine.generate_primes_sieve(size)
+        return lambda: engine.get_qbtc_analysis_report(primes)
+
+    def single_metric(size: int):
+        primes = engine.generate_primes_sieve(size)
+        return lambda: engine.get_qbtc_analysis_report(primes, lazy=True)['resonance_factor']
+
+    def resonance_top_k(size: int):
+        index = ResonanceRangeIndex.build(size, engine)
+        return lambda: index.top_k(size // 4, size, 10)
+
+    return {
+        'sieve': {'func': lambda n: lambda: engine.generate_primes_sieve(n), 'max_exponent': 8},
+        'segmented_sieve': {'func': lambda n: lambda: _count_segmented_primes(n), 'max_exponent': 9},
+        'is_prime': {'func': lambda n: lambda: [engine.is_prime(i) for i in range(n)],
+                     'max_exponent': 6, 'setup': clear_cache},
+        'twin_primes': {'func': lambda n: lambda: engine.find_twin_primes(n), 'max_exponent': 8},
+        'constellations': {'func': lambda n: lambda: engine.find_prime_constellations(n),
+                           'max_exponent': 8},
+        'mersenne_primes': {'func': lambda n: lambda: engine.find_mersenne_primes(
+            max(2, int(math.log10(n)) * 10)), 'max_exponent': 9, 'setup': clear_cache},
+        'sophie_germain': {'func': lambda n: lambda: engine.find_sophie_germain_primes(n),
+                           'max_exponent': 6, 'setup': clear_cache},
+        'palindromic': {'func': lambda n: lambda: engine.find_palindromic_primes(n),
+                        'max_exponent': 6, 'setup': clear_cache},
+        'population_scores': {'func': lambda n: lambda: engine.score_population(n),
+                              'max_exponent': 8},
+        'sacred_sequence': {'func': lambda n: lambda: engine.generate_sacred_prime_sequence(
+            max(8, n // 100)), 'max_exponent': 6, 'setup': clear_cache},
+        'analysis_report': {'func': report, 'max_exponent': 7},
+        'analysis_single_metric': {'func': single_metric, 'max_exponent': 7},
+        'resonance_index': {'func': lambda n: lambda: ResonanceRangeIndex.build(n, engine),
+                            'max_exponent': 7},
+        'resonance_top_k': {'func': resonance_top_k, 'max_exponent': 7},
+        'gap_spectrum': {'func': lambda n: lambda: engine.gap_correlation_spectrum(n),
+                         'max_exponent': 8},
+        'gap_spectrum_wide': {'func': lambda n: lambda: engine.gap_correlation_spectrum(n, 1024),
+                              'max_exponent': 7},
+    }
+
+
+def http_benchmarks(base_url: str) -> Dict[str, Callable[[], object]]:
+    """
+    Benchmarks de endpoints HTTP del kernel con conexión persistente
+
+    Args:
+        base_url (str): URL base del servidor (http://host:puerto)
+
+    Returns:
+        Dict[str, Callable]: nombre -> petición completa sin argumentos
+    """
+    import http.client
+    from urllib.parse import urlparse
+
+    parsed = urlparse(base_url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=10)
+
+    def request(method: str, path: str, payload: Dict = None) -> Callable[[], object]:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+
+        def call():
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            if response.will_close:
+                connection.close()
+            return data
+        return call
+
+    state = {'entanglement_level': 0.95, 'superposition_factor': 0.87}
+    query = {'archetype': 'benchmark', 'params': {'size': 1}}
+    return {
+        'http_health': request('GET', '/health'),
+        'http_constants': request('GET', '/constants'),
+        'http_process': request('POST', '/process', state),
+        'http_manifest': request('POST', '/manifest', query),
+    }
+
+
+def _start_local_kernel_server():
+    """Inicia el servidor del kernel en un puerto efímero dentro del proceso"""
+    kernel_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernel')
+    if kernel_dir not in sys.path:
+        sys.path.insert(0, kernel_dir)
+    from qbtc_kernel_server import QBTCKernelServer
+
+    server = QBTCKernelServer(host='127.0.0.1', port=0)
+    server.server = server.create_http_server()
+    thread = threading.Thread(target=server.server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def run_suite(max_exponent: int = 6, min_exponent: int = 3, repeat: int = 5, warmup: int = 1,
+              only: Optional[Iterable[str]] = None, include_http: bool = False,
+              http_url: Optional[str] = None) -> Dict:
+    """
+    Ejecuta la suite completa y construye curvas de escalado por benchmark
+
+    Args:
+        max_exponent (int): Tamaño máximo 10^max_exponent (acotado por benchmark)
+        min_exponent (int): Tamaño mínimo 10^min_exponent
+        repeat (int): Repeticiones medidas por punto
+        warmup (int): Calentamientos por punto
+        only (Iterable[str]): Subconjunto de benchmarks a ejecutar
+        include_http (bool): Medir también endpoints HTTP del kernel
+        http_url (str): Servidor existente; si falta se inicia uno local
+
+    Returns:
+        Dict: Metadatos y resultados {nombre: [puntos de la curva]}
+    """
+    engine = PrimeResonanceEngine()
+    selected = set(only) if only else None
+    results: Dict[str, List[Dict]] = {}
+
+    for name, spec in engine_benchmarks(engine).items():
+        if selected is not None and name not in selected:
+            continue
+        top = min(max_exponent, spec['max_exponent'])
+        for exponent in range(min_exponent, top + 1):
+            size = 10 ** exponent
+            logger.info("Benchmark %s tamaño %d", name, size)
+            point = benchmark(spec['func'](size), name, size, warmup=warmup,
+                              repeat=repeat, setup=spec.get('setup'))
+            results.setdefault(name, []).append(point)
+
+    for module in STARTUP_MODULES:
+        name = f'import_{module}'
+        if selected is None or name in selected:
+            results[name] = [measure_import_time(module, repeat)]
+
+    if include_http:
+        server = None
+        if http_url is None:
+            server, http_url = _start_local_kernel_server()
+        try:
+            for name, call in http_benchmarks(http_url).items():
+                if selected is not None and name not in selected:
+                    continue
+                results[name] = [benchmark(call, name, 1, warmup=max(warmup, 5),
+                                           repeat=max(repeat, 50))]
+        finally:
+            if server is not None:
+                server.server.shutdown()
+                server.server.server_close()
+
+    return {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def save_results(results: Dict, path: str) -> None:
+    """Guarda resultados de la suite en JSON"""
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2)
+
+
+def load_results(path: str) -> Dict:
+    """Carga resultados de la suite desde JSON"""
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD,
+                        metric: str = 'p50_ns') -> List[Dict]:
+    """
+    Compara resultados con una línea base punto a punto
+
+    Args:
+        current (Dict): Resultados actuales de run_suite
+        baseline (Dict): Resultados de referencia
+        threshold (float): Aumento relativo tolerado antes de marcar regresión
+        metric (str): Estadística comparada
+
+    Returns:
+        List[Dict]: Comparaciones con ratio y bandera 'regression'
+    """
+    comparisons = []
+    for name, points in current.get('results', {}).items():
+        reference = {p['size']: p for p in baseline.get('results', {}).get(name, [])}
+        for point in points:
+            base = reference.get(point['size'])
+            if not base or not base.get(metric):
+                continue
+            ratio = point[metric] / base[metric]
+            comparisons.append({
+                'name': name,
+                'size': point['size'],
+                'baseline_ns': base[metric],
+                'current_ns': point[metric],
+                'ratio': ratio,
+                'regression': ratio > 1.0 + threshold,
+            })
+    return comparisons
+
+
+def format_results(results: Dict) -> str:
+    """Formatea resultados como tabla de texto"""
+    lines = [f"{'benchmark':<20} {'tamaño':>12} {'p50 ms':>10} {'p90 ms':>10} "
+             f"{'p99 ms':>10} {'min ms':>10}"]
+    for name, points in results['results'].items():
+        for p in points:
+            lines.append(f"{name:<20} {p['size']:>12} {p['p50_ns'] / 1e6:>10.3f} "
+                         f"{p['p90_ns'] / 1e6:>10.3f} {p['p99_ns'] / 1e6:>10.3f} "
+                         f"{p['min_ns'] / 1e6:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Suite de benchmarks QBTC")
+    parser.add_argument('--max-exponent', type=int, default=6,
+                        help="Tamaño máximo 10^N (hasta 9 en la criba segmentada)")
+    parser.add_argument('--min-exponent', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--only', nargs='*', help="Benchmarks a ejecutar")
+    parser.add_argument('--http', action='store_true', help="Incluir endpoints HTTP")
+    parser.add_argument('--http-url', help="Servidor existente para los endpoints")
+    parser.add_argument('--output', help="Archivo JSON de resultados")
+    parser.add_argument('--baseline', help="Archivo JSON de línea base")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--keep-logs', action='store_true',
+                        help="No silenciar el logging INFO del motor durante la medición")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.keep_logs:
+        logging.getLogger('PrimeResonanceEngine').setLevel(logging.WARNING)
+
+    results = run_suite(args.max_exponent, args.min_exponent, args.repeat, args.warmup,
+                        args.only, args.http, args.http_url)
+    print(format_results(results))
+
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        comparisons = compare_to_baseline(results, load_results(args.baseline), args.threshold)
+        regressions = [c for c in comparisons if c['regression']]
+        for c in regressions:
+            print(f"REGRESIÓN {c['name']} tamaño {c['size']}: "
+                  f"{c['baseline_ns'] / 1e6:.3f} ms -> {c['current_ns'] / 1e6:.3f} ms "
+                  f"({c['ratio']:.2f}x)")
+        print(f"Comparados {len(comparisons)} puntos, {len(regressions)} regresiones")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
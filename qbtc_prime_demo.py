@@ -11,11 +11,6 @@ from prime_resonance_utils import PrimeResonanceEngine
 from quantum_resonance_config import QBTCConstants, QUANTUM_CONFIG
 import logging
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('QBTCPrimeDemo')
 
 def print_header(title: str, width: int = 80):
@@ -192,7 +187,9 @@ def demonstrate_qbtc_analysis(engine, primes):
     return qbtc_report
 
 def demonstrate_performance_comparison():
-    """Demuestra comparación de rendimiento"""
+    """Demuestra comparación de rendimiento con la suite formal de benchmarks"""
+    from qbtc_benchmark import benchmark
+    
     print_section("⚡ COMPARACIÓN DE RENDIMIENTO")
     
     engine = PrimeResonanceEngine()
@@ -204,27 +201,36 @@ def demonstrate_performance_comparison():
         print(f"\nPrueba con límite {limit}:")
         
         # Generación con criba
-        start_time = time.time()
         primes = engine.generate_primes_sieve(limit)
-        sieve_time = time.time() - start_time
+        sieve_stats = benchmark(lambda: engine.generate_primes_sieve(limit), 'sieve', limit)
         
         # Análisis QBTC
-        start_time = time.time()
-        qbtc_report = engine.get_qbtc_analysis_report(primes[:min(100, len(primes))])
-        analysis_time = time.time() - start_time
+        sample = primes[:min(100, len(primes))]
+        qbtc_report = engine.get_qbtc_analysis_report(sample)
+        analysis_stats = benchmark(lambda: engine.get_qbtc_analysis_report(sample),
+                                   'analysis_report', len(sample))
         
         # Secuencia sagrada QBTC
-        start_time = time.time()
-        sacred = engine.generate_sacred_prime_sequence(15)
-        sacred_time = time.time() - start_time
+        sacred_stats = benchmark(lambda: engine.generate_sacred_prime_sequence(15),
+                                 'sacred_sequence', 15)
         
-        print(f"   Generación criba: {sieve_time:.4f}s ({len(primes)} primos)")
-        print(f"   Análisis QBTC: {analysis_time:.4f}s")
-        print(f"   Secuencia sagrada: {sacred_time:.4f}s")
+        for label, stats in [('Generación criba', sieve_stats),
+                             ('Análisis QBTC', analysis_stats),
+                             ('Secuencia sagrada', sacred_stats)]:
+            print(f"   {label}: p50 {stats['p50_ns'] / 1e6:.3f} ms, "
+                  f"p90 {stats['p90_ns'] / 1e6:.3f} ms ({stats['repeat']} ejecuciones)")
+        print(f"   Primos generados: {len(primes)}")
         print(f"   Score QBTC: {qbtc_report['qbtc_metrics']['qbtc_optimization_score']:.4f}")
+    
+    print(f"\nSuite completa: python qbtc_benchmark.py --max-exponent 7 --output bench.json")
 
 def main():
     """Función principal de demostración"""
+    # Configuración de logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     print_header("🚀 DEMOSTRACIÓN SISTEMA QBTC-PRIME INTEGRADO 🚀")
     
     print(f"Sistema: QuantumLeverageEngine + QBTC Enhanced v1.0")
@@ -7,9 +7,41 @@ Define patrones, constantes y configuraciones para la generación
 de secuencias de números primos con resonancia cuántica.
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from array import array
+from bisect import bisect_left
+from types import MappingProxyType
 import math
 
+from prime_sieve import primes_up_to
+
+from prime_lazy import lazy_optional_import
+
+# NumPy es opcional y se importa en su primer uso: se recurre a array('d')
+np = lazy_optional_import('numpy')
+
+
+def _build_gap_classifier(resonant_gaps: Dict[str, List[int]]) -> Tuple[Dict[str, int], bytes]:
+    """Construye bits por categoría y tabla gap -> máscara de categorías"""
+    if len(resonant_gaps) > 8:
+        raise ValueError("La tabla de gaps admite como máximo 8 categorías")
+    category_bits = {name: 1 << i for i, name in enumerate(resonant_gaps)}
+    max_gap = max((g for gaps in resonant_gaps.values() for g in gaps), default=0)
+    table = bytearray(max_gap + 1)
+    for name, gaps in resonant_gaps.items():
+        for gap in gaps:
+            table[gap] |= category_bits[name]
+    return category_bits, bytes(table)
+
+
+def _build_membership_bitmap(values: List[int]) -> bytes:
+    """Construye tabla n -> 1 si n pertenece al conjunto (0 en otro caso)"""
+    table = bytearray(max(values, default=-1) + 1)
+    for value in values:
+        table[value] = 1
+    return bytes(table)
+
+
 class QBTCConstants:
     """
     Constantes fundamentales del Sistema Cuántico QBTC integradas
@@ -45,11 +77,161 @@ class QBTCConstants:
         'quantum_modulation': 80      # Modulación cuántica
     }
     
+    # Tablas precomputadas opcionales: fase y sin(fase) por índice de primo
+    PHASE_TABLE_LIMIT = 0
+    _TABLE_PRIMES = array('Q')
+    _PHASE_TABLE = array('d')
+    _SIN_PHASE_TABLE = array('d')
+    
+    @classmethod
+    def build_phase_tables(cls, limit: int = 100000) -> int:
+        """
+        Precomputa fase cuántica y sin(fase) para todos los primos hasta un límite
+        
+        Las tablas se indexan por índice de primo (_TABLE_PRIMES[i] es el primo i).
+        get_quantum_phases y get_sin_quantum_phases devuelven directamente el
+        tramo [i, i + n) cuando reciben n primos consecutivos tabulados; el
+        resto de entradas, y la ruta escalar, usan el cálculo directo.
+        
+        Args:
+            limit (int): Límite superior de primos a tabular
+            
+        Returns:
+            int: Cantidad de primos tabulados
+        """
+        primes = primes_up_to(limit)
+        two_pi = 2 * cls.PI_CONSTANT
+        phases = array('d', ((p * cls.LAMBDA_7919) % two_pi for p in primes))
+        
+        cls._TABLE_PRIMES = array('Q', primes)
+        cls._PHASE_TABLE = phases
+        # math.sin mantiene los valores idénticos a la ruta escalar
+        cls._SIN_PHASE_TABLE = array('d', map(math.sin, phases))
+        cls.PHASE_TABLE_LIMIT = max(limit, 0)
+        return len(primes)
+    
+    @classmethod
+    def clear_phase_tables(cls) -> None:
+        """Libera las tablas precomputadas de fase"""
+        cls._TABLE_PRIMES = array('Q')
+        cls._PHASE_TABLE = array('d')
+        cls._SIN_PHASE_TABLE = array('d')
+        cls.PHASE_TABLE_LIMIT = 0
+    
     @classmethod
-    def get_quantum_phase(cls, value: float) -> float:
-        """Calcula fase cuántica usando constantes QBTC"""
+    def has_phase_tables(cls) -> bool:
+        """Indica si hay tablas de fase precomputadas disponibles"""
+        return len(cls._TABLE_PRIMES) > 0
+    
+    @classmethod
+    def get_phase_tables(cls) -> Tuple:
+        """
+        Obtiene las tablas precomputadas (primos, fases, sin(fases))
+        
+        Returns:
+            Tuple: Vistas NumPy sin copia si NumPy está disponible, array en otro caso
+        """
+        tables = (cls._TABLE_PRIMES, cls._PHASE_TABLE, cls._SIN_PHASE_TABLE)
+        if np is None:
+            return tables
+        return tuple(np.frombuffer(t, dtype=np.uint64 if t.typecode == 'Q' else np.float64)
+                     for t in tables)
+    
+    @classmethod
+    def phase_table_window(cls, primes) -> Optional[Tuple[int, int]]:
+        """
+        Índices de primo [start, stop) si primes son primos consecutivos tabulados
+        
+        Se localiza el primer primo una sola vez y el tramo se valida contra
+        _TABLE_PRIMES con una comparación en bloque (sin búsqueda por elemento).
+        
+        Returns:
+            Tuple[int, int]: Tramo de las tablas, o None si no coincide
+        """
+        count = len(primes)
+        if not count or count > len(cls._TABLE_PRIMES):
+            return None
+        first = primes[0]
+        if not 2 <= first <= cls.PHASE_TABLE_LIMIT:
+            return None
+        start = bisect_left(cls._TABLE_PRIMES, first)
+        stop = start + count
+        if stop > len(cls._TABLE_PRIMES) or cls._TABLE_PRIMES[stop - 1] != primes[-1]:
+            return None
+        if np is not None and isinstance(primes, np.ndarray):
+            table = np.frombuffer(cls._TABLE_PRIMES, dtype=np.uint64)[start:stop]
+            matches = np.array_equal(primes, table)
+        else:
+            try:
+                matches = array('Q', primes) == cls._TABLE_PRIMES[start:stop]
+            except (TypeError, OverflowError):
+                return None
+        return (start, stop) if matches else None
+    
+    @classmethod
+    def _table_slice(cls, values, table: array):
+        """Tramo de una tabla de fase para values, o None si no están tabulados"""
+        window = cls.phase_table_window(values)
+        if window is None:
+            return None
+        if np is not None:
+            return np.frombuffer(table, dtype=np.float64)[window[0]:window[1]].copy()
+        return table[window[0]:window[1]]
+    
+    @classmethod
+    def get_quantum_phase(cls, value):
+        """
+        Calcula fase cuántica usando constantes QBTC
+        
+        Acepta un escalar o un np.ndarray (cálculo vectorizado).
+        """
+        if np is not None and isinstance(value, np.ndarray):
+            return np.remainder(value * cls.LAMBDA_7919, 2 * cls.PI_CONSTANT)
         return (value * cls.LAMBDA_7919) % (2 * cls.PI_CONSTANT)
     
+    @classmethod
+    def get_sin_quantum_phase(cls, value):
+        """Calcula sin(fase cuántica), escalar o vectorizado"""
+        if np is not None and isinstance(value, np.ndarray):
+            return np.sin(cls.get_quantum_phase(value))
+        return math.sin((value * cls.LAMBDA_7919) % (2 * cls.PI_CONSTANT))
+    
+    @classmethod
+    def get_quantum_phases(cls, values: Sequence[float]):
+        """
+        Calcula fases cuánticas para una secuencia completa
+        
+        Si values son primos consecutivos tabulados se devuelve el tramo de la
+        tabla de fases por índice de primo.
+        
+        Returns:
+            np.ndarray si NumPy está disponible, array('d') en otro caso
+        """
+        tabulated = cls._table_slice(values, cls._PHASE_TABLE)
+        if tabulated is not None:
+            return tabulated
+        if np is not None:
+            return cls.get_quantum_phase(np.asarray(values, dtype=np.float64))
+        return array('d', map(cls.get_quantum_phase, values))
+    
+    @classmethod
+    def get_sin_quantum_phases(cls, values: Sequence[float]):
+        """
+        Calcula sin(fase cuántica) para una secuencia completa (tabla si aplica)
+        
+        Returns:
+            np.ndarray si NumPy está disponible, array('d') en otro caso
+        """
+        tabulated = cls._table_slice(values, cls._SIN_PHASE_TABLE)
+        if tabulated is not None:
+            return tabulated
+        if np is not None:
+            return cls.get_sin_quantum_phase(np.asarray(values, dtype=np.float64))
+        return array('d', map(cls.get_sin_quantum_phase, values))
+    
+    # Tamaño de bloque para la normalización fusionada sobre arrays grandes
+    Z_MODULATION_BLOCK = 65536
+    
     @classmethod
     def apply_z_modulation(cls, values: List[float]) -> List[float]:
         """Aplica modulación usando variable compleja Z"""
@@ -68,6 +250,159 @@ class QBTCConstants:
             modulated = [v * normalization_factor for v in modulated]
         
         return modulated
+    
+    @classmethod
+    def apply_z_modulation_array(cls, values, out=None, normalization_factor: float = None):
+        """
+        Versión array-native de apply_z_modulation para series grandes
+        
+        Transforma y acumula las sumas de normalización en una sola pasada por
+        bloques, sin listas intermedias. Con out=values la operación es in-place.
+        
+        Args:
+            values: np.ndarray u objeto con protocolo buffer de dobles ('d')
+            out: Buffer destino opcional del mismo tamaño (puede ser values)
+            normalization_factor (float): Factor fijo (p.ej. de ZModulationStream);
+                si es None se calcula a partir de values
+            
+        Returns:
+            np.ndarray, o el buffer destino (array('d') sin NumPy)
+        """
+        if np is not None:
+            return cls._apply_z_modulation_numpy(values, out, normalization_factor)
+        
+        src = values if isinstance(values, (array, memoryview)) else array('d', values)
+        if isinstance(src, memoryview) and src.format != 'd':
+            src = array('d', src)
+        if out is None:
+            out = array('d', bytes(8 * len(src)))
+        
+        real = cls.QUANTUM_MODULATION_REAL
+        offset = cls.QUANTUM_MODULATION_IMAG * 0.01
+        sum_original = sum_modulated = 0.0
+        for i, v in enumerate(src):
+            m = v * real + offset
+            out[i] = m
+            sum_original += abs(v)
+            sum_modulated += abs(m)
+        
+        factor = normalization_factor
+        if factor is None:
+            factor = sum_original / sum_modulated if sum_modulated > 0 else 1.0
+        if factor != 1.0:
+            for i in range(len(src)):
+                out[i] *= factor
+        return out
+    
+    @classmethod
+    def _apply_z_modulation_numpy(cls, values, out, normalization_factor):
+        """Ruta NumPy de apply_z_modulation_array con buffer auxiliar acotado"""
+        src = np.asarray(values, dtype=np.float64).reshape(-1)
+        dest = np.empty_like(src) if out is None else np.asarray(out).reshape(-1)
+        if dest.dtype != np.float64 or dest.shape != src.shape:
+            raise ValueError("out debe ser un buffer float64 del mismo tamaño que values")
+        
+        block = cls.Z_MODULATION_BLOCK
+        scratch = np.empty(min(block, src.size), dtype=np.float64)
+        sum_original = sum_modulated = 0.0
+        for start in range(0, src.size, block):
+            chunk = src[start:start + block]
+            target = dest[start:start + block]
+            tmp = scratch[:chunk.size]
+            # |v| se suma antes de escribir para soportar out=values
+            sum_original += np.abs(chunk, out=tmp).sum()
+            np.multiply(chunk, cls.QUANTUM_MODULATION_REAL, out=target)
+            target += cls.QUANTUM_MODULATION_IMAG * 0.01
+            sum_modulated += np.abs(target, out=tmp).sum()
+        
+        factor = normalization_factor
+        if factor is None:
+            factor = sum_original / sum_modulated if sum_modulated > 0 else 1.0
+        if factor != 1.0:
+            dest *= factor
+        return dest if out is None else out
+    
+    @classmethod
+    def z_modulation_sums(cls, values) -> Tuple[float, float]:
+        """
+        Calcula (Σ|v|, Σ|v·Re + Im·0.01|) sin materializar la serie modulada
+        
+        Args:
+            values: Secuencia, np.ndarray u objeto buffer de dobles
+            
+        Returns:
+            Tuple[float, float]: Suma original y suma modulada en valor absoluto
+        """
+        real = cls.QUANTUM_MODULATION_REAL
+        offset = cls.QUANTUM_MODULATION_IMAG * 0.01
+        if np is not None:
+            src = np.asarray(values, dtype=np.float64).reshape(-1)
+            sum_original = sum_modulated = 0.0
+            block = cls.Z_MODULATION_BLOCK
+            scratch = np.empty(min(block, src.size), dtype=np.float64)
+            for start in range(0, src.size, block):
+                chunk = src[start:start + block]
+                tmp = scratch[:chunk.size]
+                sum_original += np.abs(chunk, out=tmp).sum()
+                np.multiply(chunk, real, out=tmp)
+                tmp += offset
+                sum_modulated += np.abs(tmp, out=tmp).sum()
+            return float(sum_original), float(sum_modulated)
+        
+        sum_original = sum_modulated = 0.0
+        for v in values:
+            sum_original += abs(v)
+            sum_modulated += abs(v * real + offset)
+        return sum_original, sum_modulated
+
+
+class ZModulationStream:
+    """
+    Modulación Z para entradas por bloques con normalización global consistente
+    
+    Primera fase: update() con cada bloque acumula las sumas de normalización.
+    Segunda fase: apply() transforma cada bloque con el mismo factor global, de
+    modo que el resultado coincide con procesar la serie completa de una vez.
+    """
+    
+    def __init__(self):
+        self.sum_original = 0.0
+        self.sum_modulated = 0.0
+        self.count = 0
+    
+    def update(self, chunk) -> None:
+        """Acumula las sumas de normalización de un bloque"""
+        sum_original, sum_modulated = QBTCConstants.z_modulation_sums(chunk)
+        self.sum_original += sum_original
+        self.sum_modulated += sum_modulated
+        self.count += len(chunk)
+    
+    @property
+    def normalization_factor(self) -> float:
+        """Factor de normalización global acumulado"""
+        if self.sum_modulated > 0:
+            return self.sum_original / self.sum_modulated
+        return 1.0
+    
+    def apply(self, chunk, out=None):
+        """Modula un bloque usando el factor global (admite out= para in-place)"""
+        return QBTCConstants.apply_z_modulation_array(
+            chunk, out=out, normalization_factor=self.normalization_factor)
+    
+    def process(self, chunks):
+        """
+        Procesa una colección re-iterable de bloques en dos pasadas
+        
+        Args:
+            chunks: Colección re-iterable (lista de arrays, vistas de un memmap...)
+            
+        Yields:
+            Bloques modulados con normalización global
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        for chunk in chunks:
+            yield self.apply(chunk)
 
 
 class QuantumResonanceConfig:
@@ -87,6 +422,10 @@ class QuantumResonanceConfig:
         97, 101, 103, 107, 109, 113    # Tercera extensión (hasta 113)
     ]
     
+    # Estructuras congeladas de pertenencia: conjunto base y bitmap extendido
+    SACRED_PRIMES_SET = frozenset(SACRED_PRIMES_BASE)
+    SACRED_PRIMES_BITMAP = _build_membership_bitmap(SACRED_PRIMES_EXTENDED)
+    
     # Patrones de diferencias resonantes entre primos
     RESONANT_GAPS = {
         'twins': [2],                    # Primos gemelos (p, p+2)
@@ -97,6 +436,21 @@ class QuantumResonanceConfig:
         'quantum': [18, 20, 24, 30, 42]  # Gaps cuánticos especiales
     }
     
+    # Constelaciones admisibles (k-tuplas) buscadas en una sola pasada de criba
+    CONSTELLATION_PATTERNS = {
+        'twins': (0, 2),                 # Gemelos
+        'cousins': (0, 4),               # Primos primos
+        'sexy': (0, 6),                  # Sexy
+        'triplets': (0, 2, 6),           # Tripletes (p, p+2, p+6)
+        'triplets_alt': (0, 4, 6),       # Tripletes (p, p+4, p+6)
+        'quadruplets': (0, 2, 6, 8)      # Cuádruples
+    }
+    
+    # Clasificador precomputado: bit por categoría y tabla congelada gap -> máscara
+    GAP_CATEGORY_BITS, GAP_MASK_TABLE = _build_gap_classifier(RESONANT_GAPS)
+    GAP_MASKS: Mapping[int, int] = MappingProxyType(
+        {gap: mask for gap, mask in enumerate(GAP_MASK_TABLE) if mask})
+    
     # Factores de resonancia para diferentes tipos de primos
     RESONANCE_WEIGHTS = {
         'twin_prime': 1.5,        # Multiplicador para primos gemelos
@@ -107,6 +461,9 @@ class QuantumResonanceConfig:
         'digit_sum_prime': 1.2    # Suma de dígitos es prima
     }
     
+    # Bit de cada característica en las máscaras de scoring por lotes
+    RESONANCE_FLAG_BITS = {name: 1 << i for i, name in enumerate(RESONANCE_WEIGHTS)}
+    
     # Umbrales de resonancia cuántica
     QUANTUM_THRESHOLDS = {
         'min_resonance': 0.3,      # Resonancia mínima para aceptar primo
@@ -192,10 +549,106 @@ class QuantumResonanceConfig:
         Returns:
             bool: True si es resonante
         """
-        all_gaps = []
-        for gap_list in cls.RESONANT_GAPS.values():
-            all_gaps.extend(gap_list)
-        return gap in all_gaps
+        return gap in cls.GAP_MASKS
+    
+    @classmethod
+    def classify_gap(cls, gap: int) -> int:
+        """
+        Obtiene la máscara de categorías resonantes de un gap
+        
+        Args:
+            gap (int): Gap entre primos
+            
+        Returns:
+            int: Máscara de bits (ver GAP_CATEGORY_BITS), 0 si no es resonante
+        """
+        return cls.GAP_MASKS.get(gap, 0)
+    
+    @classmethod
+    def classify_gaps(cls, gaps):
+        """
+        Clasifica un vector completo de gaps en máscaras de categorías
+        
+        Args:
+            gaps: Secuencia o np.ndarray de gaps enteros
+            
+        Returns:
+            np.ndarray uint8 si NumPy está disponible, bytes en otro caso
+        """
+        table = cls.GAP_MASK_TABLE
+        limit = len(table)
+        if np is not None:
+            lookup = np.frombuffer(table + b'\x00', dtype=np.uint8)
+            indices = np.clip(np.asarray(gaps, dtype=np.int64), 0, limit)
+            return lookup[indices]
+        return bytes(table[g] if 0 <= g < limit else 0 for g in gaps)
+    
+    @classmethod
+    def is_sacred_prime(cls, n: int, extended: bool = False) -> bool:
+        """
+        Verifica pertenencia a los primos sagrados en O(1)
+        
+        Args:
+            n (int): Número a verificar
+            extended (bool): Usar SACRED_PRIMES_EXTENDED (bitmap) en lugar de la base
+            
+        Returns:
+            bool: True si n es primo sagrado
+        """
+        if not extended:
+            return n in cls.SACRED_PRIMES_SET
+        return 0 <= n < len(cls.SACRED_PRIMES_BITMAP) and cls.SACRED_PRIMES_BITMAP[n] == 1
+    
+    @classmethod
+    def sacred_prime_mask(cls, values):
+        """
+        Marca qué valores de un vector pertenecen a SACRED_PRIMES_EXTENDED
+        
+        Args:
+            values: Secuencia o np.ndarray de enteros
+            
+        Returns:
+            np.ndarray bool si NumPy está disponible, bytes (0/1) en otro caso
+        """
+        table = cls.SACRED_PRIMES_BITMAP
+        limit = len(table)
+        if np is not None:
+            lookup = np.frombuffer(table + b'\x00', dtype=np.uint8).astype(bool)
+            indices = np.asarray(values, dtype=np.int64).reshape(-1)
+            return lookup[np.where((indices >= 0) & (indices < limit), indices, limit)]
+        return bytes(table[v] if 0 <= v < limit else 0 for v in values)
+    
+    @classmethod
+    def gap_category_histogram(cls, gaps) -> Dict[str, int]:
+        """
+        Cuenta cuántos gaps caen en cada categoría resonante
+        
+        Args:
+            gaps: Secuencia o np.ndarray de gaps enteros
+            
+        Returns:
+            Dict[str, int]: Conteo por categoría de RESONANT_GAPS
+        """
+        masks = cls.classify_gaps(gaps)
+        if np is not None:
+            mask_counts = np.bincount(masks, minlength=256)
+        else:
+            mask_counts = [0] * 256
+            for mask in masks:
+                mask_counts[mask] += 1
+        
+        histogram = {}
+        for name, bit in cls.GAP_CATEGORY_BITS.items():
+            histogram[name] = int(sum(count for mask, count in enumerate(mask_counts)
+                                      if mask & bit))
+        return histogram
+    
+    @classmethod
+    def rebuild_gap_classifier(cls) -> None:
+        """Reconstruye el clasificador tras modificar RESONANT_GAPS"""
+        cls.GAP_CATEGORY_BITS, cls.GAP_MASK_TABLE = _build_gap_classifier(cls.RESONANT_GAPS)
+        cls.GAP_MASKS = MappingProxyType(
+            {gap: mask for gap, mask in enumerate(cls.GAP_MASK_TABLE) if mask})
     
     @classmethod
     def get_analysis_config(cls, size: str) -> Dict:
@@ -255,18 +708,63 @@ class QuantumResonanceConfig:
             base_resonance *= cls.RESONANCE_WEIGHTS['digit_sum_prime']
             
         return min(1.0, base_resonance)
+    
+    @classmethod
+    def composite_resonance_table(cls) -> Tuple[float, ...]:
+        """
+        Tabula calculate_composite_resonance para cada combinación de flags
+        
+        Returns:
+            Tuple[float, ...]: Resonancia compuesta indexada por máscara de
+                RESONANCE_FLAG_BITS (64 entradas)
+        """
+        args = ('is_twin', 'is_palindromic', 'is_mersenne', 'is_sophie',
+                'is_sacred', 'has_prime_digit_sum')
+        return tuple(
+            cls.calculate_composite_resonance(
+                **{arg: bool(mask & (1 << bit)) for bit, arg in enumerate(args)})
+            for mask in range(1 << len(args))
+        )
+    
+    @classmethod
+    def calculate_composite_resonance_batch(cls, flags):
+        """
+        Calcula la resonancia compuesta para un vector de máscaras de flags
+        
+        Args:
+            flags: Secuencia o np.ndarray de máscaras (RESONANCE_FLAG_BITS)
+            
+        Returns:
+            np.ndarray float64 si NumPy está disponible, array('d') en otro caso
+        """
+        table = cls.composite_resonance_table()
+        if np is not None:
+            return np.asarray(table, dtype=np.float64)[np.asarray(flags, dtype=np.intp)]
+        return array('d', (table[f] for f in flags))
+
+
+# Instancias globales de configuración: se construyen en el primer acceso
+_SINGLETON_FACTORIES = {
+    'QUANTUM_CONFIG': QuantumResonanceConfig,
+    'QBTC_CONSTANTS': QBTCConstants,
+}
+
 
+def __getattr__(name: str):
+    """Construye bajo demanda las instancias globales (PEP 562)"""
+    factory = _SINGLETON_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    instance = globals()[name] = factory()
+    return instance
 
-# Instancias globales de configuración
-QUANTUM_CONFIG = QuantumResonanceConfig()
-QBTC_CONSTANTS = QBTCConstants()
 
 # Constantes de acceso rápido - Sistema original
-SACRED_PRIMES = QUANTUM_CONFIG.SACRED_PRIMES_BASE
-SACRED_PRIMES_EXT = QUANTUM_CONFIG.SACRED_PRIMES_EXTENDED
-RESONANT_GAPS = QUANTUM_CONFIG.RESONANT_GAPS
-WEIGHTS = QUANTUM_CONFIG.RESONANCE_WEIGHTS
-THRESHOLDS = QUANTUM_CONFIG.QUANTUM_THRESHOLDS
+SACRED_PRIMES = QuantumResonanceConfig.SACRED_PRIMES_BASE
+SACRED_PRIMES_EXT = QuantumResonanceConfig.SACRED_PRIMES_EXTENDED
+RESONANT_GAPS = QuantumResonanceConfig.RESONANT_GAPS
+WEIGHTS = QuantumResonanceConfig.RESONANCE_WEIGHTS
+THRESHOLDS = QuantumResonanceConfig.QUANTUM_THRESHOLDS
 
 # Constantes de acceso rápido - Sistema QBTC integrado
 Z_COMPLEX = QBTCConstants.Z_COMPLEX
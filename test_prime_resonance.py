@@ -7,11 +7,36 @@ Verifica el funcionamiento correcto de todas las funciones del sistema
 de identificación y generación de números primos.
 """
 
+import json
+import math
+import os
+import subprocess
+import tempfile
 import unittest
 import sys
 import time
 from prime_resonance_utils import PrimeResonanceEngine
-from quantum_resonance_config import QUANTUM_CONFIG
+from qbtc_benchmark import (IMPORT_TIME_BUDGET_MS, benchmark, compare_to_baseline,
+                            measure_import_time, percentile, run_suite)
+from array import array
+from quantum_resonance_config import QBTCConstants, QUANTUM_CONFIG, ZModulationStream
+from prime_constellations import find_constellations, is_admissible
+from prime_wheel import Wheel, get_wheel
+from prime_factorization import FactorizationService, is_probable_prime
+from prime_profiling import EngineProfiler
+from prime_array import CompressedPrimeArray, PrimeArray, PrimePairArray
+from prime_report_stream import RunningMoments, chunk_size_for_memory
+from prime_resonance_index import ResonanceRangeIndex
+from prime_analysis_report import LazyAnalysisReport
+from prime_gap_spectrum import gap_spectrum
+from prime_wire import ENCODINGS, decode_primes, encode_range, negotiate_encoding
+from prime_digits import (digit_sum, digit_sums, is_palindromic_number, palindromic_mask,
+                          benchmark_digit_primitives)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class TestPrimeResonanceEngine(unittest.TestCase):
     """
@@ -204,33 +229,1739 @@ class TestPrimeResonanceEngine(unittest.TestCase):
         print("✓ Configuración de resonancia cuántica: PASSED")
     
     def test_performance_benchmark(self):
-        """Prueba de rendimiento para operaciones críticas"""
+        """Prueba de rendimiento para operaciones críticas con la suite formal"""
         print("Ejecutando benchmark de rendimiento...")
         
-        # Benchmark: generación de primos
-        start_time = time.time()
         primes_1000 = self.engine.generate_primes_sieve(1000)
-        sieve_time = time.time() - start_time
-        
-        # Benchmark: verificación individual
-        start_time = time.time()
-        for i in range(2, 1000):
-            self.engine.is_prime(i)
-        individual_time = time.time() - start_time
+        sieve_stats = benchmark(lambda: self.engine.generate_primes_sieve(1000),
+                                'sieve', 1000, warmup=1, repeat=5)
+        individual_stats = benchmark(lambda: [self.engine.is_prime(i) for i in range(2, 1000)],
+                                     'is_prime', 1000, warmup=1, repeat=5,
+                                     setup=PrimeResonanceEngine.is_prime.cache_clear)
         
-        print(f"  - Criba hasta 1000: {sieve_time:.4f}s ({len(primes_1000)} primos)")
-        print(f"  - Verificación individual 2-1000: {individual_time:.4f}s")
+        print(f"  - Criba hasta 1000: p50 {sieve_stats['p50_ns'] / 1e6:.3f} ms "
+              f"({len(primes_1000)} primos)")
+        print(f"  - Verificación individual 2-1000: p50 {individual_stats['p50_ns'] / 1e6:.3f} ms")
         
-        if sieve_time > 0:
-            print(f"  - Eficiencia criba vs individual: {individual_time/sieve_time:.2f}x")
-        else:
-            print("  - Criba extremadamente eficiente (tiempo < 0.0001s)")
+        for stats in (sieve_stats, individual_stats):
+            self.assertEqual(stats['repeat'], 5)
+            self.assertLessEqual(stats['min_ns'], stats['p50_ns'])
+            self.assertLessEqual(stats['p50_ns'], stats['p90_ns'])
+            self.assertLessEqual(stats['p90_ns'], stats['max_ns'])
         
-        # En sistemas rápidos ambos pueden ser muy rápidos, solo verificar que no haya errores
+        # La criba es ~15x más rápida que la verificación individual sin caché; con el
+        # mejor tiempo de cada una y margen 2x solo falla ante una regresión grave
+        self.assertLess(sieve_stats['min_ns'], 2 * individual_stats['min_ns'])
         self.assertGreaterEqual(len(primes_1000), 160)  # Al menos 160 primos hasta 1000
         
         print("✓ Benchmark de rendimiento: PASSED")
+    
+    def test_benchmark_suite_and_baseline(self):
+        """La suite guarda curvas de escalado y detecta regresiones"""
+        results = run_suite(max_exponent=3, min_exponent=2, repeat=2, warmup=0,
+                            only=['sieve', 'twin_primes'])
+        self.assertEqual([p['size'] for p in results['results']['sieve']], [100, 1000])
+        
+        slower = json.loads(json.dumps(results))
+        for point in slower['results']['sieve']:
+            point['p50_ns'] *= 2
+        comparisons = compare_to_baseline(slower, results, threshold=0.5)
+        flagged = {(c['name'], c['size']) for c in comparisons if c['regression']}
+        self.assertEqual(flagged, {('sieve', 100), ('sieve', 1000)})
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2.5)
+
+
+class TestQBTCPhaseTables(unittest.TestCase):
+    """
+    Pruebas para las tablas precomputadas de fase de QBTCConstants
+    """
+    
+    def tearDown(self):
+        QBTCConstants.clear_phase_tables()
+    
+    def test_tables_match_direct_formula(self):
+        """Las tablas deben producir exactamente los mismos valores que la fórmula"""
+        print("Probando tablas precomputadas de fase cuántica...")
+        
+        count = QBTCConstants.build_phase_tables(1000)
+        self.assertEqual(count, 168)
+        self.assertTrue(QBTCConstants.has_phase_tables())
+        
+        two_pi = 2 * math.pi
+        for n in [2, 3, 97, 997, 1000, 1009, 7919]:
+            expected = (n * QBTCConstants.LAMBDA_7919) % two_pi
+            self.assertEqual(QBTCConstants.get_quantum_phase(n), expected)
+            self.assertEqual(QBTCConstants.get_sin_quantum_phase(n), math.sin(expected))
+        
+        primes, phases, sines = QBTCConstants.get_phase_tables()
+        self.assertEqual(len(primes), count)
+        self.assertEqual(int(primes[-1]), 997)
+        self.assertEqual(phases[0], QBTCConstants.get_quantum_phase(2))
+        
+        print("✓ Tablas de fase: PASSED")
+    
+    def test_batch_paths_read_tables_by_prime_index(self):
+        """Primos consecutivos tabulados se leen de la tabla; el resto se calcula"""
+        QBTCConstants.build_phase_tables(1000)
+        window = [11, 13, 17, 19, 23]
+        self.assertEqual(QBTCConstants.phase_table_window(window), (4, 9))
+        for values in ([2, 3, 4, 7], [3, 5, 11], [997, 1009], [-3, 2], [2.5, 3]):
+            self.assertIsNone(QBTCConstants.phase_table_window(values), values)
+        
+        # Una entrada marcada en la tabla solo aparece en la ruta por índice de primo
+        QBTCConstants._PHASE_TABLE[5] = QBTCConstants._SIN_PHASE_TABLE[5] = -1.0
+        self.assertEqual(list(QBTCConstants.get_quantum_phases(window))[1], -1.0)
+        self.assertEqual(list(QBTCConstants.get_sin_quantum_phases(window))[1], -1.0)
+        self.assertNotEqual(QBTCConstants.get_quantum_phase(13), -1.0)
+        self.assertNotEqual(list(QBTCConstants.get_quantum_phases([3, 13]))[1], -1.0)
+        if np is not None:
+            vector = np.array(window, dtype=np.uint64)
+            self.assertEqual(QBTCConstants.get_sin_quantum_phases(vector)[1], -1.0)
+    
+    def test_vectorized_phase(self):
+        """Las versiones por lote coinciden con la ruta escalar"""
+        values = [2, 3, 5, 7, 11, 104729]
+        phases = QBTCConstants.get_quantum_phases(values)
+        sines = QBTCConstants.get_sin_quantum_phases(values)
+        for v, phase, sine in zip(values, phases, sines):
+            self.assertAlmostEqual(phase, QBTCConstants.get_quantum_phase(v), places=12)
+            self.assertAlmostEqual(sine, QBTCConstants.get_sin_quantum_phase(v), places=12)
+        
+        if np is not None:
+            vector = QBTCConstants.get_quantum_phase(np.array(values, dtype=np.float64))
+            self.assertIsInstance(vector, np.ndarray)
+            self.assertEqual(vector.shape, (len(values),))
+    
+    def test_engine_scores_unchanged_with_tables(self):
+        """El scoring del motor no cambia al activar las tablas"""
+        engine = PrimeResonanceEngine()
+        primes = engine.generate_primes_sieve(500)
+        without_tables = engine.get_qbtc_analysis_report(primes)
+        sacred_without = engine.generate_sacred_prime_sequence(20)
+        
+        QBTCConstants.build_phase_tables(1000)
+        with_tables = engine.get_qbtc_analysis_report(primes)
+        
+        self.assertEqual(engine.generate_sacred_prime_sequence(20), sacred_without)
+        for key in ['lambda_resonance_strength', 'qbtc_optimization_score']:
+            self.assertAlmostEqual(with_tables['qbtc_metrics'][key],
+                                   without_tables['qbtc_metrics'][key], places=12)
+
+
+class TestZModulationArray(unittest.TestCase):
+    """
+    Pruebas para la modulación Z array-native y por bloques
+    """
+    
+    def setUp(self):
+        self.values = [float((i * 37) % 101 - 50) for i in range(1000)]
+        self.expected = QBTCConstants.apply_z_modulation(self.values)
+    
+    def test_matches_list_version(self):
+        """La versión por arrays reproduce la versión de listas"""
+        print("Probando modulación Z array-native...")
+        
+        result = QBTCConstants.apply_z_modulation_array(array('d', self.values))
+        self.assertEqual(len(result), len(self.expected))
+        for got, want in zip(result, self.expected):
+            self.assertAlmostEqual(got, want, places=9)
+        
+        print("✓ Modulación Z array-native: PASSED")
+    
+    def test_in_place(self):
+        """out=values modifica el buffer sin crear otro"""
+        buffer = array('d', self.values)
+        result = QBTCConstants.apply_z_modulation_array(buffer, out=buffer)
+        self.assertIs(result, buffer)
+        for got, want in zip(buffer, self.expected):
+            self.assertAlmostEqual(got, want, places=9)
+        
+        if np is not None:
+            vector = np.array(self.values)
+            result = QBTCConstants.apply_z_modulation_array(vector, out=vector)
+            self.assertIs(result, vector)
+            np.testing.assert_allclose(vector, self.expected, rtol=1e-12)
+    
+    def test_chunked_stream_consistent(self):
+        """La normalización por bloques coincide con la serie completa"""
+        chunks = [array('d', self.values[i:i + 128]) for i in range(0, len(self.values), 128)]
+        stream = ZModulationStream()
+        result = [v for chunk in stream.process(chunks) for v in chunk]
+        
+        self.assertEqual(stream.count, len(self.values))
+        for got, want in zip(result, self.expected):
+            self.assertAlmostEqual(got, want, places=9)
+
+
+class TestGapClassifier(unittest.TestCase):
+    """
+    Pruebas para el clasificador precomputado de gaps resonantes
+    """
+    
+    def test_scalar_matches_resonant_gaps(self):
+        """classify_gap e is_resonant_gap reflejan RESONANT_GAPS"""
+        print("Probando clasificador de gaps por máscaras...")
+        
+        bits = QUANTUM_CONFIG.GAP_CATEGORY_BITS
+        for gap in range(-2, 60):
+            expected = 0
+            for name, gaps in QUANTUM_CONFIG.RESONANT_GAPS.items():
+                if gap in gaps:
+                    expected |= bits[name]
+            self.assertEqual(QUANTUM_CONFIG.classify_gap(gap), expected)
+            self.assertEqual(QUANTUM_CONFIG.is_resonant_gap(gap), expected != 0)
+        
+        # El gap 2 es gemelo y Fibonacci a la vez
+        self.assertEqual(QUANTUM_CONFIG.classify_gap(2), bits['twins'] | bits['fibonacci'])
+        
+        print("✓ Clasificador de gaps: PASSED")
+    
+    def test_batch_classification_and_histogram(self):
+        """La clasificación por lotes coincide con la escalar"""
+        gaps = [2, 4, 6, 1, 42, 43, 8, -4, 13, 1000]
+        masks = QUANTUM_CONFIG.classify_gaps(gaps)
+        self.assertEqual([int(m) for m in masks],
+                         [QUANTUM_CONFIG.classify_gap(g) for g in gaps])
+        
+        histogram = QUANTUM_CONFIG.gap_category_histogram(gaps)
+        self.assertEqual(histogram['twins'], 1)
+        self.assertEqual(histogram['fibonacci'], 3)
+        self.assertEqual(histogram['harmonic'], 1)
+        self.assertEqual(histogram['quantum'], 1)
+
+
+class TestPopulationScoring(unittest.TestCase):
+    """
+    Pruebas para el scoring de resonancia compuesta por poblaciones
+    """
+    
+    def setUp(self):
+        self.engine = PrimeResonanceEngine()
+    
+    def test_matches_per_prime_resonance(self):
+        """Cada score coincide con calculate_composite_resonance por primo"""
+        print("Probando scoring de población sobre criba compartida...")
+        
+        limit = 1000
+        result = self.engine.score_population(limit)
+        primes = [int(p) for p in result.primes]
+        self.assertEqual(primes, self.engine.generate_primes_sieve(limit))
+        
+        twin_members = {p for pair in self.engine.find_twin_primes(limit) for p in pair}
+        mersenne = set(self.engine.find_mersenne_primes(10))
+        sophie = set(self.engine.find_sophie_germain_primes(limit))
+        palindromic = set(self.engine.find_palindromic_primes(limit))
+        
+        for prime, score in zip(primes, result.scores):
+            digit_sum = sum(int(d) for d in str(prime))
+            expected = QUANTUM_CONFIG.calculate_composite_resonance(
+                is_twin=prime in twin_members,
+                is_palindromic=prime in palindromic,
+                is_mersenne=prime in mersenne,
+                is_sophie=prime in sophie,
+                is_sacred=prime in self.engine.sacred_primes,
+                has_prime_digit_sum=self.engine.is_prime(digit_sum))
+            self.assertEqual(float(score), expected, f"score distinto para {prime}")
+        
+        print("✓ Scoring de población: PASSED")
+    
+    def test_empty_population(self):
+        """Límites menores que 2 producen una población vacía"""
+        result = self.engine.score_population(1)
+        self.assertEqual(len(result.primes), 0)
+        self.assertEqual(len(result.scores), 0)
+
+
+class TestDigitPrimitives(unittest.TestCase):
+    """
+    Pruebas para las primitivas aritméticas de dígitos
+    """
+    
+    def setUp(self):
+        self.values = list(range(0, 3000)) + [10 ** 12 + 1, 12345678987654321, 1000000007]
+    
+    def test_match_string_implementation(self):
+        """Las primitivas coinciden con las rutas basadas en str"""
+        print("Probando primitivas de dígitos sin conversión a str...")
+        
+        for v in self.values:
+            self.assertEqual(digit_sum(v), sum(int(d) for d in str(v)))
+            self.assertEqual(is_palindromic_number(v), str(v) == str(v)[::-1])
+        self.assertFalse(is_palindromic_number(-11))
+        
+        print("✓ Primitivas de dígitos: PASSED")
+    
+    def test_batch_versions(self):
+        """Las versiones por lotes coinciden con las escalares"""
+        sums = digit_sums(self.values)
+        mask = palindromic_mask(self.values)
+        for v, s, m in zip(self.values, sums, mask):
+            self.assertEqual(int(s), digit_sum(v))
+            self.assertEqual(bool(m), is_palindromic_number(v))
+    
+    def test_digit_sums_full_64_bit_range(self):
+        """uint64 por encima de 2**63, int64 mínimo y enteros mayores no desbordan"""
+        values = [2 ** 64 - 1, 2 ** 63, 2 ** 63 + 12345, 0, 7]
+        expected = [digit_sum(v) for v in values]
+        self.assertEqual(expected[0], 87)
+        self.assertEqual([int(s) for s in digit_sums(values)], expected)
+        self.assertEqual([int(s) for s in digit_sums([-2 ** 63, -19, 2 ** 70, -5])],
+                         [digit_sum(v) for v in (2 ** 63, 19, 2 ** 70, 5)])
+        if np is not None:
+            vector = np.array(values, dtype=np.uint64)
+            self.assertEqual(digit_sums(vector).tolist(), expected)
+            self.assertEqual(digit_sums(PrimeArray([2 ** 64 - 59]).to_numpy()).tolist(),
+                             [digit_sum(2 ** 64 - 59)])
+    
+    def test_palindromic_mask_negative_values(self):
+        """Negativos y cero se resuelven sin bucle infinito en la ruta vectorial"""
+        values = [-5, 121, 0, -121, -1, 7, -10 ** 12 - 1]
+        self.assertEqual([bool(m) for m in palindromic_mask(values)],
+                         [False, True, True, False, False, True, False])
+    
+    def test_digit_primitives_benchmark(self):
+        """Microbenchmark: ruta aritmética frente a ruta con str"""
+        results = benchmark_digit_primitives(count=20000)
+        print(f"  - Suma de dígitos str: {results['digit_sum_str']:.4f}s, "
+              f"tabla: {results['digit_sum_table']:.4f}s "
+              f"({results['digit_sum_speedup']:.2f}x)")
+        print(f"  - Palíndromo str: {results['palindrome_str']:.4f}s, "
+              f"aritmético: {results['palindrome_arith']:.4f}s")
+        self.assertEqual(results['count'], 20000)
+        self.assertGreater(results['digit_sum_str'], 0.0)
+
+
+class TestQBTCModulationOrder(unittest.TestCase):
+    """
+    Pruebas para la modulación QBTC por permutación de índices y top-k
+    """
+    
+    def setUp(self):
+        self.engine = PrimeResonanceEngine()
+    
+    def _reference_modulation(self, sequence):
+        """Implementación de referencia: índice de resonancia y ordenación completa"""
+        base = len(self.engine.sacred_primes)
+        scored = [(p, ((p * QBTCConstants.QUANTUM_MODULATION_REAL) % 1.0 +
+                       abs(math.sin(p * QBTCConstants.LAMBDA_Z_RATIO)) +
+                       (p % int(QBTCConstants.GOLDEN_RATIO * 100)) / 100.0) / 3.0)
+                  for p in sequence[base:]]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return sequence[:base] + [p for p, _ in scored]
+    
+    def test_full_order_matches_reference(self):
+        """La permutación reproduce la ordenación por resonancia original"""
+        print("Probando modulación QBTC por permutación de índices...")
+        
+        for limit in [200, 50000]:
+            sequence = self.engine.generate_primes_sieve(limit)
+            self.assertEqual(self.engine._apply_qbtc_modulation(sequence),
+                             self._reference_modulation(sequence))
+        
+        print("✓ Modulación QBTC por permutación: PASSED")
+    
+    def test_top_k_is_prefix_of_full_order(self):
+        """top_k devuelve exactamente el prefijo de la ordenación completa"""
+        for limit in [500, 50000]:
+            sequence = self.engine.generate_primes_sieve(limit)
+            full = self.engine._apply_qbtc_modulation(sequence)
+            for k in [0, 1, 10, 100]:
+                self.assertEqual(self.engine._apply_qbtc_modulation(sequence, top_k=k),
+                                 full[:7 + k])
+        
+        order = self.engine.qbtc_modulation_order(sequence, top_k=5)
+        self.assertEqual([int(i) for i in order[:7]], list(range(7)))
+        self.assertEqual(len(order), 12)
+
+
+class TestSacredSequenceBlocks(unittest.TestCase):
+    """
+    Pruebas de la generación por bloques especulativos de la secuencia sagrada
+    """
+    
+    def setUp(self):
+        self.engine = PrimeResonanceEngine()
+    
+    def _reference_sequence(self, count):
+        """Implementación de referencia: candidato a candidato con el predicado completo"""
+        sequence = list(self.engine.sacred_primes)
+        candidate = 31
+        while len(sequence) < count:
+            if (self.engine.is_prime(candidate) and
+                    self.engine._has_qbtc_quantum_resonance(candidate, sequence)):
+                sequence.append(candidate)
+            candidate += 2
+        return sequence
+    
+    def test_matches_sequential_reference(self):
+        """Mismos primos y orden que la evaluación secuencial original"""
+        expected = self._reference_sequence(1500)
+        self.assertEqual(list(self.engine.iter_sacred_primes(1500)), expected)
+        self.assertEqual(list(self.engine.iter_sacred_primes(20)), expected[:20])
+        self.assertEqual(self.engine.generate_sacred_prime_sequence(1500),
+                         self.engine._apply_qbtc_modulation(expected))
+    
+    def test_class_table_matches_predicate(self):
+        """La clase del bloque decide igual que el predicado con y sin gap resonante"""
+        engine = self.engine
+        classes = dict(engine._classify_sacred_block(31, 200000))
+        for prime in engine.generate_primes_sieve(200000)[10:]:
+            resonant_gap = engine._has_qbtc_quantum_resonance(prime, [prime - 6])
+            other_gap = engine._has_qbtc_quantum_resonance(prime, [prime - 1])
+            expected = (engine.SACRED_ACCEPT if other_gap else
+                        engine.SACRED_GAP_DEPENDENT if resonant_gap else None)
+            self.assertEqual(classes.get(prime), expected, prime)
+    
+    @unittest.skipIf(np is None, "NumPy no disponible")
+    def test_vectorized_criteria_match_scalar(self):
+        """Los códigos de criterios vectorizados coinciden con la ruta escalar"""
+        candidates = np.array(self.engine.generate_primes_sieve(300000)[10:], dtype=np.int64)
+        codes = self.engine._qbtc_criteria_codes(candidates)
+        self.assertEqual(codes.tolist(),
+                         [self.engine._qbtc_criteria_code(int(c)) for c in candidates])
+
+
+class TestResonanceRangeIndex(unittest.TestCase):
+    """
+    Pruebas del índice de máximos por rango sobre scores de resonancia QBTC
+    """
+    
+    LIMIT = 120000
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = PrimeResonanceEngine()
+        cls.index = ResonanceRangeIndex.build(cls.LIMIT, cls.engine)
+        cls.primes = [int(p) for p in cls.index.primes]
+        cls.scores = [float(s) for s in cls.index.scores]
+    
+    def _reference_top(self, low, high, k):
+        """Referencia: repuntuar la ventana y ordenar de forma estable"""
+        window = [i for i, p in enumerate(self.primes) if low <= p <= high]
+        window.sort(key=lambda i: -self.scores[i])
+        return [(self.primes[i], self.scores[i]) for i in window[:k]]
+    
+    def test_scores_match_engine(self):
+        """La columna es el índice de resonancia de la modulación QBTC"""
+        self.assertEqual(self.primes, self.engine.generate_primes_sieve(self.LIMIT))
+        for score, expected in zip(self.scores, self.engine.qbtc_resonance_indices(self.primes)):
+            self.assertAlmostEqual(score, expected, places=12)
+    
+    def test_range_max_and_top_k_match_reference(self):
+        """Máximo y top-k coinciden con la ordenación completa de la ventana"""
+        import random
+        rng = random.Random(7919)
+        ranges = [(0, self.LIMIT), (0, 1), (2, 2), (24, 28), (7919, 7919), (100, 170)]
+        ranges += [sorted(rng.randint(0, self.LIMIT) for _ in range(2)) for _ in range(60)]
+        for low, high in ranges:
+            expected = self._reference_top(low, high, 10)
+            self.assertEqual(self.index.top_k(low, high, 10), expected, (low, high))
+            self.assertEqual(self.index.range_max(low, high), expected[0] if expected else None)
+        with self.assertRaises(ValueError):
+            self.index.range_max(0, self.LIMIT + 1)
+    
+    def test_incremental_extend_matches_rebuild(self):
+        """extend() deja los mismos niveles que una construcción completa"""
+        index = ResonanceRangeIndex.build(1000, self.engine)
+        for limit in (1001, 5000, 5003, 64007, self.LIMIT):
+            index.extend(limit)
+        self.assertEqual(index.limit, self.LIMIT)
+        self.assertEqual([list(level) for level in index.levels],
+                         [list(level) for level in self.index.levels])
+        self.assertEqual(index.top_k(0, self.LIMIT, 5), self.index.top_k(0, self.LIMIT, 5))
+    
+    def test_save_and_load(self):
+        """El archivo persistido reconstruye un índice equivalente"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'resonance.qri')
+            self.index.save(path)
+            loaded = ResonanceRangeIndex.load(path, self.engine)
+            self.assertEqual(loaded.limit, self.LIMIT)
+            self.assertEqual(list(loaded.scores), self.scores)
+            self.assertEqual(loaded.top_k(5000, 90000, 8), self.index.top_k(5000, 90000, 8))
+            loaded.extend(self.LIMIT + 5000)
+            rebuilt = ResonanceRangeIndex.build(self.LIMIT + 5000, self.engine)
+            self.assertEqual(loaded.top_k(self.LIMIT - 5000, self.LIMIT + 5000, 5),
+                             rebuilt.top_k(self.LIMIT - 5000, self.LIMIT + 5000, 5))
+            
+            with open(path, 'r+b') as handle:
+                handle.truncate(40)
+            with self.assertRaises(ValueError):
+                ResonanceRangeIndex.load(path, self.engine)
+
+
+
+class TestGapSpectrum(unittest.TestCase):
+    """
+    Pruebas del espectro de correlación de gaps (pares (p, p+g) por gap)
+    """
+    
+    LIMIT = 30000
+    MAX_GAP = 60
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = PrimeResonanceEngine()
+        cls.primes = cls.engine.generate_primes_sieve(cls.LIMIT)
+        prime_set = set(cls.primes)
+        cls.expected = [sum(1 for p in cls.primes if p + gap in prime_set)
+                        for gap in range(cls.MAX_GAP + 1)]
+    
+    def test_blocked_matches_brute_force(self):
+        """El método por bloques es exacto con segmentos pequeños y solapes"""
+        for segment_size in (7, 1000, 1 << 22):
+            spectrum = gap_spectrum(self.LIMIT, self.MAX_GAP, 'blocked', segment_size)
+            self.assertEqual(list(spectrum.counts), self.expected, segment_size)
+        for limit in (0, 1, 2, 3, 5, 13):
+            self.assertEqual(list(gap_spectrum(limit, 8, 'blocked', 3).counts),
+                             list(gap_spectrum(limit, 8, 'blocked').counts))
+    
+    @unittest.skipIf(np is None, "NumPy no disponible")
+    def test_fft_matches_blocked(self):
+        """La autocorrelación por FFT coincide con el conteo exacto"""
+        spectrum = gap_spectrum(self.LIMIT, self.MAX_GAP, 'fft')
+        self.assertEqual(spectrum.method, 'fft')
+        self.assertEqual(list(spectrum.counts), self.expected)
+        for limit in (2, 3, 5, 13, 101):
+            self.assertEqual(list(gap_spectrum(limit, 20, 'fft').counts),
+                             list(gap_spectrum(limit, 20, 'blocked').counts))
+    
+    def test_engine_spectrum_and_weights(self):
+        """Gemelos y constelaciones coinciden; categorías ponderadas por RESONANCE_WEIGHTS"""
+        spectrum = self.engine.gap_correlation_spectrum(self.LIMIT)
+        self.assertEqual(spectrum.max_gap, 42)
+        self.assertEqual(spectrum.count(0), len(self.primes))
+        self.assertEqual(spectrum.count(2), len(self.engine.find_twin_primes(self.LIMIT)))
+        self.assertEqual(spectrum.count(6), len(find_constellations(self.LIMIT, [(0, 6)])[(0, 6)]))
+        self.assertEqual(spectrum.count(43), 0)
+        
+        categories = spectrum.category_counts()
+        self.assertEqual(categories['harmonic'], sum(self.expected[g] for g in (8, 10, 12, 14)))
+        weighted = spectrum.weighted_counts()
+        twin_weight = QUANTUM_CONFIG.RESONANCE_WEIGHTS['twin_prime']
+        self.assertEqual(weighted['twins'], categories['twins'] * twin_weight)
+        self.assertEqual(weighted['quantum'], categories['quantum'])
+        self.assertGreater(spectrum.resonance_factor(), 1.0)
+        self.assertEqual(gap_spectrum(1).resonance_factor(), 1.0)
+        
+        with self.assertRaises(ValueError):
+            gap_spectrum(100, method='wavelet')
+
+class TestPrimeConstellations(unittest.TestCase):
+    """
+    Pruebas para el motor de constelaciones de primos
+    """
+    
+    def test_matches_brute_force(self):
+        """Todas las constelaciones coinciden con una búsqueda directa"""
+        print("Probando constelaciones de primos en una pasada...")
+        
+        engine = PrimeResonanceEngine()
+        limit = 5000
+        prime_set = set(engine.generate_primes_sieve(limit))
+        patterns = [(0, 2), (0, 4), (0, 6), (0, 2, 6), (0, 4, 6, 10)]
+        
+        # Segmentos pequeños para cruzar fronteras de segmento
+        results = find_constellations(limit, patterns, segment_size=331)
+        for pattern in patterns:
+            expected = [p for p in range(limit + 1)
+                        if p + pattern[-1] <= limit and all(p + o in prime_set for o in pattern)]
+            self.assertEqual(results[pattern], expected, f"patrón {pattern}")
+        
+        print("✓ Constelaciones de primos: PASSED")
+    
+    def test_admissibility(self):
+        """Los patrones no admisibles se rechazan"""
+        self.assertTrue(is_admissible((0, 2, 6)))
+        self.assertFalse(is_admissible((0, 2, 4)))
+        with self.assertRaises(ValueError):
+            find_constellations(100, [(0, 2, 4)])
+    
+    def test_engine_named_constellations(self):
+        """El motor agrupa por nombre y find_twin_primes usa el mismo motor"""
+        engine = PrimeResonanceEngine()
+        results = engine.find_prime_constellations(200)
+        self.assertEqual(results['twins'][:4], [3, 5, 11, 17])
+        self.assertEqual(results['triplets'][:3], [5, 11, 17])
+        self.assertEqual([p for p, _ in engine.find_twin_primes(200)], results['twins'])
+
+
+class TestPrimeWheel(unittest.TestCase):
+    """
+    Pruebas para el generador de candidatos por rueda
+    """
+    
+    def test_candidates_are_coprime_residues(self):
+        """La rueda emite exactamente los enteros coprimos con su módulo"""
+        print("Probando generador de candidatos por rueda...")
+        
+        for modulus in (30, 210, 2310):
+            wheel = get_wheel(modulus)
+            for start in (0, 31, modulus - 1, 5000):
+                candidates = list(wheel.candidates(start, start + 3000))
+                expected = [n for n in range(start, start + 3000)
+                            if n != 1 and math.gcd(n, modulus) == 1]
+                self.assertEqual(candidates, expected)
+        
+        self.assertGreater(get_wheel(210).fraction_removed, 0.77)
+        self.assertGreater(get_wheel(2310).fraction_removed, 0.79)
+        with self.assertRaises(ValueError):
+            Wheel(42)
+        
+        print("✓ Rueda de candidatos: PASSED")
+    
+    def test_wheel_primes_and_engine_loops(self):
+        """Los bucles del motor no pierden los primos de la rueda"""
+        wheel = get_wheel(2310)
+        self.assertEqual(list(wheel.candidates(0, 20, include_wheel_primes=True)),
+                         [2, 3, 5, 7, 11, 13, 17, 19])
+        
+        engine = PrimeResonanceEngine()
+        self.assertEqual(engine.find_sophie_germain_primes(30)[:5], [2, 3, 5, 11, 23])
+        self.assertEqual(engine.find_palindromic_primes(200)[:5], [2, 3, 5, 7, 11])
+
+
+class TestFactorizationService(unittest.TestCase):
+    """
+    Pruebas para el servicio de factorización
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.service = FactorizationService(dense_limit=10000)
+    
+    def test_factorize_dense_and_large(self):
+        """Factoriza con la tabla SPF y con Pollard–Rho más allá de ella"""
+        print("Probando factorización con tabla SPF y Pollard–Rho...")
+        
+        self.assertEqual(self.service.factorize(360), {2: 3, 3: 2, 5: 1})
+        self.assertEqual(self.service.factorize(7919), {7919: 1})
+        self.assertEqual(self.service.factorize(1), {})
+        self.assertEqual(self.service.factorize(600851475143),
+                         {71: 1, 839: 1, 1471: 1, 6857: 1})
+        self.assertEqual(self.service.factorize((2 ** 31 - 1) * (2 ** 61 - 1)),
+                         {2 ** 31 - 1: 1, 2 ** 61 - 1: 1})
+        self.assertEqual(self.service.factorize(1000003 ** 2 * 12),
+                         {2: 2, 3: 1, 1000003: 2})
+        
+        for n, factors in zip(range(2, 3000), self.service.factorize_batch(range(2, 3000))):
+            product = 1
+            for p, e in factors.items():
+                self.assertTrue(is_probable_prime(p))
+                product *= p ** e
+            self.assertEqual(product, n)
+        
+        print("✓ Factorización: PASSED")
+    
+    def test_divisor_functions(self):
+        """Funciones divisor a partir de la factorización"""
+        self.assertEqual(self.service.divisor_count(12), 6)
+        self.assertEqual(self.service.divisor_sigma(12), 28)
+        self.assertEqual(self.service.divisor_sigma(12, 2), 210)
+        self.assertEqual(self.service.euler_phi(36), 12)
+        self.assertEqual(self.service.divisors(28), [1, 2, 4, 7, 14, 28])
+        
+        values = list(range(1, 2000))
+        self.assertEqual([int(c) for c in self.service.divisor_counts(values)],
+                         [self.service.divisor_count(v) for v in values])
+    
+    def test_engine_uses_miller_rabin_for_large_values(self):
+        """El motor factoriza y verifica primos grandes sin división de prueba"""
+        engine = PrimeResonanceEngine()
+        self.assertEqual(engine.factorize(7919 * 79), {79: 1, 7919: 1})
+        self.assertIn(2 ** 61 - 1, engine.find_mersenne_primes(61))
+        self.assertFalse(engine.is_prime(2 ** 67 - 1))
+
+
+class TestEngineProfiling(unittest.TestCase):
+    """
+    Pruebas para la instrumentación opcional del motor
+    """
+    
+    def test_disabled_by_default(self):
+        """Sin perfilador activo no se registran estadísticas"""
+        engine = PrimeResonanceEngine()
+        self.assertIsNone(engine.profiler)
+        engine.generate_primes_sieve(1000)
+        self.assertEqual(engine.get_profile_stats(), {})
+    
+    def test_methods_and_stages_recorded(self):
+        """Registra llamadas, tiempo y memoria por método público y etapa"""
+        print("Probando instrumentación por método y etapa...")
+        
+        engine = PrimeResonanceEngine()
+        profiler = engine.enable_profiling(trace_memory=True)
+        self.assertIsInstance(profiler, EngineProfiler)
+        
+        primes = engine.generate_primes_sieve(5000)
+        engine.generate_primes_sieve(5000)
+        report = engine.get_qbtc_analysis_report(primes)
+        self.assertIn('qbtc_metrics', report)
+        
+        stats = engine.get_profile_stats()
+        methods, stages = stats['methods'], stats['stages']
+        self.assertEqual(methods['generate_primes_sieve']['calls'], 2)
+        self.assertGreater(methods['generate_primes_sieve']['allocated_bytes'], 0)
+        self.assertEqual(methods['get_qbtc_analysis_report']['calls'], 1)
+        self.assertIn('find_twin_primes', methods)
+        for stage in ('sieve', 'basic_analysis', 'qbtc_metrics', 'z_modulation',
+                      'trig_scoring', 'qbtc_enhancement'):
+            self.assertIn(stage, stages)
+        entry = methods['get_qbtc_analysis_report']
+        self.assertGreaterEqual(entry['total_ns'], entry['max_ns'])
+        self.assertEqual(entry['mean_ns'], entry['total_ns'] / entry['calls'])
+        
+        engine.disable_profiling()
+        self.assertIsNone(engine.profiler)
+        print("✓ Instrumentación: PASSED")
+    
+    def test_cprofile_dump_per_call(self):
+        """Vuelca un .pstats por llamada pública más externa"""
+        import pstats
+        
+        engine = PrimeResonanceEngine()
+        with tempfile.TemporaryDirectory() as directory:
+            engine.enable_profiling(cprofile_dir=directory)
+            engine.find_twin_primes(2000)
+            engine.get_qbtc_analysis_report(engine.generate_primes_sieve(500))
+            engine.disable_profiling()
+            
+            dumps = sorted(os.listdir(directory))
+            self.assertEqual(dumps, ['find_twin_primes-00001.pstats',
+                                     'generate_primes_sieve-00002.pstats',
+                                     'get_qbtc_analysis_report-00003.pstats'])
+            stats = pstats.Stats(os.path.join(directory, dumps[0]))
+            self.assertGreater(stats.total_calls, 0)
+
+
+class TestChunkedAnalysisReport(unittest.TestCase):
+    """
+    Pruebas para el reporte QBTC con memoria acotada
+    """
+    
+    def setUp(self):
+        self.engine = PrimeResonanceEngine()
+        self.primes = self.engine.generate_primes_sieve(50000)
+    
+    def assertReportsClose(self, expected, actual):
+        self.assertEqual(expected.keys(), actual.keys())
+        self.assertEqual(expected['qbtc_metrics'].keys(), actual['qbtc_metrics'].keys())
+        for key in expected:
+            if key == 'qbtc_metrics':
+                for metric, value in expected[key].items():
+                    if isinstance(value, list):
+                        self.assertEqual(len(value), len(actual[key][metric]))
+                        for a, b in zip(value, actual[key][metric]):
+                            self.assertAlmostEqual(a, b, places=9)
+                    else:
+                        self.assertAlmostEqual(value, actual[key][metric], places=9, msg=metric)
+            elif isinstance(expected[key], float):
+                self.assertAlmostEqual(expected[key], actual[key], places=9, msg=key)
+            else:
+                self.assertEqual(expected[key], actual[key], msg=key)
+    
+    def test_matches_full_report(self):
+        """Mismas claves y valores que el reporte sobre la lista completa"""
+        print("Probando reporte por bloques frente al reporte completo...")
+        
+        expected = self.engine.get_qbtc_analysis_report(self.primes)
+        for chunk_size in (1, 7, 1024, len(self.primes) + 1):
+            self.assertReportsClose(expected, self.engine.get_qbtc_analysis_report_chunked(
+                self.primes, chunk_size=chunk_size))
+        self.assertReportsClose(expected, self.engine.get_qbtc_analysis_report_chunked(
+            iter(self.primes), memory_limit=1 << 16))
+        self.assertReportsClose(self.engine.get_qbtc_analysis_report([7919]),
+                                self.engine.get_qbtc_analysis_report_chunked([7919]))
+        self.assertEqual(self.engine.get_qbtc_analysis_report_chunked(iter(())), {})
+        
+        print("✓ Reporte por bloques: PASSED")
+    
+    @unittest.skipIf(np is None, "NumPy no disponible")
+    def test_memory_mapped_input(self):
+        """Acepta arrays mapeados en memoria sin cargarlos completos"""
+        expected = self.engine.get_qbtc_analysis_report(self.primes)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'primes.npy')
+            np.save(path, np.array(self.primes, dtype=np.uint64))
+            mapped = np.load(path, mmap_mode='r')
+            self.assertReportsClose(expected, self.engine.get_qbtc_analysis_report_chunked(
+                mapped, chunk_size=4096))
+            del mapped
+    
+    def test_running_moments_and_chunk_size(self):
+        """Los momentos combinados por bloques igualan a los de una sola pasada"""
+        values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+        moments = RunningMoments()
+        for start in range(0, len(values), 4):
+            moments.update(values[start:start + 4])
+        mean = sum(values) / len(values)
+        self.assertEqual(moments.total, sum(values))
+        self.assertAlmostEqual(moments.mean, mean)
+        self.assertAlmostEqual(moments.variance,
+                               sum((v - mean) ** 2 for v in values) / len(values))
+        self.assertEqual((moments.minimum, moments.maximum), (1, 9))
+        self.assertGreater(chunk_size_for_memory(1 << 30), chunk_size_for_memory(1 << 20))
+
+
+class TestLazyAnalysisReport(unittest.TestCase):
+    """
+    Pruebas del reporte QBTC con evaluación diferida por campo
+    """
+    
+    def setUp(self):
+        self.engine = PrimeResonanceEngine()
+        self.primes = self.engine.generate_primes_sieve(20000)
+    
+    def test_matches_eager_computation(self):
+        """Cada campo coincide con los cálculos directos del motor"""
+        engine, primes = self.engine, self.primes
+        report = engine.get_qbtc_analysis_report(primes)
+        self.assertIsInstance(report, dict)
+        
+        basic = engine.analyze_prime_patterns(primes)
+        self.assertEqual({key: report[key] for key in basic}, basic)
+        sacred_count = engine.count_sacred_primes(primes)
+        metrics = report['qbtc_metrics']
+        self.assertEqual(metrics['z_modulation_coherence'],
+                         engine._calculate_z_modulation_coherence(primes))
+        self.assertEqual(metrics['lambda_resonance_strength'],
+                         engine._calculate_lambda_resonance_strength(primes))
+        self.assertEqual(metrics['sacred_prime_density'], sacred_count / len(primes))
+        self.assertEqual(metrics['qbtc_optimization_score'],
+                         engine._calculate_qbtc_optimization_score(primes))
+        self.assertEqual(metrics['quantum_phase_distribution'],
+                         [QBTCConstants.get_quantum_phase(p) for p in primes[-10:]])
+        self.assertEqual(engine.get_qbtc_analysis_report([]), {})
+    
+    def test_single_metric_computes_only_its_dependencies(self):
+        """resonance_factor no evalúa z-mods, senos, gemelos ni palindrómicos"""
+        report = self.engine.get_qbtc_analysis_report(self.primes, lazy=True)
+        report['resonance_factor']
+        computed = set(report.computed())
+        self.assertTrue({'gaps', 'sacred_count', 'phases', 'qbtc_enhancement'} <= computed)
+        for pending in ('z_modulations', 'sin_phases', 'twin_prime_count', 'palindromic_count',
+                        'z_modulation_coherence', 'qbtc_optimization_score'):
+            self.assertNotIn(pending, computed)
+    
+    def test_shared_metrics_computed_once(self):
+        """Coherencia Z, fuerza lambda y mejora QBTC se calculan una sola vez"""
+        engine = PrimeResonanceEngine()
+        engine.enable_profiling()
+        report = engine.get_qbtc_analysis_report(self.primes, lazy=True)
+        report.to_dict()
+        report.to_dict()
+        stages = engine.get_profile_stats()['stages']
+        for stage in ('z_modulation', 'trig_scoring', 'qbtc_enhancement'):
+            self.assertEqual(stages[stage]['calls'], 1, stage)
+        engine.disable_profiling()
+    
+    def test_dict_compatibility(self):
+        """Se usa como el dict original: claves, get, desempaquetado y JSON"""
+        report = self.engine.get_qbtc_analysis_report(self.primes[:100], lazy=True)
+        materialized = report.to_dict()
+        self.assertIsInstance(materialized['qbtc_metrics'], dict)
+        self.assertEqual(report, materialized)
+        self.assertEqual(materialized, self.engine.get_qbtc_analysis_report(self.primes[:100]))
+        self.assertEqual(list(report), list(materialized))
+        self.assertEqual({**report}['total_primes'], 100)
+        self.assertEqual(report.get('max_prime'), 541)
+        self.assertIsNone(report.get('missing'))
+        self.assertNotIn('missing', report['qbtc_metrics'])
+        with self.assertRaises(KeyError):
+            report['gaps']
+        self.assertEqual(json.loads(json.dumps(materialized))['min_gap'], 1)
+    
+    def test_lazy_report_snapshots_series(self):
+        """El reporte diferido no ve cambios posteriores en la lista y admite series vacías"""
+        primes = self.primes[:100]
+        report = self.engine.get_qbtc_analysis_report(primes, lazy=True)
+        primes.append(7919)
+        primes[0] = 3
+        self.assertEqual(report['total_primes'], 100)
+        self.assertEqual((report['min_prime'], report['max_prime']), (2, 541))
+        
+        empty = self.engine.get_qbtc_analysis_report([], lazy=True)
+        self.assertIsInstance(empty, LazyAnalysisReport)
+        self.assertEqual(empty, {})
+        self.assertEqual(empty.to_dict(), {})
+        self.assertNotIn('total_primes', empty)
+        eager = self.engine.get_qbtc_analysis_report(self.primes[:50])
+        self.assertEqual(json.loads(json.dumps(eager))['total_primes'], 50)
+        self.assertEqual(eager.copy(), eager)
+
+
+class TestPrimeArray(unittest.TestCase):
+    """
+    Pruebas para los contenedores compactos de primos
+    """
+    
+    def setUp(self):
+        self.engine = PrimeResonanceEngine()
+        self.primes = self.engine.generate_primes_sieve(100000)
+    
+    def test_list_compatibility(self):
+        """Indexado, iteración, slicing y pertenencia equivalentes a List[int]"""
+        print("Probando PrimeArray frente a List[int]...")
+        
+        primes = self.engine.generate_primes_sieve(100000, as_array=True)
+        self.assertIsInstance(primes, PrimeArray)
+        self.assertEqual(primes, self.primes)
+        self.assertEqual(list(primes), self.primes)
+        self.assertEqual(len(primes), len(self.primes))
+        self.assertEqual((primes[0], primes[-1]), (2, self.primes[-1]))
+        self.assertEqual(primes[100:110], self.primes[100:110])
+        self.assertIsInstance(primes[5], int)
+        self.assertIn(7919, primes)
+        self.assertNotIn(7921, primes)
+        self.assertNotIn(2 ** 70, primes)
+        self.assertEqual(primes.index(7919), self.primes.index(7919))
+        self.assertEqual(primes.searchsorted(7920), self.primes.index(7927))
+        self.assertEqual(primes.nbytes, 8 * len(self.primes))
+        self.assertEqual(self.engine.generate_primes_sieve(1, as_array=True), [])
+        
+        view = primes.buffer()
+        self.assertEqual((view.itemsize, view.nbytes), (8, primes.nbytes))
+        if np is not None:
+            self.assertTrue(np.shares_memory(primes.to_numpy(), np.asarray(primes)))
+        
+        print("✓ PrimeArray: PASSED")
+    
+    def test_sacred_membership_structures(self):
+        """Conteo de primos sagrados con fusión ordenada y conjunto congelado"""
+        sacred = self.engine.sacred_primes
+        expected = sum(1 for p in self.primes if p in sacred)
+        self.assertEqual(self.engine.count_sacred_primes(self.primes), expected)
+        self.assertEqual(self.engine.count_sacred_primes(PrimeArray(self.primes)), expected)
+        self.assertEqual(self.engine.count_sacred_primes([29, 7, 7, 30, 11]), 4)
+        self.assertEqual(self.engine.count_sacred_primes(list(reversed(self.primes))), expected)
+        if np is not None:
+            self.assertEqual(self.engine.count_sacred_primes(np.array([29, 7, 7, 30, 11])), 4)
+        
+        self.assertTrue(self.engine.is_sacred_prime(13))
+        self.assertFalse(self.engine.is_sacred_prime(31))
+        self.assertTrue(self.engine.is_sacred_prime(31, extended=True))
+        self.assertFalse(self.engine.is_sacred_prime(127, extended=True))
+        extended = QUANTUM_CONFIG.SACRED_PRIMES_EXTENDED
+        mask = QUANTUM_CONFIG.sacred_prime_mask(range(-5, 200))
+        self.assertEqual([n for n, m in zip(range(-5, 200), mask) if m], extended)
+    
+    def test_compressed_form(self):
+        """La forma delta + varint es más compacta y reversible"""
+        compressed = PrimeArray(self.primes).compress()
+        self.assertIsInstance(compressed, CompressedPrimeArray)
+        self.assertLess(compressed.nbytes, PrimeArray(self.primes).nbytes // 4)
+        self.assertEqual(compressed.decompress(), self.primes)
+        self.assertEqual(list(compressed), self.primes)
+        for index in (0, 1, 127, 128, 5000, -1):
+            self.assertEqual(compressed[index], self.primes[index])
+        self.assertIn(99991, compressed)
+        self.assertNotIn(99990, compressed)
+        
+        large = [2 ** 40 + 15, 2 ** 52 + 21, 2 ** 63 + 29]
+        self.assertEqual(CompressedPrimeArray.from_primes(large, block=2).decompress(), large)
+    
+    def test_finders_return_arrays(self):
+        """Todos los buscadores pueden devolver contenedores compactos"""
+        twins = self.engine.find_twin_primes(10000, as_array=True)
+        self.assertIsInstance(twins, PrimePairArray)
+        self.assertEqual(twins, self.engine.find_twin_primes(10000))
+        self.assertIn((101, 103), twins)
+        self.assertNotIn((101, 107), twins)
+        
+        for name, found in self.engine.find_prime_constellations(5000, as_array=True).items():
+            self.assertEqual(found, self.engine.find_prime_constellations(5000)[name])
+        self.assertEqual(self.engine.find_sophie_germain_primes(5000, as_array=True),
+                         self.engine.find_sophie_germain_primes(5000))
+        self.assertEqual(self.engine.find_palindromic_primes(20000, as_array=True),
+                         self.engine.find_palindromic_primes(20000))
+        self.assertEqual(self.engine.find_mersenne_primes(61, as_array=True),
+                         self.engine.find_mersenne_primes(61))
+        
+        report = self.engine.get_qbtc_analysis_report(
+            self.engine.generate_primes_sieve(5000, as_array=True))
+        self.assertEqual(report['total_primes'], 669)
+
+
+class TestStartupLatency(unittest.TestCase):
+    """
+    Pruebas de arranque: importación sin efectos secundarios y dentro de presupuesto
+    """
+    
+    REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+    
+    def run_python(self, code: str, cwd: str = None) -> dict:
+        completed = subprocess.run([sys.executable, '-c', code], cwd=cwd or self.REPO_DIR,
+                                   capture_output=True, text=True, check=True,
+                                   env={**os.environ, 'PYTHONPATH': self.REPO_DIR})
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    
+    def test_import_has_no_side_effects(self):
+        """Importar no instala handlers, no carga NumPy ni construye singletons"""
+        state = self.run_python(
+            "import json, logging, sys\n"
+            "import quantum_resonance_config as config\n"
+            "import prime_resonance_utils\n"
+            "built = 'QUANTUM_CONFIG' in vars(config)\n"
+            "print(json.dumps({'handlers': len(logging.getLogger().handlers),"
+            " 'numpy_loaded': 'numpy._core' in sys.modules or 'numpy.core' in sys.modules,"
+            " 'config_built': built}))")
+        self.assertEqual(state, {'handlers': 0, 'numpy_loaded': False, 'config_built': False})
+    
+    def test_kernel_server_import_creates_no_files(self):
+        """El servidor del kernel configura su log en main(), no al importar"""
+        with tempfile.TemporaryDirectory() as directory:
+            state = self.run_python(
+                "import json, logging, os, sys\n"
+                f"sys.path.insert(0, {os.path.join(self.REPO_DIR, 'kernel')!r})\n"
+                "import qbtc_kernel_server\n"
+                "print(json.dumps({'handlers': len(logging.getLogger().handlers),"
+                " 'files': os.listdir('.')}))", cwd=directory)
+        self.assertEqual(state, {'handlers': 0, 'files': []})
+
+    def test_kernel_server_logs_to_console_by_default(self):
+        """Sin QBTC_KERNEL_LOG el log va solo a consola, sin archivos en el árbol"""
+        with tempfile.TemporaryDirectory() as directory:
+            state = self.run_python(
+                "import json, logging, os, sys\n"
+                "os.environ.pop('QBTC_KERNEL_LOG', None)\n"
+                f"sys.path.insert(0, {os.path.join(self.REPO_DIR, 'kernel')!r})\n"
+                "import qbtc_kernel_server\n"
+                "path = qbtc_kernel_server.configure_logging()\n"
+                "print(json.dumps({'path': path,"
+                " 'handlers': [type(h).__name__ for h in logging.getLogger().handlers],"
+                " 'repo_logs': os.path.exists(os.path.join("
+                f"{self.REPO_DIR!r}, 'logs')), 'files': os.listdir('.')}}))",
+                cwd=directory)
+        self.assertEqual(state, {'path': None, 'handlers': ['StreamHandler'],
+                                 'repo_logs': False, 'files': []})
+
+    def test_lazy_numpy_and_default_engine(self):
+        """NumPy se carga en el primer uso y el motor compartido se construye una vez"""
+        state = self.run_python(
+            "import json, sys\n"
+            "from prime_resonance_utils import get_default_engine\n"
+            "engine = get_default_engine()\n"
+            "twins = engine.find_twin_primes(100)\n"
+            "print(json.dumps({'same': engine is get_default_engine(), 'twins': len(twins)}))")
+        self.assertEqual(state, {'same': True, 'twins': 8})
+    
+    def test_import_time_budget(self):
+        """La importación en frío del motor cabe en el presupuesto de arranque"""
+        point = measure_import_time('prime_resonance_utils', repeat=3)
+        print(f"Importación prime_resonance_utils: {point['min_ns'] / 1e6:.1f} ms "
+              f"(presupuesto {IMPORT_TIME_BUDGET_MS} ms)")
+        self.assertEqual(point['repeat'], 3)
+        self.assertLess(point['min_ns'], IMPORT_TIME_BUDGET_MS * 1e6)
+
+
+class KernelServerTestCase(unittest.TestCase):
+    """
+    Base para pruebas contra un servidor del kernel local
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        """Servidor local en puerto efímero"""
+        from qbtc_benchmark import _start_local_kernel_server
+        cls.server, url = _start_local_kernel_server()
+        cls.port = int(url.rsplit(':', 1)[1])
+        cls.engine = PrimeResonanceEngine()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.jobs.shutdown()
+        cls.server.server.shutdown()
+        cls.server.server.server_close()
+    
+    def request(self, method, path, payload=None):
+        """Petición HTTP: (status, cabeceras, cuerpo JSON o None)"""
+        import http.client
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        try:
+            connection.request(method, path, body=body,
+                               headers={'Content-Type': 'application/json'} if body else {})
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+        is_json = response.getheader('Content-Type') == 'application/json'
+        return response.status, response, json.loads(data) if is_json else None
+
+
+class TestKernelJobs(KernelServerTestCase):
+    """
+    Pruebas de la API de trabajos asíncronos del servidor del kernel
+    """
+    
+    def wait_for(self, job_id, states=('completed', 'failed', 'cancelled'), query=''):
+        """Sondea GET /jobs/{id} hasta alcanzar un estado terminal"""
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            status, _, job = self.request('GET', f'/jobs/{job_id}{query}')
+            self.assertEqual(status, 200)
+            if job['status'] in states:
+                return job
+            time.sleep(0.01)
+        self.fail(f"El trabajo {job_id} no terminó")
+    
+    def test_submit_and_paginate_primes(self):
+        """POST /jobs responde 202 al instante y el resultado se pagina"""
+        status, response, accepted = self.request('POST', '/jobs',
+                                                  {'kind': 'primes', 'params': {'limit': 10000}})
+        self.assertEqual(status, 202)
+        self.assertEqual(response.getheader('Location'), accepted['location'])
+        
+        job = self.wait_for(accepted['id'], query='?offset=1220&limit=50')
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['progress'], 1.0)
+        self.assertEqual(job['result_count'], 1229)
+        self.assertEqual(job['result'], self.engine.generate_primes_sieve(10000)[1220:])
+    
+    def test_results_match_engine(self):
+        """Los trabajos reproducen los métodos síncronos del motor"""
+        submissions = {
+            'twin_primes': {'limit': 5000},
+            'sacred_sequence': {'count': 40, 'top_k': 5},
+            'analysis_report': {'limit': 20000},
+        }
+        ids = {kind: self.request('POST', '/jobs', {'kind': kind, 'params': params})[2]['id']
+               for kind, params in submissions.items()}
+        results = {kind: self.wait_for(job_id)['result'] for kind, job_id in ids.items()}
+        
+        self.assertEqual(results['twin_primes'],
+                         [list(pair) for pair in self.engine.find_twin_primes(5000)])
+        self.assertEqual(results['sacred_sequence'],
+                         self.engine.generate_sacred_prime_sequence(40, top_k=5))
+        expected = self.engine.get_qbtc_analysis_report_chunked(
+            self.engine.generate_primes_sieve(20000))
+        self.assertEqual(results['analysis_report'], json.loads(json.dumps(expected)))
+    
+    def test_cancel_running_job(self):
+        """DELETE detiene el cálculo en curso y conserva los parciales"""
+        _, _, accepted = self.request('POST', '/jobs', {'kind': 'primes', 'params': {'limit': 10 ** 8}})
+        self.wait_for(accepted['id'], states=('running',))
+        status, _, _ = self.request('DELETE', f"/jobs/{accepted['id']}")
+        self.assertEqual(status, 202)
+        
+        job = self.wait_for(accepted['id'])
+        self.assertEqual(job['status'], 'cancelled')
+        self.assertLess(job['progress'], 1.0)
+        self.assertTrue(all(self.engine.is_prime(p) for p in job['partial']))
+        
+        # Un segundo DELETE descarta el trabajo terminado
+        self.assertEqual(self.request('DELETE', f"/jobs/{accepted['id']}")[0], 202)
+        self.assertEqual(self.request('GET', f"/jobs/{accepted['id']}")[0], 404)
+    
+    def test_invalid_requests(self):
+        """Tipos o parámetros inválidos devuelven 400; ids desconocidos, 404"""
+        for payload in ({'kind': 'factorize'}, {'kind': 'primes'},
+                        {'kind': 'primes', 'params': {'limit': -5}},
+                        {'kind': 'primes', 'params': {'limit': 100, 'extra': 1}},
+                        {'kind': 'twin_primes', 'params': {'limit': 10 ** 9}}):
+            status, _, body = self.request('POST', '/jobs', payload)
+            self.assertEqual(status, 400, payload)
+            self.assertIn('error', body)
+        self.assertEqual(self.request('GET', '/jobs/desconocido')[0], 404)
+        self.assertEqual(self.request('DELETE', '/jobs/desconocido')[0], 404)
+    
+    def test_queue_limit_and_ttl(self):
+        """La cola acotada rechaza con JobQueueFull y los terminados expiran"""
+        from qbtc_job_manager import JobManager, JobQueueFull
+        manager = JobManager(max_workers=1, max_queued=1, result_ttl=0.05, engine=self.engine)
+        try:
+            running = manager.submit('primes', {'limit': 10 ** 8})
+            while running.status == 'queued':
+                time.sleep(0.001)
+            queued = manager.submit('primes', {'limit': 100})
+            with self.assertRaises(JobQueueFull):
+                manager.submit('primes', {'limit': 100})
+            
+            manager.cancel(running.id)
+            while queued.status != 'completed':
+                time.sleep(0.001)
+            self.assertIsNotNone(manager.get(queued.id))
+            time.sleep(0.1)
+            self.assertIsNone(manager.get(queued.id))
+            self.assertEqual(manager.stats(), {})
+        finally:
+            manager.shutdown()
+    
+    def test_retained_memory_is_bounded(self):
+        """Listados comprimidos, parciales recortados y expulsión por memoria retenida"""
+        from qbtc_job_manager import MAX_SACRED_COUNT, JobManager, validate_job_params
+        from prime_array import CompressedPrimeArray
+        self.assertEqual(validate_job_params('sacred_sequence', {'count': 50000})['count'], 50000)
+        self.assertGreaterEqual(MAX_SACRED_COUNT, 50000)
+        
+        manager = JobManager(max_workers=1, engine=self.engine, max_retained_bytes=6000)
+        try:
+            older = manager.submit('primes', {'limit': 30000})
+            while older.status != 'completed':
+                time.sleep(0.001)
+            self.assertIsInstance(older.items, CompressedPrimeArray)
+            self.assertLess(older.nbytes, 8 * len(older.items))
+            self.assertEqual(older.snapshot(3000, 10)['result'],
+                             self.engine.generate_primes_sieve(30000)[3000:3010])
+            
+            cancelled = manager.submit('primes', {'limit': 10 ** 8})
+            while cancelled.produced < 1000:
+                time.sleep(0.001)
+            manager.cancel(cancelled.id)
+            while cancelled.status != 'cancelled':
+                time.sleep(0.001)
+            self.assertLessEqual(len(cancelled.items), 100)
+            
+            newer = manager.submit('primes', {'limit': 30000})
+            while newer.status != 'completed':
+                time.sleep(0.001)
+            self.assertIsNone(manager.get(older.id))
+            self.assertIsNotNone(manager.get(newer.id))
+            self.assertLessEqual(manager.retained_bytes(), 6000)
+        finally:
+            manager.shutdown()
+
+
+class TestKernelStreaming(KernelServerTestCase):
+    """
+    Pruebas de los endpoints de streaming (NDJSON y SSE) del servidor del kernel
+    """
+    
+    def open_stream(self, path, headers=None):
+        """Abre un stream y devuelve la respuesta sin leer el cuerpo"""
+        import http.client
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        connection.request('GET', path, headers=headers or {})
+        self.addCleanup(connection.close)
+        return connection.getresponse()
+    
+    def test_ndjson_primes(self):
+        """NDJSON chunked: una línea por primo, idéntico a la criba completa"""
+        response = self.open_stream('/stream/primes?limit=50000&start=100')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'), 'application/x-ndjson')
+        self.assertEqual(response.getheader('Transfer-Encoding'), 'chunked')
+        primes = [json.loads(line) for line in response.read().decode('utf-8').splitlines()]
+        self.assertEqual(primes, [p for p in self.engine.generate_primes_sieve(50000) if p >= 100])
+        
+        response = self.open_stream('/stream/twin_primes?limit=1000')
+        twins = [tuple(json.loads(line)) for line in response.read().decode('utf-8').splitlines()]
+        self.assertEqual(twins, self.engine.find_twin_primes(1000))
+    
+    def test_sse_sacred_sequence(self):
+        """SSE: un evento por primo sagrado en orden de aceptación y evento final"""
+        response = self.open_stream('/stream/sacred_sequence?count=20',
+                                    {'Accept': 'text/event-stream'})
+        self.assertEqual(response.getheader('Content-Type'), 'text/event-stream')
+        events = [dict(line.split(': ', 1) for line in block.splitlines())
+                  for block in response.read().decode('utf-8').strip().split('\n\n')]
+        
+        self.assertEqual(events[-1], {'event': 'end', 'data': '{"count": 20}'})
+        self.assertEqual([int(event['id']) for event in events[:-1]], list(range(20)))
+        self.assertEqual([int(event['data']) for event in events[:-1]],
+                         list(self.engine.iter_sacred_primes(20)))
+        self.assertEqual(self.open_stream('/stream/factorize').status, 400)
+    
+    def test_disconnect_stops_computation(self):
+        """Cerrar la conexión a mitad de stream detiene el generador del motor"""
+        import socket
+        with self.assertLogs('qbtc_kernel_server', 'INFO') as logs:
+            client = socket.create_connection(('127.0.0.1', self.port), timeout=10)
+            client.sendall(b'GET /stream/primes?limit=1000000000 HTTP/1.1\r\nHost: test\r\n\r\n')
+            self.assertTrue(client.recv(4096))
+            client.close()
+            deadline = time.time() + 10
+            while not any('cliente desconectado' in line for line in logs.output):
+                self.assertLess(time.time(), deadline, 'El stream no detectó la desconexión')
+                time.sleep(0.01)
+
+
+
+class TestPrimeWire(KernelServerTestCase):
+    """
+    Pruebas del formato binario de transferencia de primos
+    """
+    
+    def test_round_trip_all_encodings(self):
+        """Todas las codificaciones reproducen los primos del rango"""
+        for start, stop in ((0, 20000), (999000, 1001000), (7, 8), (10, 10),
+                            (2 ** 32 - 500, 2 ** 32)):
+            expected = [p for p in range(start, stop) if self.engine.is_prime(p)]
+            for encoding in ENCODINGS:
+                header, payload = encode_range(start, stop, encoding)
+                decoded = decode_primes(bytes(header) + bytes(payload))
+                self.assertEqual([int(p) for p in decoded], expected, (start, stop, encoding))
+        
+        with self.assertRaises(ValueError):
+            encode_range(2 ** 32, 2 ** 32 + 100, 'u32')
+    
+    @unittest.skipIf(np is None, "NumPy no disponible")
+    def test_decode_is_zero_copy(self):
+        """u64 se decodifica como vista sobre el buffer recibido"""
+        header, payload = encode_range(0, 10000, 'u64')
+        data = bytes(header) + bytes(payload)
+        primes = decode_primes(data)
+        self.assertEqual(primes.dtype, np.uint64)
+        self.assertFalse(primes.flags.owndata)
+        self.assertEqual(len(payload), primes.nbytes)
+    
+    def test_accept_negotiation(self):
+        """El tipo binario se elige por Accept; sin él se responde JSON"""
+        self.assertIsNone(negotiate_encoding('application/json, */*'))
+        self.assertEqual(negotiate_encoding('application/vnd.qbtc.primes'), 'u64')
+        self.assertEqual(negotiate_encoding('text/html, application/vnd.qbtc.primes; '
+                                            'encoding=sieve'), 'sieve')
+        with self.assertRaises(ValueError):
+            negotiate_encoding('application/vnd.qbtc.primes; encoding=zip')
+    
+    def test_primes_endpoint(self):
+        """GET /primes sirve JSON por defecto y binario con Content-Length"""
+        import http.client
+        expected = self.engine.generate_primes_sieve(100000)[1000:]
+        start = expected[0]
+        status, _, body = self.request('GET', f'/primes?start={start}&limit=100000')
+        self.assertEqual((status, body['primes']), (200, expected))
+        
+        for encoding in ENCODINGS:
+            connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+            connection.request('GET', f'/primes?start={start}&limit=100000', headers={
+                'Accept': f'application/vnd.qbtc.primes; encoding={encoding}'})
+            response = connection.getresponse()
+            data = response.read()
+            connection.close()
+            self.assertEqual(response.status, 200)
+            self.assertEqual(int(response.getheader('Content-Length')), len(data))
+            self.assertEqual([int(p) for p in decode_primes(data)], expected, encoding)
+        
+        self.assertEqual(self.request('GET', '/primes?limit=-5')[0], 400)
+
+
+
+
+class TestKernelClient(KernelServerTestCase):
+    """
+    Pruebas del cliente del kernel (pool keep-alive, lotes, reintentos, asyncio)
+    """
+    
+    def make_client(self, **options):
+        from qbtc_kernel_client import QBTCKernelClient
+        client = QBTCKernelClient(f'http://127.0.0.1:{self.port}', **options)
+        self.addCleanup(client.close)
+        return client
+    
+    def test_keep_alive_pool(self):
+        """Peticiones consecutivas reutilizan una única conexión"""
+        client = self.make_client()
+        self.assertEqual([client.is_prime(n) for n in range(50)],
+                         [self.engine.is_prime(n) for n in range(50)])
+        self.assertEqual(client.stats['connections'], 1)
+        self.assertEqual(client.stats['requests'], 50)
+    
+    def test_micro_batching(self):
+        """Llamadas concurrentes se agrupan en /batch y cada una recibe su resultado"""
+        from concurrent.futures import ThreadPoolExecutor
+        from qbtc_kernel_client import KernelClientError
+        client = self.make_client(batch_window=0.02)
+        with ThreadPoolExecutor(16) as executor:
+            results = list(executor.map(lambda i: client.procesar_estado({'i': i}), range(64)))
+        self.assertEqual([result['processed_state'] for result in results],
+                         [{'i': i} for i in range(64)])
+        self.assertLess(client.stats['batches'], 64)
+        
+        # Un error afecta solo a su llamada dentro del lote
+        good = client.call_batched('manifest', {'archetype': 'a', 'params': {}})
+        bad = client.call_batched('manifest', {'params': {}})
+        self.assertEqual(good.result()['intention'], 'a')
+        with self.assertRaises(KernelClientError) as error:
+            bad.result()
+        self.assertEqual(error.exception.status, 500)
+    
+    def fake_server(self, behaviours):
+        """
+        Servidor HTTP mínimo que aplica a cada petición recibida el siguiente
+        comportamiento: 'ok' (responde keep-alive), 'close' (responde y cierra),
+        'drop' (cierra sin responder) o 'hang' (no responde)
+
+        Returns:
+            Tuple[int, list]: Puerto y lista de rutas recibidas
+        """
+        import socket
+        import threading
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(8)
+        self.addCleanup(listener.close)
+        behaviours, received = list(behaviours), []
+        ok = b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n'
+
+        def serve(conn):
+            with conn:
+                buffer = b''
+                while True:
+                    while b'\r\n\r\n' not in buffer:
+                        chunk = conn.recv(65536)
+                        if not chunk:
+                            return
+                        buffer += chunk
+                    head, _, buffer = buffer.partition(b'\r\n\r\n')
+                    length = int(next((line.split(b':')[1] for line in head.split(b'\r\n')
+                                       if line.lower().startswith(b'content-length')), 0))
+                    while len(buffer) < length:
+                        buffer += conn.recv(65536)
+                    buffer = buffer[length:]
+                    received.append(head.split()[1].decode())
+                    action = behaviours.pop(0)
+                    if action == 'hang':
+                        conn.recv(1)
+                        return
+                    if action == 'drop':
+                        return
+                    conn.sendall(ok + (b'Connection: close\r\n' if action == 'close' else b'')
+                                 + b'\r\n{}')
+                    if action == 'close':
+                        return
+
+        def accept():
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except OSError:
+                    return
+                threading.Thread(target=serve, args=(conn,), daemon=True).start()
 
+        threading.Thread(target=accept, daemon=True).start()
+        return listener.getsockname()[1], received
+    
+    def test_stale_connection_discarded_without_resending(self):
+        """Una conexión keep-alive cerrada por el servidor se descarta antes de enviar"""
+        from qbtc_kernel_client import QBTCKernelClient
+        port, received = self.fake_server(['close', 'ok'])
+        client = QBTCKernelClient(f'http://127.0.0.1:{port}')
+        self.addCleanup(client.close)
+        client.request_json('POST', '/jobs', {})
+        time.sleep(0.05)
+        self.assertEqual(client.request_json('POST', '/jobs', {}), {})
+        self.assertEqual(received, ['/jobs', '/jobs'])
+        self.assertEqual((client.stats['retries'], client.stats['connections']), (0, 2))
+    
+    def test_post_retried_only_when_not_processed(self):
+        """POST se reintenta tras RemoteDisconnected en conexión reutilizada, no tras timeout"""
+        import socket
+        from qbtc_kernel_client import QBTCKernelClient
+        port, received = self.fake_server(['ok', 'drop', 'ok'])
+        client = QBTCKernelClient(f'http://127.0.0.1:{port}', max_retries=2)
+        self.addCleanup(client.close)
+        client.request_json('POST', '/batch', {})
+        self.assertEqual(client.request_json('POST', '/batch', {}), {})
+        self.assertEqual((len(received), client.stats['retries']), (3, 1))
+        
+        port, received = self.fake_server(['hang', 'hang', 'ok'])
+        client = QBTCKernelClient(f'http://127.0.0.1:{port}', timeout=0.2, max_retries=2)
+        self.addCleanup(client.close)
+        with self.assertRaises(socket.timeout):
+            client.request_json('POST', '/jobs', {'kind': 'primes'})
+        self.assertEqual(received, ['/jobs'])
+        # GET es idempotente: el segundo timeout también se reintenta
+        self.assertEqual(client.request_json('GET', '/jobs/x'), {})
+        self.assertEqual(received, ['/jobs', '/jobs/x', '/jobs/x'])
+        
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            closed_port = probe.getsockname()[1]
+        client = QBTCKernelClient(f'http://127.0.0.1:{closed_port}', max_retries=2)
+        with self.assertRaises(ConnectionRefusedError):
+            client.request_json('POST', '/jobs', {})
+        self.assertEqual(client.stats['retries'], 2)
+    
+    def test_async_post_not_retried_after_timeout(self):
+        """La variante asyncio tampoco repite un POST que pudo procesarse"""
+        import asyncio
+        from qbtc_kernel_client import AsyncQBTCKernelClient
+        port, received = self.fake_server(['hang', 'ok'])
+        
+        async def scenario():
+            async with AsyncQBTCKernelClient(f'http://127.0.0.1:{port}', timeout=0.2) as client:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await client.request_json('POST', '/batch', {})
+                return client.stats['retries']
+        
+        self.assertEqual(asyncio.run(scenario()), 0)
+        self.assertEqual(received, ['/batch'])
+    
+    def test_binary_primes_stream_and_jobs(self):
+        """primes() decodifica el formato binario; stream() y jobs usan la misma API"""
+        client = self.make_client()
+        self.assertEqual([int(p) for p in client.primes(10000)],
+                         self.engine.generate_primes_sieve(10000))
+        self.assertEqual(list(client.stream('twin_primes', limit=100)),
+                         [list(pair) for pair in self.engine.find_twin_primes(100)])
+        job = client.wait_job(client.submit_job('primes', limit=1000), timeout=10)
+        self.assertEqual(job['result_count'], 168)
+    
+    def test_async_client(self):
+        """La variante asyncio agrupa llamadas concurrentes y reutiliza conexiones"""
+        import asyncio
+        from qbtc_kernel_client import AsyncQBTCKernelClient
+        
+        async def scenario():
+            async with AsyncQBTCKernelClient(f'http://127.0.0.1:{self.port}') as client:
+                results = await asyncio.gather(*(client.procesar_estado({'i': i})
+                                                 for i in range(100)))
+                primes = [await client.is_prime(n) for n in range(20)]
+                return results, primes, client.stats
+        
+        results, primes, stats = asyncio.run(scenario())
+        self.assertEqual([result['processed_state']['i'] for result in results], list(range(100)))
+        self.assertEqual(primes, [self.engine.is_prime(n) for n in range(20)])
+        self.assertLess(stats['batches'], 10)
+        self.assertLessEqual(stats['connections'], stats['batches'] + 1)
+
+
+class TestServerBackpressure(unittest.TestCase):
+    """
+    Pruebas de límites del servidor: cuerpo, timeouts, saturación y drenado
+    """
+    
+    def start_server(self, **options):
+        """Servidor propio (sin trabajos) en puerto efímero; se drena al terminar"""
+        import threading
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernel'))
+        from qbtc_kernel_server import QBTCKernelServer
+        server = QBTCKernelServer(host='127.0.0.1', port=0, enable_jobs=False, **options)
+        server.server = server.create_http_server()
+        server.running = True
+        threading.Thread(target=server.server.serve_forever, daemon=True).start()
+        self.addCleanup(server.stop_server, drain_timeout=1)
+        return server, server.server.server_address[1]
+    
+    def connect(self, port):
+        import socket
+        sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+        self.addCleanup(sock.close)
+        return sock
+    
+    def raw_request(self, port, data):
+        """Envía bytes tal cual y devuelve (status, respuesta completa)"""
+        sock = self.connect(port)
+        sock.sendall(data)
+        response = b''
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+        return int(response.split(b' ', 2)[1]), response
+    
+    def test_request_body_limits(self):
+        """Sin Content-Length 411, inválido 400, excesivo 413 sin leer el cuerpo"""
+        from qbtc_kernel_server import MAX_BODY_BYTES
+        _, port = self.start_server()
+        status, _ = self.raw_request(port, b'POST /process HTTP/1.1\r\nHost: x\r\n\r\n{}')
+        self.assertEqual(status, 411)
+        status, _ = self.raw_request(
+            port, b'POST /process HTTP/1.1\r\nHost: x\r\nContent-Length: abc\r\n\r\n')
+        self.assertEqual(status, 400)
+        status, response = self.raw_request(
+            port, b'POST /process HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n'
+            % (MAX_BODY_BYTES + 1))
+        self.assertEqual(status, 413)
+        self.assertIn(b'Connection: close', response)
+        status, response = self.raw_request(
+            port, b'POST /process HTTP/1.1\r\nHost: x\r\nContent-Length: 8\r\n'
+                  b'Connection: close\r\n\r\n{"a": 1}')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(response.split(b'\r\n\r\n', 1)[1])['processed_state'],
+                         {'a': 1})
+    
+    def test_slow_and_idle_clients_time_out(self):
+        """Un cuerpo incompleto recibe 408 y una conexión inactiva se cierra"""
+        _, port = self.start_server(request_timeout=0.3)
+        started = time.monotonic()
+        status, _ = self.raw_request(
+            port, b'POST /process HTTP/1.1\r\nHost: x\r\nContent-Length: 10\r\n\r\n{"a"')
+        self.assertEqual(status, 408)
+        idle = self.connect(port)
+        self.assertEqual(idle.recv(1), b'')
+        self.assertLess(time.monotonic() - started, 3)
+    
+    def test_saturation_rejects_with_503(self):
+        """Por encima de max_connections se responde 503 con Retry-After"""
+        server, port = self.start_server(max_connections=2)
+        held = [self.connect(port) for _ in range(2)]
+        deadline = time.monotonic() + 5
+        while len(server.server.connections) < len(held) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status, response = self.raw_request(port, b'GET /health HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertEqual(status, 503)
+        self.assertIn(b'Retry-After:', response)
+        self.assertEqual(server.server.rejected, 1)
+        
+        # Al liberar una conexión se vuelve a aceptar
+        held[0].close()
+        while len(server.server.connections) >= 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status, _ = self.raw_request(
+            port, b'GET /health HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n')
+        self.assertEqual(status, 200)
+    
+    def test_graceful_drain(self):
+        """drain() termina la petición en curso y cierra las conexiones inactivas"""
+        import threading
+        server, port = self.start_server()
+        idle = self.connect(port)
+        busy = self.connect(port)
+        busy.sendall(b'POST /process HTTP/1.1\r\nHost: x\r\nContent-Length: 8\r\n\r\n{"a"')
+        deadline = time.monotonic() + 5
+        while len(server.server.busy) < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        remaining = []
+        drainer = threading.Thread(target=lambda: remaining.append(server.server.drain(5)))
+        drainer.start()
+        self.assertEqual(idle.recv(1), b'')
+        # La petición en curso sigue atendida mientras se drena
+        busy.sendall(b': 1}')
+        response = b''
+        while True:
+            chunk = busy.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+        drainer.join(5)
+        self.assertTrue(response.startswith(b'HTTP/1.1 200'))
+        self.assertIn(b'Connection: close', response)
+        self.assertEqual(remaining, [0])
+        with self.assertRaises(OSError):
+            self.connect(port)
+
+    def test_start_failure_stops_without_serving(self):
+        """Un fallo antes de serve_forever() no deja stop_server() esperando a shutdown()"""
+        import threading
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernel'))
+        from qbtc_kernel_server import QBTCKernelServer
+        server = QBTCKernelServer(host='127.0.0.1', port=0, enable_jobs=False)
+        server.warm_up = lambda: None
+        server.log_endpoints = lambda: 1 / 0
+        starter = threading.Thread(target=server.start_server, daemon=True)
+        starter.start()
+        starter.join(5)
+        self.assertFalse(starter.is_alive())
+        self.assertFalse(server.running)
+        self.assertEqual(server.server.socket.fileno(), -1)
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), "Modo pre-fork requiere os.fork")
+class TestPreforkServer(unittest.TestCase):
+    """
+    Pruebas del servidor del kernel en modo pre-fork (proceso independiente)
+    """
+    
+    WORKERS = 2
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.log_dir = tempfile.TemporaryDirectory()
+        cls.engine = PrimeResonanceEngine()
+        cls.process, cls.port = cls.start_server(cls.WORKERS)
+    
+    @classmethod
+    def tearDownClass(cls):
+        if cls.process.poll() is None:
+            cls.process.kill()
+            cls.process.wait()
+        cls.log_dir.cleanup()
+    
+    @classmethod
+    def start_server(cls, workers):
+        """Lanza el servidor pre-fork en un puerto libre con una criba pequeña"""
+        import socket
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(repo_dir, 'kernel', 'qbtc_prefork.py'),
+             '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+             '--warm-limit', '100000'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            env={**os.environ, 'QBTC_KERNEL_LOG': os.path.join(cls.log_dir.name, 'kernel.log')})
+        deadline = time.time() + 30
+        while True:
+            try:
+                if all(worker['pid'] for worker in cls.get(port, '/metrics')['workers']):
+                    return process, port
+            except OSError:
+                pass
+            if time.time() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError("El servidor pre-fork no arrancó")
+            time.sleep(0.05)
+    
+    @staticmethod
+    def get(port, path):
+        """GET con conexión nueva (el kernel reparte conexiones entre trabajadores)"""
+        import http.client
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            connection.request('GET', path)
+            return json.loads(connection.getresponse().read())
+        finally:
+            connection.close()
+    
+    def test_warm_up_builds_shared_phase_tables(self):
+        """El calentamiento del padre tabula las fases que heredan los trabajadores"""
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernel'))
+        from qbtc_kernel_server import QBTCKernelServer
+        self.addCleanup(QBTCConstants.clear_phase_tables)
+        server = QBTCKernelServer(host='127.0.0.1', port=0, enable_jobs=False)
+        server.warm_up(10000, phase_limit=5000)
+        self.assertEqual(len(server.prime_table), 10001)
+        self.assertEqual(QBTCConstants.PHASE_TABLE_LIMIT, 5000)
+        self.assertEqual(QBTCConstants.phase_table_window([2, 3, 5]), (0, 3))
+    
+    def test_is_prime_and_aggregated_metrics(self):
+        """/is_prime usa la criba compartida (o Miller-Rabin) y las métricas suman trabajadores"""
+        before = self.get(self.port, '/metrics')['totals']['is_prime_queries']
+        numbers = [0, 1, 2, 97, 99991, 100000, 100003, 10 ** 9 + 7, 10 ** 12 + 1]
+        for n in numbers:
+            self.assertEqual(self.get(self.port, f'/is_prime?n={n}'),
+                             {'n': n, 'is_prime': self.engine.is_prime(n)})
+        
+        metrics = self.get(self.port, '/metrics')
+        self.assertEqual(metrics['totals']['is_prime_queries'] - before, len(numbers))
+        self.assertEqual(len(metrics['workers']), self.WORKERS)
+        self.assertEqual(sum(w['is_prime_queries'] for w in metrics['workers']),
+                         metrics['totals']['is_prime_queries'])
+        self.assertIn('error', self.get(self.port, '/jobs'))
+    
+    def test_crashed_worker_is_restarted(self):
+        """Un trabajador terminado por SIGKILL se reemplaza en su slot"""
+        import signal
+        victim = self.get(self.port, '/metrics')['workers'][0]['pid']
+        os.kill(victim, signal.SIGKILL)
+        
+        deadline = time.time() + 10
+        while True:
+            try:
+                metrics = self.get(self.port, '/metrics')
+                pids = [worker['pid'] for worker in metrics['workers']]
+                if metrics['restarts'] == 1 and victim not in pids:
+                    break
+            except OSError:
+                pass  # Conexiones en la cola del trabajador caído se reinician
+            self.assertLess(time.time(), deadline, "El trabajador no se reinició")
+            time.sleep(0.05)
+        self.assertTrue(self.get(self.port, '/is_prime?n=7919')['is_prime'])
+    
+    def test_sigterm_stops_workers(self):
+        """SIGTERM al padre detiene los trabajadores y termina con código 0"""
+        import signal
+        process, port = self.start_server(1)
+        worker = self.get(port, '/metrics')['workers'][0]['pid']
+        process.send_signal(signal.SIGTERM)
+        self.assertEqual(process.wait(timeout=20), 0)
+        with self.assertRaises(ProcessLookupError):
+            os.kill(worker, 0)
 
 def run_comprehensive_tests():
     """Ejecuta suite completa de pruebas"""
@@ -244,8 +1975,16 @@ def run_comprehensive_tests():
     test_loader = unittest.TestLoader()
     
     # Cargar todas las pruebas
-    tests = test_loader.loadTestsFromTestCase(TestPrimeResonanceEngine)
-    test_suite.addTests(tests)
+    for test_case in (TestPrimeResonanceEngine, TestQBTCPhaseTables, TestZModulationArray,
+                      TestGapClassifier, TestPopulationScoring, TestDigitPrimitives,
+                      TestQBTCModulationOrder, TestSacredSequenceBlocks, TestResonanceRangeIndex,
+                      TestGapSpectrum, TestPrimeConstellations,
+                      TestPrimeWheel, TestFactorizationService, TestEngineProfiling,
+                      TestChunkedAnalysisReport, TestLazyAnalysisReport, TestPrimeArray,
+                      TestStartupLatency,
+                      TestKernelJobs, TestKernelStreaming, TestPrimeWire,
+                      TestKernelClient, TestServerBackpressure, TestPreforkServer):
+        test_suite.addTests(test_loader.loadTestsFromTestCase(test_case))
     
     # Ejecutar pruebas con verbosidad
     runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)